@@ -0,0 +1,210 @@
+import math
+import os
+import sqlite3
+import time
+import uuid
+
+from flask import g, jsonify, request
+
+from db import LocalConnection
+from metrics import REGISTRY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS token_buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS leases (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_leases_name ON leases(name, expires_at);
+"""
+
+REJECTED = REGISTRY.counter(
+    "venturesync_admission_rejected_total", "Requests shed before reading their body, by route and reason",
+    ("route", "reason"))
+
+
+class Limit:
+    """Token bucket refilled at rate tokens/second up to burst tokens"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+
+
+def limit_from_env(prefix, per_minute, burst):
+    """Limit configured by {prefix}_PER_MINUTE and {prefix}_BURST; a per-minute rate of 0 disables it"""
+    per_minute = float(os.environ.get(f"{prefix}_PER_MINUTE", per_minute))
+    if per_minute <= 0:
+        return None
+    return Limit(per_minute / 60.0, float(os.environ.get(f"{prefix}_BURST", burst)))
+
+
+class Rule:
+    """Admission rule for one endpoint: per-client and whole-route buckets plus an optional concurrency cap"""
+
+    def __init__(self, per_client=None, per_route=None, concurrency=None, lease_ttl=300):
+        self.per_client = per_client
+        self.per_route = per_route
+        self.concurrency = concurrency
+        self.lease_ttl = lease_ttl
+
+
+class AdmissionStore:
+    """Token buckets and concurrency leases in a SQLite file shared by every worker on the host
+
+    One bucket row is kept per client and route, so every prune_interval seconds a take()
+    also prunes buckets idle for prune_after seconds (by then they have refilled completely).
+    """
+
+    def __init__(self, path, prune_interval=300, prune_after=3600):
+        self.path = path
+        self.prune_interval = prune_interval
+        self.prune_after = prune_after
+        self._conn = LocalConnection(path, pragmas=("journal_mode=WAL", "synchronous=NORMAL"), timeout=5)
+        self._ready = False
+        self._next_prune = 0.0
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def take(self, key, limit, cost=1.0, now=None):
+        """Spend cost tokens from a bucket; returns seconds to wait, 0 when admitted"""
+        now = time.time() if now is None else now
+        conn = self.connection()
+        # BEGIN IMMEDIATE serializes the read-modify-write across workers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM token_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = limit.burst if row is None else min(limit.burst, row[0] + (now - row[1]) * limit.rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / limit.rate
+            conn.execute("INSERT OR REPLACE INTO token_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                         (key, tokens, now))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if now >= self._next_prune:
+            self._next_prune = now + self.prune_interval
+            try:
+                self.prune(self.prune_after, now)
+            except sqlite3.OperationalError:
+                pass  # a busy store is pruned on a later pass
+        return wait
+
+    def acquire(self, name, limit, ttl, now=None):
+        """Take one of limit concurrent leases; returns a lease id, or None when all are held
+
+        Leases expire after ttl seconds so a worker killed mid-request can't leak capacity.
+        """
+        now = time.time() if now is None else now
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE name = ? AND expires_at <= ?", (name, now))
+            held = conn.execute("SELECT COUNT(*) FROM leases WHERE name = ?", (name,)).fetchone()[0]
+            lease_id = None
+            if held < limit:
+                lease_id = uuid.uuid4().hex
+                conn.execute("INSERT INTO leases (id, name, expires_at) VALUES (?, ?, ?)",
+                             (lease_id, name, now + ttl))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return lease_id
+
+    def release(self, lease_id):
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM leases WHERE id = ?", (lease_id,))
+
+    def prune(self, older_than=3600, now=None):
+        """Drop buckets idle long enough to have refilled completely, and expired leases; returns rows removed"""
+        now = time.time() if now is None else now
+        conn = self.connection()
+        with conn:
+            removed = conn.execute("DELETE FROM token_buckets WHERE updated_at < ?", (now - older_than,)).rowcount
+            removed += conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,)).rowcount
+        return removed
+
+
+def client_id(trust_proxy=False):
+    """Requesting client: the first X-Forwarded-For hop behind a trusted proxy, else the peer address"""
+    if trust_proxy:
+        forwarded = request.headers.get("X-Forwarded-For", "")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.remote_addr or "unknown"
+
+
+class AdmissionControl:
+    """Sheds requests to expensive endpoints with 429 + Retry-After before their body is read"""
+
+    def __init__(self, store, rules, trust_proxy=False, enabled=True, extra_checks=None):
+        self.store = store
+        self.rules = rules
+        self.trust_proxy = trust_proxy
+        self.enabled = enabled
+        # endpoint -> callable returning seconds to wait (0 to admit), e.g. a job backlog check
+        self.extra_checks = extra_checks or {}
+
+    def init_app(self, app):
+        app.before_request(self._admit)
+        app.teardown_request(self._release)
+        return self
+
+    def _reject(self, route, reason, retry_after, message):
+        REJECTED.inc(route=route, reason=reason)
+        response = jsonify({"status": "error", "message": message, "retry_after": retry_after})
+        response.status_code = 429
+        response.headers["Retry-After"] = str(retry_after)
+        return response
+
+    def _admit(self):
+        rule = self.rules.get(request.endpoint)
+        if not self.enabled or rule is None or request.method == "OPTIONS":
+            return None
+        route = request.endpoint
+        try:
+            if rule.per_client is not None:
+                wait = self.store.take(f"client:{route}:{client_id(self.trust_proxy)}", rule.per_client)
+                if wait:
+                    return self._reject(route, "client", math.ceil(wait), "Too many requests from this client")
+            if rule.per_route is not None:
+                wait = self.store.take(f"route:{route}", rule.per_route)
+                if wait:
+                    return self._reject(route, "route", math.ceil(wait), "This endpoint is busy, try again shortly")
+            check = self.extra_checks.get(route)
+            wait = check() if check is not None else 0
+            if wait:
+                return self._reject(route, "backlog", math.ceil(wait), "Too much work queued, try again shortly")
+            if rule.concurrency is not None:
+                lease_id = self.store.acquire(route, rule.concurrency, rule.lease_ttl)
+                if lease_id is None:
+                    return self._reject(route, "concurrency", 1, "Too many concurrent requests, try again shortly")
+                g.admission_lease = lease_id
+        except sqlite3.OperationalError:
+            # A locked or unavailable limiter store must not take the endpoint down with it
+            return None
+        return None
+
+    def _release(self, error=None):
+        lease_id = g.pop("admission_lease", None)
+        if lease_id is not None:
+            try:
+                self.store.release(lease_id)
+            except sqlite3.OperationalError:
+                pass  # the lease expires on its own
@@ -0,0 +1,406 @@
+import heapq
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from batch_scoring import CHUNK_CELLS
+from db import LocalConnection, pid_alive
+from matching import SIGNAL_WEIGHTS, parse_money, region_mask, sector_mask, stage_mask
+
+logger = logging.getLogger(__name__)
+
+# Makes every founder's score unique, so ties between equally attractive founders go to the lower index
+TIE_EPSILON = 1e-9
+DEFAULT_OPEN_RATE = 0.5
+
+
+def founder_profile(record):
+    """The matching fields of a founder record; startup pool entries name their stage 'stage'"""
+    profile = {
+        "sector": record.get("sector"),
+        "funding_stage": record.get("funding_stage") or record.get("stage"),
+        "geography": record.get("geography"),
+        "funding_amount": record.get("funding_amount"),
+    }
+    # Missing fields fall back to BatchScorer.encode_companies() defaults
+    return {key: value for key, value in profile.items() if value is not None}
+
+
+def founder_quality(record):
+    """How attractive a founder is to investors, 0..1: thesis score, else analysis confidence"""
+    if record.get("thesis_score") is not None:
+        return float(record["thesis_score"]) / 100
+    if record.get("confidence_score") is not None:
+        return float(record["confidence_score"])
+    return 0.5
+
+
+def _signature(profile):
+    return (sector_mask(profile.get("sector", "AI/ML")), stage_mask(profile.get("funding_stage", "Series A")),
+            region_mask(profile.get("geography")), parse_money(profile.get("funding_amount")))
+
+
+class _Fits:
+    """Fit of founder signatures against every fund, computed a chunk of signatures at a time"""
+
+    def __init__(self, scorer, profiles):
+        self.scorer = scorer
+        self.profiles = profiles
+        self.open_rate = np.nan_to_num(scorer.vc_open_rate, nan=DEFAULT_OPEN_RATE)
+
+    def rows(self, signatures):
+        """(fit, acceptable, founder preference) matrices for the given signature indexes"""
+        encoded = self.scorer.encode_companies([self.profiles[s] for s in signatures])
+        sector, stage, region, check = self.scorer.signals(*encoded)
+        fit = (SIGNAL_WEIGHTS["sector"] * sector + SIGNAL_WEIGHTS["stage"] * stage
+               + SIGNAL_WEIGHTS["geography"] * region + SIGNAL_WEIGHTS["check_size"] * check).astype(np.float64)
+        # Same candidate rule as MatchIndex.top_k: a fund must share the sector or the stage
+        acceptable = sector | stage
+        # Founders rank funds on fit, then on how reliably the fund answers
+        preference = np.where(acceptable, fit + self.open_rate, -np.inf)
+        return fit, acceptable, preference
+
+
+def _best(preference, limit):
+    """Column indexes of the `limit` best finite entries per row, best first"""
+    limit = min(limit, preference.shape[1])
+    part = np.argpartition(-preference, limit - 1, axis=1)[:, :limit]
+    order = np.argsort(-np.take_along_axis(preference, part, axis=1), axis=1, kind="stable")
+    best = np.take_along_axis(part, order, axis=1)
+    return [row[np.isfinite(preference[i, row])] for i, row in enumerate(best)]
+
+
+def allocate(scorer, founders, quota=3, capacity=5, capacities=None, candidates=20, max_rounds=64):
+    """Stable many-to-many founder/fund matching under per-fund intake caps (deferred acceptance)
+
+    Founders propose down their preference lists (fit, then open rate); each fund keeps the
+    `capacity` founders it rates best (fit plus founder quality) and rejects the rest. Lists
+    start as each founder's top `candidates` funds, shared by founders with identical matching
+    fields; founders who run out get a fresh list of funds that would still accept them, so once
+    a round extends no one (stats["converged"]) the result is stable against the full
+    preferences without ever having scored every pair at once.
+
+    Returns (pairs, stats) where pairs are (founder index, fund column, fit, fund-side score).
+    """
+    n_funds = len(scorer.fund_ids)
+    caps = [capacity] * n_funds
+    if capacities:
+        column = {int(fund_id): col for col, fund_id in enumerate(scorer.fund_ids)}
+        for fund_id, cap in capacities.items():
+            if int(fund_id) in column:
+                caps[column[int(fund_id)]] = max(0, int(cap))
+
+    signatures, profiles, signature_of = {}, [], []
+    for record in founders:
+        profile = founder_profile(record)
+        key = _signature(profile)
+        if key not in signatures:
+            signatures[key] = len(profiles)
+            profiles.append(profile)
+        signature_of.append(signatures[key])
+    quality = [founder_quality(record) - i * TIE_EPSILON for i, record in enumerate(founders)]
+    fits = _Fits(scorer, profiles)
+
+    # Round one: one candidate list per distinct signature, shared by reference
+    lists = [None] * len(founders)
+    shared = []
+    rows_per_pass = max(1, CHUNK_CELLS // max(n_funds, 1))
+    for start in range(0, len(profiles), rows_per_pass):
+        chunk = list(range(start, min(start + rows_per_pass, len(profiles))))
+        fit, _, preference = fits.rows(chunk)
+        for row, cols in enumerate(_best(preference, candidates)):
+            shared.append((cols.tolist(), fit[row, cols].tolist()))
+    for i, signature in enumerate(signature_of):
+        lists[i] = shared[signature]
+
+    # Uncapacitated baseline: every founder takes its top `quota` funds
+    greedy = np.zeros(n_funds, dtype=np.int64)
+    for i in range(len(founders)):
+        for col in lists[i][0][:quota]:
+            greedy[col] += 1
+
+    held = [[] for _ in range(n_funds)]  # min-heaps of (fund-side score, founder)
+    threshold = [-np.inf if cap else np.inf for cap in caps]
+    holds = [set() for _ in founders]
+    cursor = [0] * len(founders)
+    proposals = 0
+
+    def run(pending):
+        nonlocal proposals
+        while pending:
+            i = pending.pop()
+            cols, fit = lists[i]
+            mine = holds[i]
+            while len(mine) < quota and cursor[i] < len(cols):
+                k = cursor[i]
+                cursor[i] += 1
+                col = cols[k]
+                score = fit[k] + quality[i]
+                proposals += 1
+                if col in mine or score <= threshold[col]:
+                    continue
+                heap = held[col]
+                heapq.heappush(heap, (score, i))
+                mine.add(col)
+                if len(heap) > caps[col]:
+                    _, rejected = heapq.heappop(heap)
+                    holds[rejected].discard(col)
+                    pending.append(rejected)
+                if len(heap) >= caps[col]:
+                    threshold[col] = heap[0][0]
+
+    run(list(range(len(founders) - 1, -1, -1)))
+    rounds = 1
+    converged = False
+    exhausted = set()
+    while rounds < max_rounds:
+        short = [i for i in range(len(founders))
+                 if len(holds[i]) < quota and cursor[i] >= len(lists[i][0]) and i not in exhausted]
+        if not short:
+            converged = True
+            break
+        rounds += 1
+        bar = np.array(threshold)
+        by_signature = {}
+        for i in short:
+            by_signature.setdefault(signature_of[i], []).append(i)
+        extended = []
+        ordered = sorted(by_signature)
+        for start in range(0, len(ordered), rows_per_pass):
+            chunk = ordered[start:start + rows_per_pass]
+            fit, acceptable, preference = fits.rows(chunk)
+            # A fund takes a founder when fit + quality beats its bar; founders below the lowest
+            # bar any acceptable fund sets for their profile are out of options for good
+            floor = np.where(acceptable, bar - fit, np.inf).min(axis=1)
+            members = []
+            for row, signature in enumerate(chunk):
+                for i in by_signature[signature]:
+                    if quality[i] > floor[row]:
+                        members.append((row, i))
+                    else:
+                        exhausted.add(i)
+            for offset in range(0, len(members), rows_per_pass):
+                part = members[offset:offset + rows_per_pass]
+                rows = np.array([row for row, _ in part])
+                scores = fit[rows] + np.array([quality[i] for _, i in part])[:, None]
+                # Only funds that would take this founder right now; thresholds only rise, so
+                # funds skipped here can never form a blocking pair later
+                open_to = np.where(acceptable[rows] & (scores > bar), preference[rows], -np.inf)
+                for (row, i), cols in zip(part, _best(open_to, candidates + quota)):
+                    cols = [col for col in cols.tolist() if col not in holds[i]][:candidates]
+                    if not cols:
+                        exhausted.add(i)
+                        continue
+                    lists[i] = (cols, fit[row, cols].tolist())
+                    cursor[i] = 0
+                    extended.append(i)
+        if not extended:
+            converged = True
+            break
+        run(extended)
+
+    pairs = []
+    intake = np.zeros(n_funds, dtype=np.int64)
+    for col, heap in enumerate(held):
+        intake[col] = len(heap)
+        for score, i in heap:
+            pairs.append((i, col, int(round(score - quality[i])), round(score, 4)))
+    matched = sum(1 for mine in holds if mine)
+    total_capacity = int(sum(caps))
+    stats = {
+        "founders": len(founders),
+        "funds": n_funds,
+        "distinct_profiles": len(profiles),
+        "pairs": len(pairs),
+        "founders_matched": matched,
+        "founders_full": sum(1 for mine in holds if len(mine) >= quota),
+        "founders_unmatched": len(founders) - matched,
+        "capacity": total_capacity,
+        "utilization": round(len(pairs) / total_capacity, 4) if total_capacity else 0.0,
+        "funds_with_intake": int(np.count_nonzero(intake)),
+        "max_intake": int(intake.max()) if n_funds else 0,
+        "greedy_funds_with_intake": int(np.count_nonzero(greedy)),
+        "greedy_max_intake": int(greedy.max()) if n_funds else 0,
+        "greedy_funds_over_capacity": int(np.count_nonzero(greedy > np.array(caps))) if n_funds else 0,
+        "rounds": rounds,
+        "converged": converged,
+        "proposals": proposals,
+    }
+    return pairs, stats
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS allocation_runs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    summary TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_allocation_runs_created ON allocation_runs(created_at);
+CREATE TABLE IF NOT EXISTS allocation_pairs (
+    run_id TEXT NOT NULL,
+    vc_id INTEGER NOT NULL,
+    founder_id NOT NULL,
+    founder_name TEXT,
+    fit INTEGER NOT NULL,
+    score REAL NOT NULL,
+    PRIMARY KEY (run_id, vc_id, founder_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_allocation_pairs_founder ON allocation_pairs(run_id, founder_id);
+"""
+
+RUN_FIELDS = ("run_id", "status", "params", "summary", "error", "created_at", "finished_at")
+
+
+class AllocationStore:
+    """Allocation runs and their founder/fund pairs in SQLite, readable from every worker"""
+
+    def __init__(self, path, keep_runs=5):
+        self.path = path
+        self.keep_runs = keep_runs
+        self._conn = LocalConnection(path)
+        self._ready = False
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def start(self, params):
+        """(run id, created) - an allocation already running in a live worker is reused"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for run_id, pid in conn.execute(
+                    "SELECT id, owner_pid FROM allocation_runs WHERE status = 'running'").fetchall():
+                if pid_alive(pid):
+                    conn.execute("COMMIT")
+                    return run_id, False
+                conn.execute("UPDATE allocation_runs SET status = 'failed', error = 'worker exited', "
+                             "finished_at = ? WHERE id = ?", (time.time(), run_id))
+            run_id = uuid.uuid4().hex
+            conn.execute("INSERT INTO allocation_runs (id, status, params, owner_pid, created_at) "
+                         "VALUES (?, 'running', ?, ?, ?)", (run_id, json.dumps(params), os.getpid(), time.time()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return run_id, True
+
+    def finish(self, run_id, pairs, summary):
+        """Store a run's pairs, mark it complete and drop runs beyond keep_runs"""
+        conn = self.connection()
+        with conn:
+            conn.executemany("INSERT INTO allocation_pairs (run_id, vc_id, founder_id, founder_name, fit, score) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", ((run_id, *pair) for pair in pairs))
+            conn.execute("UPDATE allocation_runs SET status = 'complete', summary = ?, finished_at = ? WHERE id = ?",
+                         (json.dumps(summary), time.time(), run_id))
+            stale = [row[0] for row in conn.execute(
+                "SELECT id FROM allocation_runs WHERE status != 'running' ORDER BY created_at DESC "
+                "LIMIT -1 OFFSET ?", (self.keep_runs,))]
+            for old in stale:
+                conn.execute("DELETE FROM allocation_pairs WHERE run_id = ?", (old,))
+                conn.execute("DELETE FROM allocation_runs WHERE id = ?", (old,))
+
+    def fail(self, run_id, error):
+        conn = self.connection()
+        with conn:
+            conn.execute("UPDATE allocation_runs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                         (error, time.time(), run_id))
+
+    def get(self, run_id=None):
+        """One run (the latest complete one when run_id is None), or None"""
+        query = "SELECT id, status, params, summary, error, created_at, finished_at FROM allocation_runs "
+        if run_id is None:
+            row = self.connection().execute(
+                query + "WHERE status = 'complete' ORDER BY created_at DESC LIMIT 1").fetchone()
+        else:
+            row = self.connection().execute(query + "WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        run = dict(zip(RUN_FIELDS, row))
+        run["params"] = json.loads(run["params"])
+        run["summary"] = json.loads(run["summary"]) if run["summary"] else None
+        return run
+
+    def for_vc(self, run_id, vc_id):
+        """Founders a fund was allocated, best first"""
+        rows = self.connection().execute(
+            "SELECT founder_id, founder_name, fit, score FROM allocation_pairs WHERE run_id = ? AND vc_id = ? "
+            "ORDER BY score DESC", (run_id, vc_id))
+        return [{"founder_id": founder_id, "company_name": name, "fit": fit, "score": score}
+                for founder_id, name, fit, score in rows]
+
+    def for_founder(self, run_id, founder_id):
+        """Funds a founder was allocated, best fit first"""
+        rows = self.connection().execute(
+            "SELECT vc_id, fit, score FROM allocation_pairs WHERE run_id = ? AND founder_id = ? "
+            "ORDER BY fit DESC, vc_id", (run_id, founder_id))
+        return [{"vc_id": vc_id, "fit": fit, "score": score} for vc_id, fit, score in rows]
+
+    def page(self, run_id, limit=100, cursor=None):
+        """(pairs, next cursor) in fund id order; the cursor is the last fund id of the previous page"""
+        rows = self.connection().execute(
+            "SELECT vc_id, founder_id, founder_name, fit, score FROM allocation_pairs "
+            "WHERE run_id = ? AND vc_id > ? ORDER BY vc_id, score DESC", (run_id, cursor or 0)).fetchmany(limit + 1)
+        # Whole funds only, so a fund's intake never straddles two pages
+        if len(rows) > limit:
+            last = rows[limit - 1][0]
+            complete = [row for row in rows if row[0] < last]
+            rows, next_cursor = (complete, complete[-1][0]) if complete else (rows[:limit], last)
+        else:
+            next_cursor = None
+        pairs = [{"vc_id": vc_id, "founder_id": founder_id, "company_name": name, "fit": fit, "score": score}
+                 for vc_id, founder_id, name, fit, score in rows]
+        return pairs, next_cursor
+
+
+class AllocationRunner:
+    """Runs allocations on a background thread of the worker that was asked, one at a time per host"""
+
+    def __init__(self, store):
+        self.store = store
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='allocation')
+                self._pid = os.getpid()
+            return self._executor
+
+    def submit(self, scorer, founders, params, source=None):
+        """(run id, started) for an allocation of founders over the scorer's funds; params go to allocate()"""
+        run_id, created = self.store.start(dict(params, source=source, founders=len(founders)))
+        if created:
+            self._pool().submit(self._run, run_id, scorer, founders, params)
+        return run_id, created
+
+    def _run(self, run_id, scorer, founders, params):
+        started = time.perf_counter()
+        try:
+            pairs, stats = allocate(scorer, founders, **params)
+            stats["seconds"] = round(time.perf_counter() - started, 3)
+            rows = [(int(scorer.fund_ids[col]), founders[i]["id"], founders[i].get("company_name"), fit, score)
+                    for i, col, fit, score in pairs]
+            self.store.finish(run_id, rows, stats)
+        except Exception as e:
+            logger.error(f"Allocation {run_id} failed: {e}")
+            self.store.fail(run_id, str(e))
+            return
+        logger.info(f"Allocation {run_id}: {stats['pairs']} intros across {stats['funds_with_intake']} funds "
+                    f"in {stats['seconds']}s")
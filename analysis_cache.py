@@ -0,0 +1,37 @@
+from deck_analysis import ANALYZER_VERSION
+from shared_cache import SharedCache
+
+NAMESPACE = "analysis"
+
+
+def cache_key(file_sha256, analyzer_version=ANALYZER_VERSION):
+    """Content address for an analysis: the upload's hash plus the analyzer version"""
+    return f"{analyzer_version}-{file_sha256}"
+
+
+class AnalysisCache:
+    """Deck analyses by upload hash in the shared cache, readable by every worker and pool process"""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def config(self):
+        """Picklable settings for reopening the cache in a pool process"""
+        return self.cache.path, self.cache.max_bytes
+
+    @classmethod
+    def from_config(cls, config):
+        path, max_bytes = config
+        return cls(SharedCache(path, max_bytes=max_bytes))
+
+    def get(self, file_sha256):
+        """Cached analysis for an upload hash, or None"""
+        analysis = self.cache.get(NAMESPACE, cache_key(file_sha256))
+        return dict(analysis) if analysis is not None else None
+
+    def put(self, file_sha256, analysis):
+        """Store an analysis in both tiers; entries stay until evicted or the analyzer version changes"""
+        self.cache.set(NAMESPACE, cache_key(file_sha256), dict(analysis))
+
+    def stats(self):
+        return self.cache.stats(NAMESPACE)
@@ -0,0 +1,216 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from db import LocalConnection
+
+logger = logging.getLogger(__name__)
+
+# Bucket width in seconds and how long buckets of that width are kept by compact()
+RESOLUTIONS = {
+    "minute": (60, 2 * 86400),
+    "hour": (3600, 90 * 86400),
+    "day": (86400, 2 * 365 * 86400),
+}
+# How many buckets the dashboard reads per resolution
+WINDOWS = {"minute": 60, "hour": 48, "day": 30}
+METRICS = ("analyses", "matches", "intros", "decisions", "response_ms")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (resolution, metric, bucket, label)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS totals (
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (metric, label)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+UPSERT_ROLLUP = """
+INSERT INTO rollups (resolution, bucket, metric, label, count, total) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (resolution, metric, bucket, label)
+DO UPDATE SET count = count + excluded.count, total = total + excluded.total
+"""
+UPSERT_TOTAL = """
+INSERT INTO totals (metric, label, count, total) VALUES (?, ?, ?, ?)
+ON CONFLICT (metric, label) DO UPDATE SET count = count + excluded.count, total = total + excluded.total
+"""
+
+
+def bucket_start(ts, resolution):
+    width = RESOLUTIONS[resolution][0]
+    return int(ts // width) * width
+
+
+def _write(conn, pending):
+    """Upsert {(minute, metric, label): [count, total]} into every resolution and the totals"""
+    rollups = defaultdict(lambda: [0, 0.0])
+    totals = defaultdict(lambda: [0, 0.0])
+    for (minute, metric, label), (count, total) in pending.items():
+        for resolution in RESOLUTIONS:
+            row = rollups[(resolution, bucket_start(minute, resolution), metric, label)]
+            row[0] += count
+            row[1] += total
+        row = totals[(metric, label)]
+        row[0] += count
+        row[1] += total
+    conn.executemany(UPSERT_ROLLUP, [key + tuple(value) for key, value in rollups.items()])
+    conn.executemany(UPSERT_TOTAL, [key + tuple(value) for key, value in totals.items()])
+
+
+class Analytics:
+    """Rolling counters and minute/hour/day rollups kept incrementally in SQLite
+
+    record() only bumps an in-memory delta; a background thread folds the deltas into
+    the shared database every flush_interval seconds, so recording is O(1) per event and
+    dashboard reads touch a fixed number of buckets however much history there is.
+    """
+
+    def __init__(self, path, flush_interval=1.0, compact_interval=3600.0, on_flush=None):
+        self.path = path
+        # on_flush(metrics) runs after a flush folded in deltas for those metrics, e.g. to push a summary
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.compact_interval = compact_interval
+        self._conn = LocalConnection(path, pragmas=("journal_mode=WAL", "synchronous=NORMAL"))
+        self._ready = False
+        self._pending = defaultdict(lambda: [0, 0.0])  # (bucket_minute, metric, label) -> [count, total]
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._last_compaction = time.time()
+        atexit.register(self.flush)
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def record(self, metric, value=0.0, label="", count=1, ts=None):
+        """Count one occurrence of metric (with an optional value to sum, e.g. milliseconds)"""
+        self.ensure_started()
+        minute = bucket_start(time.time() if ts is None else ts, "minute")
+        with self._lock:
+            delta = self._pending[(minute, metric, label)]
+            delta[0] += count
+            delta[1] += value
+
+    def flush(self):
+        """Fold pending deltas into every resolution and the all-time totals in one transaction"""
+        with self._io_lock:
+            with self._lock:
+                if not self._pending or self._pid != os.getpid():
+                    return 0
+                pending, self._pending = self._pending, defaultdict(lambda: [0, 0.0])
+            conn = self.connection()
+            with conn:
+                _write(conn, pending)
+        # Outside the I/O lock: the callback usually reads totals(), which flushes again
+        if self.on_flush is not None:
+            self.on_flush({metric for _, metric, _ in pending})
+        return len(pending)
+
+    def compact(self, now=None):
+        """Delete buckets past their resolution's retention; coarser rollups already hold their counts"""
+        now = time.time() if now is None else now
+        conn = self.connection()
+        removed = 0
+        with conn:
+            for resolution, (_, retention) in RESOLUTIONS.items():
+                removed += conn.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                                        (resolution, bucket_start(now - retention, resolution))).rowcount
+        self._last_compaction = now
+        return removed
+
+    def backfill(self, events, fold):
+        """Seed rollups from historical events exactly once per database, even with many workers
+
+        fold(event) returns the (metric, label) pairs an event counts towards. Runs on the
+        calling thread so it is safe in a pre-fork master.
+        """
+        conn = self.connection()
+        with conn:
+            # The claim and the seeded rows commit together; losing workers see the claim and skip
+            claimed = conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('backfilled', ?)",
+                                   (str(time.time()),)).rowcount
+            if not claimed:
+                return 0
+            pending = defaultdict(lambda: [0, 0.0])
+            seeded = 0
+            for event in events:
+                minute = bucket_start(event.get("ts") or time.time(), "minute")
+                for metric, label in fold(event):
+                    pending[(minute, metric, label)][0] += 1
+                    seeded += 1
+            _write(conn, pending)
+        return seeded
+
+    def totals(self):
+        """{metric: {label: {"count", "total"}}} since the database was created"""
+        self.flush()
+        result = defaultdict(dict)
+        for metric, label, count, total in self.connection().execute(
+                "SELECT metric, label, count, total FROM totals"):
+            result[metric][label] = {"count": count, "total": total}
+        return dict(result)
+
+    def series(self, resolution, metric, buckets=None, now=None):
+        """Last `buckets` buckets of metric at resolution, oldest first, with empty buckets filled in"""
+        self.flush()
+        width = RESOLUTIONS[resolution][0]
+        buckets = buckets or WINDOWS[resolution]
+        end = bucket_start(time.time() if now is None else now, resolution)
+        start = end - (buckets - 1) * width
+        rows = self.connection().execute(
+            "SELECT bucket, SUM(count), SUM(total) FROM rollups "
+            "WHERE resolution = ? AND metric = ? AND bucket >= ? GROUP BY bucket",
+            (resolution, metric, start))
+        found = {bucket: (count, total) for bucket, count, total in rows}
+        series = []
+        for bucket in range(start, end + width, width):
+            count, total = found.get(bucket, (0, 0.0))
+            series.append({"t": bucket, "count": count, "total": round(total, 3)})
+        return series
+
+    def ensure_started(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # A forked child inherits the parent's unflushed deltas; they are the parent's to write
+            self._pending = defaultdict(lambda: [0, 0.0])
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="analytics-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+                if time.time() - self._last_compaction >= self.compact_interval:
+                    removed = self.compact()
+                    if removed:
+                        logger.info(f"Compacted {removed} expired analytics buckets")
+            except Exception as e:
+                logger.error(f"Analytics flush failed: {e}")
@@ -1,150 +1,553 @@
 import os
+import bisect
 import json
+import re
 import requests
+import httpx
 import random
+import secrets
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from flask_socketio import SocketIO
 import logging
 
+from admission import AdmissionControl, AdmissionStore, Rule, limit_from_env
+from allocation import AllocationRunner, AllocationStore
+from analysis_cache import AnalysisCache
+from analytics import RESOLUTIONS, Analytics
+from batch_scoring import BatchScorer
+from deck_ingest import SpoolingRequest, spool_stream
+from event_log import EventLog, LogFollower, replay
+from intro_store import IntroStore
+from investor_store import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvestorStore
+from jobs import DeckJobQueue, JobStore, QueueFull
+from matching import MatchIndex, explanation, rationale
+from range_index import CatalogRanges, RangeFilters
+from reports import FORMATS as REPORT_FORMATS, ReportEngine, build_report
+from scenarios import ScenarioCatalog
+from shared_cache import SharedCache
+from thesis_index import ThesisIndex, company_text
+from metrics import (DECK_ANALYSES, INTRO_REQUESTS, REGISTRY, REQUEST_LATENCY, VC_DECISIONS,
+                     SlowRequestProfiler, instrument, stage, timed_stage, uptime_seconds)
+from news_aggregator import NewsAggregator
+import outbound
+from realtime import DeltaBroadcaster, RoomDenied, RoomGrants, register_handlers, rooms_for
+from vc_queues import QueueMaterializer
+from response_cache import ResponseCache
+import serialization
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app, origins=['https://venturesync.netlify.app', 'http://localhost:3000'])
+app.request_class = SpoolingRequest
+CORS_ORIGINS = ['https://venturesync.netlify.app', 'http://localhost:3000']
+CORS(app, origins=CORS_ORIGINS)
 
 # Configuration
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+# Signs realtime room grants. Without SECRET_KEY a random key is drawn at import, which preloaded
+# workers inherit from the master; grants then stop verifying after a restart.
+app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY') or secrets.token_hex(32)
 
-# Real VC Database (Extended with complete names)
-REAL_VCS = [
-    {
-        "id": 1,
-        "name": "Andreessen Horowitz",
-        "type": "Corporate VC",
-        "geography": ["🇺🇸 USA", "🌍 Global"],
-        "checks": "$5M to $50M",
-        "stages": ["2. Seed", "3. Series A", "4. Series B"],
-        "industries": ["AI/ML", "Crypto", "B2B SaaS"],
-        "openRate": "95%",
-        "logo": "a16z",
-        "founded": 2009,
-        "description": "We invest in bold entrepreneurs building the future through technology",
-        "recentDeals": ["Character.AI $150M", "Replit $97M", "Tome $43M"],
-        "portfolio": ["Coinbase", "GitHub", "Slack", "Airbnb", "Meta"],
-        "website": "a16z.com",
-        "email": "marc@a16z.com",
-        "partner": "Marc Andreessen"
-    },
-    {
-        "id": 2,
-        "name": "Sequoia Capital",
-        "type": "Corporate VC",
-        "geography": ["🇺🇸 USA", "🇪🇺 Europe"],
-        "checks": "$1M to $100M",
-        "stages": ["1. Pre-seed", "2. Seed", "3. Series A"],
-        "industries": ["Enterprise", "Consumer", "Healthcare"],
-        "openRate": "92%",
-        "logo": "SEQ",
-        "founded": 1972,
-        "description": "We help daring founders build legendary companies",
-        "recentDeals": ["OpenAI $10B", "Stripe $6.5B", "Klarna $800M"],
-        "portfolio": ["Apple", "Google", "WhatsApp", "Zoom"],
-        "website": "sequoiacap.com",
-        "email": "roelof@sequoiacap.com",
-        "partner": "Roelof Botha"
-    },
-    {
-        "id": 3,
-        "name": "Accel Partners",
-        "type": "Corporate VC",
-        "geography": ["🇺🇸 USA", "🇪🇺 Europe"],
-        "checks": "$10M to $40M",
-        "stages": ["3. Series A", "4. Series B"],
-        "industries": ["SaaS", "Marketplace", "Developer Tools"],
-        "openRate": "88%",
-        "logo": "ACC",
-        "founded": 1983,
-        "description": "We partner with exceptional founders from the earliest stages",
-        "recentDeals": ["PostHog $12M", "Webflow $140M", "UiPath $225M"],
-        "portfolio": ["Slack", "Dropbox", "Atlassian", "Spotify"],
-        "website": "accel.com",
-        "email": "ryan@accel.com",
-        "partner": "Ryan Sweeney"
-    },
-    {
-        "id": 4,
-        "name": "GV (Google Ventures)",
-        "type": "Corporate VC",
-        "geography": ["🇺🇸 USA", "🌍 Global"],
-        "checks": "$3M to $25M",
-        "stages": ["2. Seed", "3. Series A", "4. Series B"],
-        "industries": ["AI/ML", "Healthcare", "Climate"],
-        "openRate": "90%",
-        "logo": "GV",
-        "founded": 2009,
-        "description": "We invest in startups with exceptional teams tackling big problems",
-        "recentDeals": ["Anthropic $300M", "Verily $1B", "Waymo $2.5B"],
-        "portfolio": ["Uber", "Nest", "23andMe", "Medium"],
-        "website": "gv.com",
-        "email": "david@gv.com",
-        "partner": "David Krane"
-    },
-    {
-        "id": 5,
-        "name": "First Round Capital",
-        "type": "Angel network",
-        "geography": ["🇺🇸 USA", "🇨🇦 Canada"],
-        "checks": "$1M to $10M",
-        "stages": ["1. Pre-seed", "2. Seed", "3. Series A"],
-        "industries": ["B2B SaaS", "Developer Tools", "Fintech"],
-        "openRate": "85%",
-        "logo": "FRC",
-        "founded": 2004,
-        "description": "We believe bold entrepreneurs deserve insider access",
-        "recentDeals": ["Retool $45M", "Roam $9M", "Hex $52M"],
-        "portfolio": ["Uber", "Square", "Notion", "Warby Parker"],
-        "website": "firstround.com",
-        "email": "josh@firstround.com",
-        "partner": "Josh Kopelman"
+# Investor database lives in SQLite and is read lazily; data/vcs.json seeds it on first run
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get('VENTURESYNC_DATA_DIR', os.path.join(BASE_DIR, 'var'))
+INVESTOR_DB_PATH = os.environ.get('INVESTOR_DB_PATH', os.path.join(DATA_DIR, 'investors.db'))
+INVESTOR_SEED_PATH = os.environ.get('INVESTOR_SEED_PATH', os.path.join(BASE_DIR, 'data', 'vcs.json'))
+DEMO_VC_ID = 1  # Andreessen Horowitz
+
+# Push channel for dashboards. The delta sequence and history are kept in SQLite so every worker
+# serves the same ones; without SOCKETIO_MESSAGE_QUEUE each worker relays that history to its own
+# clients. Websocket-only connections never need a session to stick to one worker; clients
+# without websockets poll /api/updates, which any worker can answer.
+SOCKETIO_MESSAGE_QUEUE = os.environ.get('SOCKETIO_MESSAGE_QUEUE')
+socketio = SocketIO(
+    app,
+    cors_allowed_origins=CORS_ORIGINS,
+    async_mode=os.environ.get('SOCKETIO_ASYNC_MODE', 'threading'),
+    message_queue=SOCKETIO_MESSAGE_QUEUE,
+    transports=os.environ.get('SOCKETIO_TRANSPORTS', 'websocket').split(',')
+)
+broadcaster = DeltaBroadcaster(
+    socketio,
+    os.environ.get('REALTIME_DB_PATH', os.path.join(DATA_DIR, 'realtime.db')),
+    interval=float(os.environ.get('REALTIME_FLUSH_SECONDS', 0.25)),
+    relay=not SOCKETIO_MESSAGE_QUEUE
+)
+room_grants = RoomGrants(app.config['SECRET_KEY'])
+register_handlers(socketio, broadcaster, room_grants)
+
+# Uploaded decks are spooled here in chunks rather than buffered in worker memory
+UPLOAD_SPOOL_DIR = os.path.join(DATA_DIR, 'uploads')
+SpoolingRequest.spool_dir = UPLOAD_SPOOL_DIR
+
+# orjson-backed compact JSON for every jsonify() response
+app.json = serialization.FastJSONProvider(app)
+
+# Dashboard rollups (per minute/hour/day) shared by all workers, updated as events happen
+analytics = Analytics(
+    os.environ.get('ANALYTICS_DB_PATH', os.path.join(DATA_DIR, 'analytics.db')),
+    flush_interval=float(os.environ.get('ANALYTICS_FLUSH_SECONDS', 1.0))
+)
+
+def record_response_time(route, method, status, seconds):
+    if route.startswith('/api/'):
+        analytics.record('response_ms', seconds * 1000, label=route)
+
+# Per-route latency histograms for /metrics; PROFILE_SLOW_REQUEST_MS opts into stack sampling
+instrument(app, profiler=SlowRequestProfiler.from_env(os.path.join(DATA_DIR, 'profiles')),
+           observers=(record_response_time,))
+
+# Memoized matches, VC pages, market data and analyses: a per-worker LRU over one SQLite file
+# every worker reads, so recycled workers start warm and concurrent misses compute once
+shared_cache = SharedCache(
+    os.environ.get('CACHE_DB_PATH', os.path.join(DATA_DIR, 'cache.db')),
+    memory_entries=int(os.environ.get('CACHE_MEMORY_ENTRIES', 1024)),
+    max_bytes=int(os.environ.get('CACHE_MAX_BYTES', 256 * 1024 * 1024)),
+    version_check_interval=float(os.environ.get('CACHE_VERSION_CHECK_SECONDS', 1.0))
+)
+MATCH_CACHE_TTL = int(os.environ.get('MATCH_CACHE_TTL', 600))
+VC_CACHE_TTL = int(os.environ.get('VC_CACHE_TTL', 300))
+MARKET_CACHE_TTL = int(os.environ.get('MARKET_CACHE_TTL', 30))
+
+# Finished analyses keyed by upload SHA-256 + analyzer version
+analysis_cache = AnalysisCache(shared_cache)
+
+# Deck analysis runs in a local process pool; job state is in SQLite so it outlives workers
+deck_jobs = DeckJobQueue(
+    JobStore(os.environ.get('JOBS_DB_PATH', os.path.join(DATA_DIR, 'jobs.db'))),
+    job_dir=os.path.join(DATA_DIR, 'jobs'),
+    max_workers=int(os.environ.get('DECK_ANALYSIS_WORKERS', 2)),
+    max_pending=int(os.environ.get('DECK_ANALYSIS_MAX_PENDING', 32)),
+    result_cache=analysis_cache,
+    on_done=lambda outcome, seconds: analytics.record('analyses', (seconds or 0) * 1000, label=outcome)
+)
+
+# Reports stream as they render and are stored once per input hash; big exports use a process pool
+report_engine = ReportEngine(
+    os.path.join(DATA_DIR, 'reports'),
+    max_workers=int(os.environ.get('REPORT_WORKERS', 1)),
+    inline_limit=int(os.environ.get('REPORT_INLINE_MATCHES', 50))
+)
+MAX_REPORT_MATCHES = int(os.environ.get('REPORT_MAX_MATCHES', 1000))
+
+# Global founder<->VC allocation: a capacity-capped stable matching run in the background
+allocations = AllocationRunner(AllocationStore(
+    os.environ.get('ALLOCATION_DB_PATH', os.path.join(DATA_DIR, 'allocations.db')),
+    keep_runs=int(os.environ.get('ALLOCATION_KEEP_RUNS', 5))
+))
+ALLOCATION_WEEKLY_CAP = int(os.environ.get('ALLOCATION_WEEKLY_CAP', 5))
+ALLOCATION_INTROS_PER_FOUNDER = int(os.environ.get('ALLOCATION_INTROS_PER_FOUNDER', 3))
+ALLOCATION_CANDIDATES = int(os.environ.get('ALLOCATION_CANDIDATES', 20))
+MAX_ALLOCATION_FOUNDERS = int(os.environ.get('ALLOCATION_MAX_FOUNDERS', 100000))
+
+# Batch scoring runs in bounded row chunks, but the response still grows with companies x k
+MAX_BATCH_COMPANIES = int(os.environ.get('BATCH_MAX_COMPANIES', 1000))
+MAX_BATCH_K = int(os.environ.get('BATCH_MAX_K', 50))
+
+# Expensive endpoints are rate limited per client and per route, and deck uploads are capped
+# globally; rejections are 429 + Retry-After before the body is read. Buckets live in SQLite
+# so every worker on the host draws from the same budget.
+admission = AdmissionControl(
+    AdmissionStore(os.environ.get('ADMISSION_DB_PATH', os.path.join(DATA_DIR, 'admission.db'))),
+    rules={
+        'analyze_deck': Rule(
+            per_client=limit_from_env('ANALYZE_DECK_CLIENT', per_minute=6, burst=3),
+            per_route=limit_from_env('ANALYZE_DECK_ROUTE', per_minute=120, burst=20),
+            concurrency=int(os.environ.get('DECK_UPLOAD_CONCURRENCY', 8)),
+        ),
+        'intro_request': Rule(
+            per_client=limit_from_env('INTRO_REQUEST_CLIENT', per_minute=10, burst=5),
+            per_route=limit_from_env('INTRO_REQUEST_ROUTE', per_minute=300, burst=50),
+        ),
+        'generate_report': Rule(
+            per_client=limit_from_env('GENERATE_REPORT_CLIENT', per_minute=20, burst=5),
+        ),
+        'find_matches_batch': Rule(
+            per_client=limit_from_env('BATCH_MATCH_CLIENT', per_minute=30, burst=10),
+        ),
+        'run_allocation': Rule(
+            per_client=limit_from_env('ALLOCATION_CLIENT', per_minute=2, burst=2),
+        ),
+        'submit_startup': Rule(
+            per_client=limit_from_env('SUBMIT_STARTUP_CLIENT', per_minute=10, burst=5),
+        ),
     },
-    {
-        "id": 6,
-        "name": "Lightspeed Venture Partners",
-        "type": "Corporate VC",
-        "geography": ["🇺🇸 USA", "🇮🇳 India"],
-        "checks": "$5M to $30M",
-        "stages": ["2. Seed", "3. Series A", "4. Series B"],
-        "industries": ["Enterprise", "Consumer", "Gaming"],
-        "openRate": "87%",
-        "logo": "LSV",
-        "founded": 2000,
-        "description": "We partner with exceptional entrepreneurs",
-        "recentDeals": ["Epic Games $1B", "Snap $485M", "Affirm $300M"],
-        "portfolio": ["Snapchat", "AppDynamics", "Nutanix"],
-        "website": "lightspeedvp.com",
-        "email": "jeremy@lsvp.com",
-        "partner": "Jeremy Liew"
-    }
+    trust_proxy=os.environ.get('TRUST_PROXY_HEADERS') == '1',
+    enabled=os.environ.get('RATE_LIMITS_ENABLED', '1') == '1',
+    extra_checks={'analyze_deck': lambda: 5 if deck_jobs.is_full() else 0},
+).init_app(app)
+
+# Under gunicorn's preload_app the master imports this module; jobs are recovered per worker instead
+PRELOADED = os.environ.get('VENTURESYNC_PRELOAD') == '1'
+if not PRELOADED:
+    deck_jobs.recover()
+
+investor_store = InvestorStore(INVESTOR_DB_PATH, seed_path=INVESTOR_SEED_PATH)
+
+# Serialized responses for the read-only GET endpoints the dashboards poll
+response_cache = ResponseCache(default_ttl=int(os.environ.get('RESPONSE_CACHE_TTL', 30)))
+
+# Matching index built once at load, then kept current by replaying the store's change log (sync_catalog).
+# The version is read first so a change committed while the index loads is replayed rather than missed.
+catalog_version = investor_store.catalog_version()
+match_index = MatchIndex(investor_store.iter_all())
+_catalog_lock = threading.Lock()
+_batch_scorer = None
+
+def get_batch_scorer():
+    """Batch scorer over the indexed funds, rebuilt when the index changes"""
+    global _batch_scorer
+    if _batch_scorer is None or _batch_scorer.index_version != match_index.version:
+        _batch_scorer = BatchScorer(match_index.investors())
+        _batch_scorer.index_version = match_index.version
+    return _batch_scorer
+
+# Semantic stage: hashed TF-IDF vectors of VC descriptions/portfolios, searched on CPU
+THESIS_DIMENSIONS = int(os.environ.get('THESIS_DIMENSIONS', 1024))
+_thesis_index = None
+
+def get_thesis_index():
+    """Thesis embedding index over the investor catalog; sync_catalog swaps in updated copies"""
+    global _thesis_index
+    if _thesis_index is None:
+        # Under the catalog lock so no change lands between reading the store and publishing the index
+        with _catalog_lock:
+            if _thesis_index is None:
+                _thesis_index = ThesisIndex(investor_store.iter_all(), dimensions=THESIS_DIMENSIONS)
+    return _thesis_index
+
+_catalog_ranges = None
+
+def get_catalog_ranges():
+    """Check-size interval tree and open-rate/founded sorted arrays; sync_catalog patches them in place"""
+    global _catalog_ranges
+    if _catalog_ranges is None:
+        with _catalog_lock:
+            if _catalog_ranges is None:
+                _catalog_ranges = CatalogRanges(match_index.investors())
+    return _catalog_ranges
+
+warmup_seconds = {}
+REGISTRY.gauge('venturesync_warmup_seconds', 'Time spent building shared structures before serving',
+               lambda: round(sum(warmup_seconds.values()), 3))
+
+# Demo scenarios: seeded companies with analysis + matches precomputed once, served from SQLite
+scenario_catalog = ScenarioCatalog(
+    os.environ.get('DEMO_SCENARIO_DB_PATH', os.path.join(DATA_DIR, 'scenarios.db')),
+    count=int(os.environ.get('DEMO_SCENARIO_COUNT', 1000)),
+    seed=int(os.environ.get('DEMO_SCENARIO_SEED', 42)),
+    matches=int(os.environ.get('DEMO_SCENARIO_MATCHES', 3))
+)
+
+_scenario_key = None
+_scenario_builder = None
+_scenario_builder_lock = threading.Lock()
+
+def ensure_scenarios():
+    """Precompute the scenario catalog unless the stored one matches the investor catalog; returns seconds spent"""
+    # A thousand one-off lookups would only push the hot entries out of the match cache
+    return scenario_catalog.ensure_built(
+        lambda analysis, k, rng: find_vc_matches(analysis, k=k, rng=rng, cached=False), sync_catalog())
+
+def build_scenarios():
+    # Another worker may hold the build lease; wait for its catalog rather than building a second one
+    while not scenario_catalog.is_current(sync_catalog()):
+        try:
+            if not ensure_scenarios():
+                time.sleep(1)
+        except Exception as e:
+            logger.error(f"Scenario catalog build failed: {e}")
+            return
+
+def schedule_scenario_build():
+    """Rebuild the scenario catalog in a background thread; requests keep serving the stored one meanwhile"""
+    global _scenario_builder
+    with _scenario_builder_lock:
+        if _scenario_builder is not None and _scenario_builder.is_alive():
+            return
+        _scenario_builder = threading.Thread(target=build_scenarios, name='scenario-builder', daemon=True)
+        _scenario_builder.start()
+
+def sync_scenarios():
+    """Drop this worker's cached demo pages once a new catalog is swapped in; rebuild in the background if it is behind
+
+    Returns the stored build key, None until a first catalog has been built.
+    """
+    global _scenario_key
+    key = scenario_catalog.stored_key()
+    if key != _scenario_key:
+        response_cache.invalidate('demo-scenarios')
+        _scenario_key = key
+    if key != scenario_catalog.build_key(catalog_version):
+        schedule_scenario_build()
+    return key
+
+def warm_up():
+    """Build every lazily built index now (before fork under preload_app) and mark the arrays read-only
+
+    Returns seconds spent per step; the totals are logged and exported on /metrics.
+    """
+    steps = (
+        ('investor_pages', investor_store.warm),
+        ('batch_scorer', get_batch_scorer),
+        ('catalog_ranges', get_catalog_ranges),
+        ('thesis_index', get_thesis_index),
+        ('demo_scenarios', ensure_scenarios),
+    )
+    for name, build in steps:
+        started = time.perf_counter()
+        build()
+        warmup_seconds[name] = round(time.perf_counter() - started, 3)
+    # Read-only arrays are never written again, so their pages stay shared between forked workers
+    scorer, thesis = get_batch_scorer(), get_thesis_index()
+    for array in (scorer.fund_ids, scorer.vc_industry, scorer.vc_stage, scorer.vc_region,
+                  scorer.vc_check_min, scorer.vc_check_max, scorer.vc_open_rate,
+                  thesis.fund_ids, thesis.tf, thesis.matrix, thesis.idf):
+        array.flags.writeable = False
+    logger.info(f"Warm-up finished in {sum(warmup_seconds.values()):.2f}s: {warmup_seconds}")
+    return dict(warmup_seconds)
+
+def on_worker_start():
+    """Per-worker startup after fork: resume orphaned deck jobs, spawn the analysis pool and start the
+    news loop, so every worker's live-deal snapshot refreshes whether or not it serves market requests"""
+    started = time.perf_counter()
+    deck_jobs.recover()
+    deck_jobs.warm()
+    news_aggregator.ensure_started()
+    logger.info(f"Worker {os.getpid()} ready in {time.perf_counter() - started:.2f}s")
+
+def sync_catalog():
+    """Apply investor adds/removes committed by any worker since this one last synced
+
+    Returns the catalog version the local index now reflects. Shared cache entries are keyed on it,
+    so two workers only ever share results computed from the same investor set.
+    """
+    global catalog_version, _thesis_index
+    with _catalog_lock:
+        changes = investor_store.changes_since(catalog_version)
+        added, dropped = {}, set()
+        for version, fund_id, removed in changes:
+            # A later change may already have removed it; the record in the store is the one to index
+            fund = None if removed else investor_store.get(fund_id)
+            if fund is None:
+                match_index.remove_fund(fund_id)
+                vc_queues.remove_vc(fund_id)
+                if _catalog_ranges is not None:
+                    _catalog_ranges.remove(fund_id)
+                added.pop(fund_id, None)
+                dropped.add(fund_id)
+            else:
+                match_index.add_fund(fund)
+                vc_queues.add_vc(fund_id, fund.get('industries', []))
+                if _catalog_ranges is not None:
+                    _catalog_ranges.add(match_index.get(fund_id))
+                added[fund_id] = fund
+                dropped.discard(fund_id)
+            catalog_version = version
+        if changes:
+            if _thesis_index is not None:
+                # Only the changed funds are vectorized; searches in flight keep the old copy
+                _thesis_index = _thesis_index.updated(added.values(), dropped)
+            response_cache.invalidate('vcs')
+        return catalog_version
+
+@app.before_request
+def sync_catalog_before_request():
+    # Before the response cache too, so a worker never serves a page from before another worker's change
+    sync_catalog()
+    if request.path.startswith('/api/demo-scenario'):
+        sync_scenarios()
+
+def add_investor(fund):
+    """Persist an investor; every worker indexes it incrementally on its next sync_catalog"""
+    investor_store.add(fund)
+    sync_catalog()
+    schedule_scenario_build()
+    shared_cache.invalidate('matches')
+    shared_cache.invalidate('vcs')
+
+def remove_investor(fund_id):
+    """Delete an investor from the store; every worker drops it from its index on its next sync_catalog"""
+    removed = investor_store.remove(fund_id)
+    sync_catalog()
+    schedule_scenario_build()
+    shared_cache.invalidate('matches')
+    shared_cache.invalidate('vcs')
+    return removed
+
+# Startup pool for VC weekly queues; each startup lists the VC industries it targets
+STARTUP_SEED_PATH = os.environ.get('STARTUP_SEED_PATH', os.path.join(BASE_DIR, 'data', 'startups.json'))
+
+def load_vc_queues():
+    """Materialize every VC's weekly queue from the seed startup pool"""
+    queues = QueueMaterializer(match_index)
+    with open(STARTUP_SEED_PATH, encoding='utf-8') as f:
+        for startup in json.load(f):
+            target_industries = startup.pop('target_industries')
+            queues.add_startup(startup, target_industries)
+    return queues
+
+vc_queues = load_vc_queues()
+vc_queues.on_change = lambda vc_id, queue: broadcaster.publish(f"vc:{vc_id}", 'queue', {"weekly_queue": queue})
+
+def initial_room_state(room):
+    """Current state for a room nobody has pushed to yet (e.g. a VC's queue)"""
+    if room.startswith('vc:') and room[3:].isdigit():
+        event_follower.catch_up()
+        return {'queue': {"weekly_queue": vc_queues.queue(int(room[3:]))}}
+    if room == 'analytics':
+        return {'summary': analytics_summary()}
+    return {}
+
+broadcaster.initial_state = initial_room_state
+
+# Decisions and intro requests go to an append-only log; replaying it rebuilds the queues, and intro
+# requests are also written to SQLite, where any worker looks them up by id
+EVENT_LOG_PATH = os.environ.get('EVENT_LOG_PATH', os.path.join(DATA_DIR, 'events.log'))
+intro_store = IntroStore(os.environ.get('INTRO_DB_PATH', os.path.join(DATA_DIR, 'intros.db')))
+
+def compaction_key(event):
+    """What a compacted log keeps: the records queue replay needs (passes, startup submissions and rescores)"""
+    if event['type'] == 'vc_decision' and event.get('decision') == 'pass' \
+            and event.get('vc_id') is not None and event.get('startup_id') is not None:
+        return (event['vc_id'], event['startup_id'])
+    # A later submission replaces the startup and a later rescore its score, so the latest of each is enough
+    if event['type'] == 'startup_submitted':
+        return ('startup', event['startup']['id'])
+    if event['type'] == 'startup_rescored':
+        return ('score', event['startup_id'])
+    return None
+
+event_log = EventLog(EVENT_LOG_PATH, flush_interval=float(os.environ.get('EVENT_LOG_FLUSH_SECONDS', 0.05)),
+                     compact_key=compaction_key,
+                     compact_bytes=int(os.environ.get('EVENT_LOG_COMPACT_BYTES', 64 * 1024 * 1024)))
+
+def apply_event(event):
+    """Fold one logged event into in-memory state (used live and on replay); must be idempotent"""
+    if event['type'] == 'vc_decision':
+        if event.get('decision') == 'pass' and event.get('vc_id') is not None and event.get('startup_id') is not None:
+            vc_queues.remove_from_queue(event['vc_id'], event['startup_id'])
+    elif event['type'] == 'startup_submitted':
+        vc_queues.add_startup(dict(event['startup']), event['target_industries'])
+    elif event['type'] == 'startup_rescored':
+        vc_queues.rescore_startup(event['startup_id'], event['thesis_score'])
+
+def event_metrics(event):
+    """(metric, label) analytics pairs a logged event counts towards"""
+    if event['type'] == 'vc_decision':
+        return [('decisions', event.get('decision') or 'unknown')]
+    if event['type'] == 'intro_request':
+        return [('intros', 'requested')]
+    if event['type'] == 'intro_delivery':
+        return [('intros', 'sent' if event.get('delivered') else 'delivery_failed')]
+    return []
+
+# Every worker appends to the same log; before reading intro or queue state a worker applies
+# what the others appended since its last look
+event_follower = LogFollower(EVENT_LOG_PATH, apply_event)
+
+def record_event(event_type, payload, prefix, wait=False, secret_id=False):
+    """Append an event to the log and apply it; returns its collision-free id
+
+    wait=True returns once the event is on disk, so any worker's next read sees it.
+    secret_id=True draws a random id, for ids clients use to look records up.
+    """
+    event_id = event_log.ids.token(prefix) if secret_id else event_log.ids.next(prefix)
+    event_follower.skip(event_id)
+    event = event_log.append(event_type, payload, prefix=prefix, wait=wait, event_id=event_id)
+    apply_event(event)
+    if event_type in ('intro_request', 'intro_delivery'):
+        intro_store.record(event)
+    for metric, label in event_metrics(event):
+        analytics.record(metric, label=label, ts=event['ts'])
+    if event_type == 'vc_decision':
+        VC_DECISIONS.inc(decision=event.get('decision'))
+    elif event_type == 'intro_request':
+        INTRO_REQUESTS.inc()
+    if event_type == 'vc_decision' and event.get('vc_id') is not None:
+        broadcaster.publish(f"vc:{event['vc_id']}", 'decision', {"latest": event})
+    elif event_type == 'intro_request' and event.get('founder_email'):
+        broadcaster.publish(f"founder:{event['founder_email']}", 'intro', {"latest": intro_store.get(event['id'])})
+    elif event_type == 'intro_delivery':
+        intro = intro_store.get(event.get('request_id'))
+        if intro is not None and intro.get('founder_email'):
+            broadcaster.publish(f"founder:{intro['founder_email']}", 'intro', {"latest": intro})
+    return event['id']
+
+# Intro emails are POSTed to an email API over the shared keep-alive pool, off the request thread
+INTRO_EMAIL_URL = os.environ.get('INTRO_EMAIL_URL')
+INTRO_EMAIL_TOKEN = os.environ.get('INTRO_EMAIL_TOKEN')
+_intro_pool = None
+_intro_pool_pid = None
+
+def deliver_intro(request_id, payload):
+    """Queue delivery of one intro; the request id doubles as the idempotency key so retries can't double-send"""
+    global _intro_pool, _intro_pool_pid
+    if not INTRO_EMAIL_URL:
+        return
+    if _intro_pool is None or _intro_pool_pid != os.getpid():
+        _intro_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='intro-delivery')
+        _intro_pool_pid = os.getpid()
+    _intro_pool.submit(_send_intro, request_id, payload)
+
+def _send_intro(request_id, payload):
+    headers = {'Idempotency-Key': request_id}
+    if INTRO_EMAIL_TOKEN:
+        headers['Authorization'] = f"Bearer {INTRO_EMAIL_TOKEN}"
+    error = None
+    try:
+        response = outbound.shared.get().post(INTRO_EMAIL_URL, json={"request_id": request_id, **payload},
+                                              headers=headers)
+        if response.status_code >= 400:
+            error = f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        error = str(e) or type(e).__name__
+    if error:
+        logger.error(f"Intro delivery failed for {request_id}: {error}")
+    record_event('intro_delivery', {"request_id": request_id, "delivered": error is None, "error": error},
+                 prefix='delivery')
+
+event_follower.catch_up()
+# New analytics and intro databases start from the history already in the log (after a compaction,
+# only what the compacted log kept)
+analytics.backfill(replay(EVENT_LOG_PATH), event_metrics)
+intro_store.backfill(replay(EVENT_LOG_PATH))
+
+# Curated headlines served until the first successful refresh of the configured feeds
+CURATED_FUNDING_NEWS = [
+    {"title": "OpenAI raises $6.6B at $157B valuation", "time": "2 hours ago", "source": "TechCrunch"},
+    {"title": "Anthropic secures $4B from Amazon", "time": "4 hours ago", "source": "Reuters"},
+    {"title": "Perplexity AI closes $74M Series B", "time": "6 hours ago", "source": "VentureBeat"},
+    {"title": "xAI announces $6B funding round", "time": "8 hours ago", "source": "Bloomberg"},
+    {"title": "Scale AI reaches $14B valuation", "time": "1 day ago", "source": "WSJ"},
+    {"title": "Character.AI raises $150M Series A", "time": "2 days ago", "source": "TechCrunch"},
+    {"title": "Runway ML secures $237M Series C", "time": "3 days ago", "source": "VentureBeat"},
+    {"title": "Cohere AI closes $270M funding round", "time": "4 days ago", "source": "TechCrunch"}
 ]
 
+def on_news_update(snapshot):
+    """Drop the cached market response and push the new headlines to subscribers"""
+    response_cache.invalidate('market-intelligence')
+    shared_cache.invalidate('market')
+    broadcaster.publish('market', 'live_deals', {"live_deals": list(snapshot)})
+
+# Background aggregator over NEWS_SOURCES; requests only ever read its latest snapshot
+news_aggregator = NewsAggregator.from_env(initial=CURATED_FUNDING_NEWS, on_update=on_news_update)
+broadcaster.seed('market', 'live_deals', {"live_deals": list(news_aggregator.snapshot())})
+
 def get_live_funding_news():
-    """Get live funding news from multiple sources"""
+    """Get live funding news from the aggregator's latest snapshot"""
     try:
-        # In production, this would fetch from real APIs
-        # For demo, we'll return realistic recent funding news
-        live_deals = [
-            {"title": "OpenAI raises $6.6B at $157B valuation", "time": "2 hours ago", "source": "TechCrunch"},
-            {"title": "Anthropic secures $4B from Amazon", "time": "4 hours ago", "source": "Reuters"},
-            {"title": "Perplexity AI closes $74M Series B", "time": "6 hours ago", "source": "VentureBeat"},
-            {"title": "xAI announces $6B funding round", "time": "8 hours ago", "source": "Bloomberg"},
-            {"title": "Scale AI reaches $14B valuation", "time": "1 day ago", "source": "WSJ"},
-            {"title": "Character.AI raises $150M Series A", "time": "2 days ago", "source": "TechCrunch"},
-            {"title": "Runway ML secures $237M Series C", "time": "3 days ago", "source": "VentureBeat"},
-            {"title": "Cohere AI closes $270M funding round", "time": "4 days ago", "source": "TechCrunch"}
-        ]
-        return live_deals
+        news_aggregator.ensure_started()
+        live_deals = list(news_aggregator.snapshot())
+        return live_deals or get_fallback_news()
     except Exception as e:
         logger.error(f"Failed to fetch live news: {e}")
         return get_fallback_news()
@@ -159,209 +562,85 @@ def get_fallback_news():
         {"title": "Scale AI reaches $14B valuation", "time": "1 day ago", "source": "WSJ"}
     ]
 
-def generate_demo_company():
-    """Generate a realistic demo company with detailed analysis"""
-    companies = [
-        {
-            "company_name": "NeuralFlow",
-            "business_model": "AI-powered data pipeline automation for enterprise",
-            "sector": "AI/ML",
-            "funding_stage": "Series A",
-            "funding_amount": "$18M",
-            "geography": "San Francisco, CA",
-            "key_metrics": {
-                "revenue": "$2.1M ARR",
-                "growth_rate": "25% MoM",
-                "customers": "45 enterprise clients"
-            },
-            "team_background": "Ex-Google/Meta engineers with 10+ years ML experience",
-            "traction": "2x revenue growth, 45 enterprise customers, 98% retention",
-            "competitive_advantages": ["Proprietary ML algorithms", "Real-time processing", "Enterprise security"],
-            "investment_highlights": ["Strong product-market fit", "Experienced team", "Large TAM"],
-            "deck_summary": "NeuralFlow has built an AI-powered data pipeline automation platform that reduces enterprise data processing time by 80%. With $2.1M ARR growing at 25% MoM, we serve 45 enterprise clients including Fortune 500 companies. Our proprietary ML algorithms and real-time processing capabilities provide significant competitive advantages in the $50B+ data infrastructure market.",
-            "confidence_score": 0.92
-        },
-        {
-            "company_name": "FinanceFlow",
-            "business_model": "Blockchain-based cross-border payments for SMBs",
-            "sector": "Fintech",
-            "funding_stage": "Series A",
-            "funding_amount": "$15M",
-            "geography": "New York, NY",
-            "key_metrics": {
-                "revenue": "$1.8M ARR",
-                "growth_rate": "30% MoM",
-                "customers": "1,200 SMB clients"
-            },
-            "team_background": "Former Goldman Sachs and Stripe executives",
-            "traction": "1,200 SMB customers, $50M+ processed monthly",
-            "competitive_advantages": ["Lower fees than traditional banks", "Instant settlement", "Regulatory compliance"],
-            "investment_highlights": ["Large addressable market", "Strong unit economics", "Proven team"],
-            "deck_summary": "FinanceFlow revolutionizes cross-border payments for SMBs using blockchain technology, reducing costs by 60% and settlement time to under 2 minutes. With $1.8M ARR growing 30% MoM and 1,200 customers processing $50M+ monthly, we're capturing significant market share in the $150B+ cross-border payments market.",
-            "confidence_score": 0.89
-        },
-        {
-            "company_name": "HealthAI",
-            "business_model": "AI diagnostic platform for radiology imaging",
-            "sector": "Healthcare",
-            "funding_stage": "Series A",
-            "funding_amount": "$22M",
-            "geography": "Boston, MA",
-            "key_metrics": {
-                "revenue": "$3.2M ARR",
-                "growth_rate": "20% MoM",
-                "customers": "15 hospital systems"
-            },
-            "team_background": "Former Johns Hopkins researchers and Google Health alumni",
-            "traction": "15 hospital partnerships, 95% diagnostic accuracy",
-            "competitive_advantages": ["FDA-cleared algorithms", "Integration with major EMRs", "Clinical validation"],
-            "investment_highlights": ["Regulatory moats", "Proven clinical outcomes", "Strong IP portfolio"],
-            "deck_summary": "HealthAI has developed FDA-cleared AI diagnostic algorithms that improve radiology accuracy by 23% and reduce diagnosis time by 45%. With partnerships across 15 major hospital systems and $3.2M ARR growing 20% MoM, we're transforming diagnostic imaging in the $25B+ medical imaging market.",
-            "confidence_score": 0.94
-        },
-        {
-            "company_name": "CarbonCapture",
-            "business_model": "Direct air capture technology for carbon removal",
-            "sector": "Climate",
-            "funding_stage": "Series A",
-            "funding_amount": "$25M",
-            "geography": "Austin, TX",
-            "key_metrics": {
-                "revenue": "$4.5M ARR",
-                "growth_rate": "35% MoM",
-                "customers": "8 enterprise contracts"
-            },
-            "team_background": "MIT PhDs and former Tesla energy team",
-            "traction": "8 enterprise contracts, 1,000 tons CO2 captured",
-            "competitive_advantages": ["Patent-pending capture technology", "30% lower costs", "Scalable modular design"],
-            "investment_highlights": ["Massive market opportunity", "Strong IP moats", "Proven technology"],
-            "deck_summary": "CarbonCapture has developed breakthrough direct air capture technology that removes CO2 at 30% lower cost than competitors. With 8 enterprise contracts and $4.5M ARR growing 35% MoM, we're positioned to lead the $100B+ carbon removal market driven by net-zero commitments.",
-            "confidence_score": 0.91
-        }
-    ]
-    
-    return random.choice(companies)
-
 def generate_vc_weekly_queue(vc):
-    """Generate realistic startup queue for VC based on their thesis"""
-    
-    # Create startups aligned to this VC's focus
-    startups = []
-    
-    if "AI/ML" in vc["industries"]:
-        startups.append({
-            "id": 1,
-            "company_name": "NeuralFlow AI",
-            "sector": "AI/ML",
-            "stage": "Series A",
-            "metrics": "$2.1M ARR, 25% MoM growth",
-            "team": "Ex-Google/Meta AI team",
-            "thesis_score": 94,
-            "market_timing": "Hot",
-            "rationale": ["AI/ML thesis perfect match", "Enterprise B2B focus", "Series A stage alignment", "Strong team pedigree"],
-            "portfolio_synergy": ["GitHub integration potential", "Coinbase data needs"],
-            "risk_factors": ["Competition from DataBricks", "Enterprise sales cycle"],
-            "next_steps": "30-min partner call",
-            "deck_url": "https://deck.neuralflow.ai",
-            "founder_linkedin": "https://linkedin.com/in/sarah-chen-ai"
-        })
+    """Return the VC's materialized startup queue (top matches by thesis score)"""
+    event_follower.catch_up()
+    return vc_queues.queue(vc["id"])
+
+def match_candidates(analysis, k=3, filters=None):
+    """[fund id, signals, thesis similarity] candidates for an analysis, memoized across workers per catalog version"""
+    version = sync_catalog()
+    key = (analysis.get('sector', 'AI/ML'), analysis.get('funding_stage', 'Series A'), analysis.get('geography'),
+           analysis.get('funding_amount'), company_text(analysis), k, filters.to_dict() if filters else None)
+    return shared_cache.get_or_compute('matches', key, lambda: retrieve_candidates(analysis, k, filters),
+                                       ttl=MATCH_CACHE_TTL, version=version)
+
+def retrieve_candidates(analysis, k, filters):
+    """Best [fund id, signals, thesis similarity] candidates from the thesis and match indexes, topped up with fallbacks"""
+    company_sector = analysis.get('sector', 'AI/ML')
+    company_stage = analysis.get('funding_stage', 'Series A')
+    company_geography = analysis.get('geography')
+    company_check_size = analysis.get('funding_amount')
     
-    if "SaaS" in vc["industries"] or "Developer Tools" in vc["industries"]:
-        startups.append({
-            "id": 2,
-            "company_name": "DevPipe",
-            "sector": "Developer Tools",
-            "stage": "Seed",
-            "metrics": "$800K ARR, 35% MoM growth",
-            "team": "Ex-Stripe/Vercel engineers",
-            "thesis_score": 87,
-            "market_timing": "Emerging",
-            "rationale": ["Developer tools thesis match", "High growth metrics", "Strong technical team", "Open source traction"],
-            "portfolio_synergy": ["GitHub workflow integration", "Slack developer community"],
-            "risk_factors": ["Early stage", "Competitive landscape"],
-            "next_steps": "Technical due diligence",
-            "deck_url": "https://deck.devpipe.io",
-            "founder_linkedin": "https://linkedin.com/in/alex-dev"
-        })
+    allowed = get_catalog_ranges().matching(filters) if filters else None
     
-    if "Healthcare" in vc["industries"]:
-        startups.append({
-            "id": 3,
-            "company_name": "HealthAI Diagnostics",
-            "sector": "Healthcare",
-            "stage": "Series A",
-            "metrics": "$3.2M ARR, 20% MoM growth",
-            "team": "Johns Hopkins + Google Health",
-            "thesis_score": 91,
-            "market_timing": "Ready",
-            "rationale": ["Healthcare AI focus", "FDA-cleared product", "Hospital partnerships", "Proven clinical outcomes"],
-            "portfolio_synergy": ["23andMe data integration", "Verily partnership potential"],
-            "risk_factors": ["Regulatory complexity", "Long sales cycles"],
-            "next_steps": "Clinical validation review",
-            "deck_url": "https://deck.healthai.com",
-            "founder_linkedin": "https://linkedin.com/in/dr-maria-health"
-        })
+    # Funds whose description and portfolio read like the deck join the candidate set
+    with stage('thesis_retrieval'):
+        thesis = get_thesis_index().nearest(company_text(analysis))
     
-    # Sort by thesis score
-    startups.sort(key=lambda x: x["thesis_score"], reverse=True)
+    # Pull the best sector/stage/thesis candidates straight from the match index
+    candidates = match_index.top_k(company_sector, company_stage,
+                                   geography=company_geography,
+                                   check_size=company_check_size, k=k, allowed=allowed, thesis=thesis)
     
-    return startups[:3]  # Return top 3 matches
+    # If no perfect matches, include top VCs (still within any range filters)
+    if len(candidates) < k:
+        seen = {fund_id for fund_id, _ in candidates}
+        fallback = investor_store.first_ids(k + len(seen)) if allowed is None else sorted(allowed)[:k + len(seen)]
+        for fund_id in fallback:
+            if len(candidates) >= k:
+                break
+            if fund_id not in seen:
+                candidates.append((fund_id, match_index.signals(fund_id, company_sector, company_stage,
+                                                                company_geography, company_check_size)))
+    # Lists rather than tuples or int-keyed dicts, so the value reads the same after the cache's JSON round trip
+    return [[fund_id, signals, thesis.get(fund_id, 0.0)] for fund_id, signals in candidates]
+
+@timed_stage('matching')
+def find_vc_matches(analysis, k=3, filters=None, rng=None, cached=True):
+    """Generate realistic VC matches based on company analysis, optionally within RangeFilters
 
-def find_vc_matches(analysis):
-    """Generate realistic VC matches based on company analysis"""
+    rng seeds the score jitter; demo scenarios pass their own so bundles are reproducible.
+    cached=False skips the shared match cache, for bulk builds whose lookups won't repeat.
+    """
     company_sector = analysis.get('sector', 'AI/ML')
     company_stage = analysis.get('funding_stage', 'Series A')
+    if cached:
+        candidates = match_candidates(analysis, k=k, filters=filters)
+    else:
+        sync_catalog()
+        candidates = retrieve_candidates(analysis, k, filters)
     
-    # Filter VCs based on sector and stage alignment
-    relevant_vcs = []
-    for vc in REAL_VCS:
-        sector_match = any(industry in company_sector or company_sector in industry 
-                          for industry in vc['industries'])
-        stage_match = any(company_stage in stage for stage in vc['stages'])
-        
-        if sector_match or stage_match:
-            relevant_vcs.append(vc)
-    
-    # If no perfect matches, include top VCs
-    if len(relevant_vcs) < 3:
-        relevant_vcs = REAL_VCS[:3]
+    vcs = investor_store.get_many(fund_id for fund_id, _, _ in candidates)
     
     matches = []
-    for i, vc in enumerate(relevant_vcs[:3]):
+    for fund_id, signals, similarity in candidates:
+        vc = vcs[fund_id]
         # Calculate compatibility score based on alignment
         base_score = 85
-        if any(industry in company_sector for industry in vc['industries']):
+        if signals['sector']:
             base_score += 8
-        if any(company_stage in stage for stage in vc['stages']):
+        if signals['stage']:
             base_score += 5
         
-        compatibility = min(base_score + random.randint(-3, 3), 98)
-        
-        # Generate rationale based on VC and company
-        rationale = []
-        if any(industry in company_sector for industry in vc['industries']):
-            rationale.append(f"Strong {company_sector} thesis alignment")
-        if any(company_stage in stage for stage in vc['stages']):
-            rationale.append(f"{company_stage} stage perfect fit")
-        
-        # Add portfolio-specific rationale
-        if vc['name'] == "Andreessen Horowitz":
-            rationale.append("Portfolio synergy with GitHub")
-        elif vc['name'] == "Sequoia Capital":
-            rationale.append("Market-leading position")
-            rationale.append("Proven track record")
-        elif vc['name'] == "Accel Partners":
-            rationale.append("Technical founder support")
-            rationale.append("SaaS specialization")
-        
-        if not rationale:
-            rationale = ["Geographic alignment", "Check size match", "Investment thesis fit"]
+        compatibility = min(base_score + (rng or random).randint(-3, 3), 98)
         
         matches.append({
             "vc": vc,
             "compatibility": compatibility,
-            "rationale": rationale[:3],  # Limit to 3 reasons
-            "explanation": f"Excellent alignment with {vc['name']}'s investment focus and portfolio companies."
+            "rationale": rationale(vc['name'], signals, company_sector, company_stage),
+            "thesis_similarity": round(similarity, 3),
+            "explanation": explanation(vc['name'])
         })
     
     # Sort by compatibility score
@@ -376,30 +655,55 @@ def index():
         "version": "2.0.0",
         "endpoints": [
             "/api/demo-scenario", 
+            "/api/demo-scenarios",
             "/api/demo-vc-scenario",
             "/api/market-intelligence", 
             "/api/vcs",
             "/api/analyze-deck",
             "/api/find-matches",
+            "/api/find-matches/batch",
             "/api/intro-request",
-            "/api/vc-decision"
+            "/api/generate-report",
+            "/api/vc-decision",
+            "/api/startups",
+            "/api/analytics-dashboard",
+            "/api/allocations",
+            "/metrics"
         ]
     })
 
+def scenarios_building():
+    response = jsonify({"status": "error", "message": "Demo scenarios are still being built"})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
 @app.route('/api/demo-scenario', methods=['POST'])
 def demo_scenario():
-    """Load complete demo scenario with AI-generated company"""
+    """Load one precomputed demo scenario (a random one unless an id is given)"""
+    data = request.get_json(silent=True) or {}
+    scenario_id = data.get('id')
+    if scenario_id is not None:
+        try:
+            if isinstance(scenario_id, bool) or not isinstance(scenario_id, (int, str)):
+                raise ValueError
+            scenario_id = int(scenario_id)
+        except ValueError:
+            return jsonify({"status": "error", "message": "id must be an integer"}), 400
+    if _scenario_key is None:
+        return scenarios_building()
     try:
-        # Generate realistic demo company
-        analysis = generate_demo_company()
-        
-        # Find matches based on the analysis
-        matches = find_vc_matches(analysis)
+        if scenario_id is None:
+            scenario_id = random.randint(1, scenario_catalog.count)
+        encoded = scenario_catalog.get_encoded(scenario_id)
+        if encoded is None:
+            return jsonify({"status": "error", "message": "Unknown scenario id"}), 404
+        bundle = serialization.loads(encoded)
         
         return jsonify({
             "status": "success",
-            "analysis": analysis,
-            "matches": matches,
+            "scenario_id": bundle['id'],
+            "analysis": bundle['analysis'],
+            "matches": bundle['matches'],
             "demo_mode": True,
             "timestamp": datetime.now().isoformat()
         })
@@ -408,12 +712,54 @@ def demo_scenario():
         logger.error(f"Demo scenario error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/demo-scenarios', methods=['GET'])
+@response_cache.cached('demo-scenarios', ttl=300)
+def demo_scenarios():
+    """Keyset-paginated catalog of precomputed scenarios; view=full includes analysis and matches"""
+    try:
+        limit = max(1, min(int(request.args.get('limit', 20)), 200))
+        cursor = request.args.get('cursor')
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit and cursor must be integers"}), 400
+    view = request.args.get('view', 'summary')
+    if view not in ('summary', 'full'):
+        return jsonify({"status": "error", "message": "view must be summary or full"}), 400
+    sector, funding_stage = request.args.get('sector'), request.args.get('stage')
+    if _scenario_key is None:
+        return scenarios_building()
+    try:
+        items, next_cursor = scenario_catalog.page(limit, cursor, sector=sector, stage=funding_stage, view=view)
+        body = serialization.splice({
+            "status": "success",
+            "next_cursor": next_cursor,
+            "total": scenario_catalog.total(sector=sector, stage=funding_stage),
+            "seed": scenario_catalog.seed,
+            "timestamp": datetime.now().isoformat()
+        }, "scenarios", items)
+        return app.response_class(body, mimetype='application/json')
+    except Exception as e:
+        logger.error(f"Demo scenario catalog error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/demo-scenarios/<int:scenario_id>', methods=['GET'])
+@response_cache.cached('demo-scenarios', ttl=300)
+def demo_scenario_bundle(scenario_id):
+    """One precomputed scenario bundle: analysis and matches"""
+    if _scenario_key is None:
+        return scenarios_building()
+    encoded = scenario_catalog.get_encoded(scenario_id)
+    if encoded is None:
+        return jsonify({"status": "error", "message": "Unknown scenario id"}), 404
+    # The stored bundle is already JSON; wrap it without decoding
+    return app.response_class(b'{"status":"success","scenario":' + encoded + b'}', mimetype='application/json')
+
 @app.route('/api/demo-vc-scenario', methods=['POST'])
 def demo_vc_scenario():
     """Load complete VC demo scenario"""
     try:
         # Use Andreessen Horowitz as demo VC
-        demo_vc = REAL_VCS[0]
+        demo_vc = investor_store.get(DEMO_VC_ID)
         
         # Generate their weekly startup queue
         weekly_queue = generate_vc_weekly_queue(demo_vc)
@@ -432,6 +778,7 @@ def demo_vc_scenario():
             "status": "success",
             "vc_profile": demo_vc,
             "weekly_queue": weekly_queue,
+            "subscribe_token": room_grants.issue([f"vc:{DEMO_VC_ID}"]),
             "metrics": vc_metrics,
             "demo_mode": True,
             "timestamp": datetime.now().isoformat()
@@ -441,23 +788,50 @@ def demo_vc_scenario():
         logger.error(f"VC demo scenario error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/vcs/<int:vc_id>/queue', methods=['GET'])
+def get_vc_queue(vc_id):
+    """Current weekly startup queue for one VC"""
+    if vc_id not in match_index:
+        return jsonify({"status": "error", "message": "Unknown VC"}), 404
+    
+    # Decisions other workers recorded take effect here before the queue is read
+    event_follower.catch_up()
+    weekly_queue = vc_queues.queue(vc_id)
+    return jsonify({
+        "status": "success",
+        "vc_id": vc_id,
+        "weekly_queue": weekly_queue,
+        "total": len(weekly_queue),
+        "timestamp": datetime.now().isoformat()
+    })
+
 @app.route('/api/vc-decision', methods=['POST'])
 def vc_decision():
     """Handle VC decision on startup"""
     try:
-        data = request.json
-        startup_id = data.get('startup_id')
+        data = request.json or {}
         decision = data.get('decision')  # 'interested', 'pass', 'schedule_meeting'
-        vc_id = data.get('vc_id')
         notes = data.get('notes', '')
+        try:
+            vc_id = int(data['vc_id']) if data.get('vc_id') is not None else None
+            startup_id = int(data['startup_id']) if data.get('startup_id') is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "vc_id and startup_id must be integers"}), 400
         
         # Log the decision
         logger.info(f"VC {vc_id} decision: {decision} for startup {startup_id}")
         
-        # In production, this would update the database
+        decision_id = record_event('vc_decision', {
+            "vc_id": vc_id,
+            "startup_id": startup_id,
+            "decision": decision,
+            "notes": notes
+        }, prefix='decision', wait=True)
+        
         response_data = {
             "status": "success",
             "message": f"Decision '{decision}' recorded successfully",
+            "decision_id": decision_id,
             "next_steps": {
                 "interested": "Founder will be notified. Meeting request sent.",
                 "pass": "Feedback shared with founder. Startup removed from active queue.",
@@ -472,32 +846,111 @@ def vc_decision():
         logger.error(f"VC decision error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+# Fields a submitted startup may carry into VC queues, as in data/startups.json
+STARTUP_TEXT_FIELDS = ('sector', 'stage', 'metrics', 'team', 'market_timing', 'next_steps', 'deck_url',
+                       'founder_linkedin')
+STARTUP_LIST_FIELDS = ('rationale', 'portfolio_synergy', 'risk_factors')
+
+def parse_thesis_score(value):
+    """A thesis score from a request body: an integer 0-100, else ValueError"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+        raise ValueError("thesis_score must be a number from 0 to 100")
+    return round(value)
+
+def parse_startup(data):
+    """(startup record, target industries) from a submission body, else ValueError"""
+    name = data.get('company_name')
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("company_name is required")
+    targets = data.get('target_industries')
+    if not isinstance(targets, list) or not targets or not all(isinstance(t, str) and t for t in targets):
+        raise ValueError("target_industries must be a non-empty list of industry names")
+    startup = {"company_name": name.strip(), "thesis_score": parse_thesis_score(data.get('thesis_score'))}
+    for field in STARTUP_TEXT_FIELDS:
+        if isinstance(data.get(field), str):
+            startup[field] = data[field]
+    for field in STARTUP_LIST_FIELDS:
+        if isinstance(data.get(field), list):
+            startup[field] = [str(item) for item in data[field]]
+    return startup, targets
+
+@app.route('/api/startups', methods=['POST'])
+def submit_startup():
+    """Add a startup to the pool; it enters the weekly queue of every VC in its target industries"""
+    try:
+        try:
+            startup, targets = parse_startup(request.json or {})
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        # Random 48-bit ids stay clear of the seed pool's and are exact as JSON numbers
+        startup['id'] = secrets.randbits(48) | (1 << 32)
+        record_event('startup_submitted', {"startup": startup, "target_industries": targets},
+                     prefix='startup', wait=True)
+        return jsonify({
+            "status": "success",
+            "startup": startup,
+            "target_industries": targets,
+            "timestamp": datetime.now().isoformat()
+        }), 201
+    except Exception as e:
+        logger.error(f"Startup submission error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/startups/<int:startup_id>/score', methods=['POST'])
+def rescore_startup(startup_id):
+    """Record an updated analysis score; only queues that show or would now admit the startup change"""
+    try:
+        try:
+            thesis_score = parse_thesis_score((request.json or {}).get('thesis_score'))
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        event_follower.catch_up()
+        if not vc_queues.has_startup(startup_id):
+            return jsonify({"status": "error", "message": "Unknown startup"}), 404
+        record_event('startup_rescored', {"startup_id": startup_id, "thesis_score": thesis_score},
+                     prefix='rescore', wait=True)
+        return jsonify({
+            "status": "success",
+            "startup_id": startup_id,
+            "thesis_score": thesis_score,
+            "timestamp": datetime.now().isoformat()
+        })
+    except Exception as e:
+        logger.error(f"Startup rescore error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def market_snapshot():
+    """Hot sectors, market trends and the latest live deals, shared by all workers for MARKET_CACHE_TTL"""
+    return shared_cache.get_or_compute('market', 'snapshot', build_market_snapshot, ttl=MARKET_CACHE_TTL)
+
+def build_market_snapshot():
+    live_deals = get_live_funding_news()
+    return {
+        'total_investors': 6042,
+        'active_deals': len(live_deals),
+        'hot_sectors': [
+            {'name': 'AI/ML', 'funding': 12.3, 'growth': 145, 'color': '#ef4444'},
+            {'name': 'Fintech', 'funding': 8.7, 'growth': 67, 'color': '#f97316'},
+            {'name': 'Healthcare', 'funding': 6.9, 'growth': 34, 'color': '#eab308'},
+            {'name': 'Climate', 'funding': 4.1, 'growth': 89, 'color': '#22c55e'},
+            {'name': 'SaaS', 'funding': 7.2, 'growth': 23, 'color': '#3b82f6'},
+            {'name': 'Consumer', 'funding': 3.8, 'growth': 12, 'color': '#8b5cf6'}
+        ],
+        'live_deals': live_deals,
+        'market_trends': {
+            'avg_deal_size': '$12.3M',
+            'time_to_close': '45 days',
+            'success_rate': '23%'
+        },
+        'last_updated': datetime.now().isoformat()
+    }
+
 @app.route('/api/market-intelligence', methods=['GET'])
+@response_cache.cached('market-intelligence')
 def market_intelligence():
     """Get real-time market intelligence data"""
     try:
-        # Get live funding news
-        live_deals = get_live_funding_news()
-        
-        data = {
-            'total_investors': 6042,
-            'active_deals': len(live_deals),
-            'hot_sectors': [
-                {'name': 'AI/ML', 'funding': 12.3, 'growth': 145, 'color': '#ef4444'},
-                {'name': 'Fintech', 'funding': 8.7, 'growth': 67, 'color': '#f97316'},
-                {'name': 'Healthcare', 'funding': 6.9, 'growth': 34, 'color': '#eab308'},
-                {'name': 'Climate', 'funding': 4.1, 'growth': 89, 'color': '#22c55e'},
-                {'name': 'SaaS', 'funding': 7.2, 'growth': 23, 'color': '#3b82f6'},
-                {'name': 'Consumer', 'funding': 3.8, 'growth': 12, 'color': '#8b5cf6'}
-            ],
-            'live_deals': live_deals,
-            'market_trends': {
-                'avg_deal_size': '$12.3M',
-                'time_to_close': '45 days',
-                'success_rate': '23%'
-            },
-            'last_updated': datetime.now().isoformat()
-        }
+        data = market_snapshot()
         
         return jsonify({
             "status": "success",
@@ -507,46 +960,159 @@ def market_intelligence():
         logger.error(f"Market intelligence error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def page_filtered_vcs(filters, limit, cursor, industry, funding_stage, view):
+    """Keyset page of funds passing range filters, resolved in memory then fetched pre-encoded"""
+    ids = get_catalog_ranges().matching(filters)
+    if industry:
+        ids &= match_index.industry_postings(industry)
+    if funding_stage:
+        ids &= match_index.stage_postings(funding_stage)
+    ids = sorted(ids)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    start = bisect.bisect_right(ids, cursor) if cursor is not None else 0
+    page_ids = ids[start:start + limit]
+    next_cursor = page_ids[-1] if start + limit < len(ids) else None
+    encoded = investor_store.get_many_encoded(page_ids, view=view)
+    return [encoded[fund_id] for fund_id in page_ids if fund_id in encoded], next_cursor, len(ids)
+
 @app.route('/api/vcs', methods=['GET'])
+@response_cache.cached('vcs', ttl=300)
 def get_vcs():
-    """Get complete VC database"""
+    """Get a page of the VC database, optionally filtered (incl. check/open-rate/founded ranges),
+    projected (fields=) and in compact shape"""
     try:
-        return jsonify({
-            "status": "success",
-            "vcs": REAL_VCS,
-            "total": len(REAL_VCS),
-            "last_updated": datetime.now().isoformat()
-        })
+        industry = request.args.get('industry')
+        funding_stage = request.args.get('stage')
+        fields = serialization.parse_fields(request.args.get('fields'))
+        view = request.args.get('view', 'full')
+        shape = request.args.get('shape', 'records')
+        if view not in ('full', 'summary') or shape not in ('records', 'compact'):
+            return jsonify({"status": "error", "message": "view must be full|summary and shape records|compact"}), 400
+        try:
+            limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+            cursor = request.args.get('cursor')
+            cursor = int(cursor) if cursor else None
+        except ValueError:
+            return jsonify({"status": "error", "message": "limit and cursor must be integers"}), 400
+        try:
+            filters = RangeFilters.parse(request.args)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        def build():
+            # Records are stored pre-encoded; the summary column covers the list view and most projections
+            use_summary = view == 'summary' or (fields is not None
+                                                and set(fields) <= set(serialization.SUMMARY_FIELDS))
+            stored_view = 'summary' if use_summary else 'payload'
+            if filters:
+                encoded, next_cursor, total = page_filtered_vcs(filters, limit, cursor, industry, funding_stage,
+                                                                stored_view)
+            else:
+                encoded, next_cursor = investor_store.page_encoded(limit=limit, cursor=cursor, industry=industry,
+                                                                   stage=funding_stage, view=stored_view)
+                total = investor_store.count(industry=industry, stage=funding_stage)
+            envelope = {
+                "status": "success",
+                "total": total,
+                "next_cursor": next_cursor,
+                "last_updated": datetime.now().isoformat()
+            }
+            
+            with stage('serialization'):
+                if fields is None and shape == 'records':
+                    body = serialization.splice(envelope, 'vcs', encoded)
+                else:
+                    records = [serialization.loads(payload) for payload in encoded]
+                    if fields is not None:
+                        records = [serialization.project(record, fields) for record in records]
+                    if shape == 'compact':
+                        columns = fields or list(dict.fromkeys(key for record in records for key in record))
+                        envelope["vcs"] = serialization.compact(records, columns)
+                    else:
+                        envelope["vcs"] = records
+                    body = serialization.dumps(envelope)
+            return body
+        
+        # Pages are shared across workers until the catalog changes (add/remove investor) or the TTL passes
+        key = tuple(sorted(request.args.items(multi=True)))
+        body = shared_cache.get_or_compute('vcs', key, build, ttl=VC_CACHE_TTL, version=sync_catalog())
+        return app.response_class(body, mimetype='application/json')
     except Exception as e:
         logger.error(f"VC database error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
 @app.route('/api/analyze-deck', methods=['POST'])
 def analyze_deck():
-    """Analyze uploaded pitch deck (mock for demo)"""
+    """Accept a pitch deck upload and queue it for analysis"""
+    spool = None
     try:
-        if 'deck_file' not in request.files:
-            return jsonify({"status": "error", "message": "No file uploaded"}), 400
+        started = time.perf_counter()
         
-        file = request.files['deck_file']
-        if file.filename == '':
-            return jsonify({"status": "error", "message": "No file selected"}), 400
+        if request.mimetype == 'application/pdf':
+            # Raw PDF body: spool it ourselves without touching the form parser
+            spool = spool_stream(request.stream, UPLOAD_SPOOL_DIR, max_bytes=app.config['MAX_CONTENT_LENGTH'])
+            upload, filename = spool, request.args.get('filename', 'deck.pdf')
+        else:
+            if 'deck_file' not in request.files:
+                return jsonify({"status": "error", "message": "No file uploaded"}), 400
+            
+            file = request.files['deck_file']
+            if file.filename == '':
+                return jsonify({"status": "error", "message": "No file selected"}), 400
+            upload, filename = file.stream, file.filename
         
-        # Mock analysis result based on demo company
-        analysis = generate_demo_company()
-        analysis["uploaded_filename"] = file.filename
-        analysis["processing_time"] = "28 seconds"
+        # Re-uploads of identical bytes are answered straight from the result cache
+        cached = analysis_cache.get(upload.hexdigest())
+        if cached is not None:
+            DECK_ANALYSES.inc(outcome='cache_hit')
+            analytics.record('analyses', label='cache_hit')
+            cached["uploaded_filename"] = filename
+            processing_time = round(time.perf_counter() - started, 3)
+            return jsonify({
+                "status": "success",
+                "analysis": cached,
+                "cache_hit": True,
+                "processing_time": processing_time,
+                "timestamp": datetime.now().isoformat()
+            })
+        
+        job_id = deck_jobs.submit(upload, filename)
+        spool = None  # the job queue owns the file now
+        DECK_ANALYSES.inc(outcome='queued')
         
         return jsonify({
-            "status": "success",
-            "analysis": analysis,
-            "processing_time": 28,
+            "status": "queued",
+            "job_id": job_id,
+            "status_url": f"/api/analyze-deck/{job_id}",
+            "cache_hit": False,
             "timestamp": datetime.now().isoformat()
-        })
+        }), 202
         
+    except QueueFull as e:
+        response = jsonify({"status": "error", "message": str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         logger.error(f"Deck analysis error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
+    finally:
+        if spool is not None:
+            spool.discard()
+
+@app.route('/api/analyze-deck/<job_id>', methods=['GET'])
+def analyze_deck_status(job_id):
+    """Report progress, and the analysis once finished, for a deck job"""
+    job = deck_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown job id"}), 404
+    
+    return jsonify({
+        "status": "success",
+        "job": {key: value for key, value in job.items() if key != 'result'},
+        "analysis": job['result'],
+        "processing_time": job['processing_time'],
+        "timestamp": datetime.now().isoformat()
+    })
 
 @app.route('/api/find-matches', methods=['POST'])
 def find_matches():
@@ -554,13 +1120,19 @@ def find_matches():
     try:
         data = request.json
         analysis = data.get('analysis', {})
+        try:
+            filters = RangeFilters.parse(data.get('filters') or {}, strict=True)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
         
-        matches = find_vc_matches(analysis)
+        matches = find_vc_matches(analysis, filters=filters)
+        analytics.record('matches', len(matches), label='single')
         
         return jsonify({
             "status": "success",
             "matches": matches,
             "total_matches": len(matches),
+            "filters": filters.to_dict(),
             "timestamp": datetime.now().isoformat()
         })
         
@@ -568,6 +1140,177 @@ def find_matches():
         logger.error(f"Match finding error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/find-matches/batch', methods=['POST'])
+def find_matches_batch():
+    """Score many companies against every VC in one vectorized pass"""
+    try:
+        data = request.json or {}
+        companies = data.get('companies', [])
+        if not isinstance(companies, list) or not companies or not all(isinstance(c, dict) for c in companies):
+            return jsonify({"status": "error", "message": "companies must be a non-empty list of objects"}), 400
+        if len(companies) > MAX_BATCH_COMPANIES:
+            return jsonify({"status": "error", "message": f"At most {MAX_BATCH_COMPANIES} companies per batch"}), 400
+        try:
+            k = max(1, min(int(data.get('k', 3)), MAX_BATCH_K))
+        except (TypeError, ValueError):
+            return jsonify({"status": "error", "message": "k must be an integer"}), 400
+        seed = data.get('seed')
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+            return jsonify({"status": "error", "message": "seed must be a non-negative integer or null"}), 400
+        with stage('matching'):
+            results = get_batch_scorer().match(companies, k=k, seed=seed)
+        analytics.record('matches', sum(len(matches) for matches in results), label='batch', count=len(companies))
+        
+        return jsonify({
+            "status": "success",
+            "results": [
+                {"company_name": company.get('company_name'), "matches": matches}
+                for company, matches in zip(companies, results)
+            ],
+            "total_companies": len(companies),
+            "seed": seed,
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        logger.error(f"Batch match error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/generate-report', methods=['POST'])
+def generate_report():
+    """Stream a report of an analysis, its top VC matches and the market; rendered once per distinct input"""
+    try:
+        data = request.json or {}
+        fmt = (request.args.get('format') or data.get('format') or 'pdf').lower()
+        if fmt not in REPORT_FORMATS:
+            return jsonify({"status": "error", "message": f"format must be one of {', '.join(REPORT_FORMATS)}"}), 400
+        try:
+            top = max(1, min(int(data.get('top', 10)), MAX_REPORT_MATCHES))
+            filters = RangeFilters.parse(data.get('filters') or {}, strict=True)
+        except (TypeError, ValueError) as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        # Prefer a finished analysis the caller already has; otherwise reuse a cached one
+        analysis = data.get('analysis_data') or data.get('analysis')
+        if not analysis and data.get('job_id'):
+            job = deck_jobs.get(data['job_id'])
+            analysis = job['result'] if job else None
+        if not analysis and data.get('file_sha256'):
+            analysis = analysis_cache.get(data['file_sha256'])
+        if not analysis:
+            return jsonify({"status": "error", "message": "No analysis data available"}), 400
+        
+        company_name = data.get('company_name') or analysis.get('company_name')
+        persona = data.get('persona')
+        market = market_snapshot()
+        # Everything the report depends on; matches are derived from these and the catalog version
+        inputs = {
+            "analysis": analysis,
+            "company_name": company_name,
+            "persona": persona,
+            "top": top,
+            "filters": filters.to_dict(),
+            "index_version": sync_catalog(),
+            "market": [market['hot_sectors'], [deal.get('title') for deal in market['live_deals']]]
+        }
+        
+        def build():
+            matches = find_vc_matches(analysis, k=top, filters=filters)
+            return build_report(analysis, matches, market, company_name=company_name, persona=persona)
+        
+        key, body, reused = report_engine.stream(inputs, fmt, build, size=top)
+        _, mimetype, extension = REPORT_FORMATS[fmt]
+        filename = re.sub(r'[^A-Za-z0-9]+', '_', company_name or 'VentureSync').strip('_') or 'VentureSync'
+        response = Response(body, mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}_Report.{extension}"'
+        response.headers['X-Report-Key'] = key
+        response.headers['X-Report-Cached'] = 'true' if reused else 'false'
+        return response
+        
+    except Exception as e:
+        logger.error(f"Report generation error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/allocations', methods=['POST'])
+def run_allocation():
+    """Start a capacity-capped allocation of founders to VCs over the whole startup pool (or posted founders)"""
+    try:
+        data = request.json or {}
+        founders = data.get('founders')
+        source = 'request'
+        if founders is None:
+            founders, source = vc_queues.startups(), 'startup_pool'
+        if not isinstance(founders, list) or not founders or not all(isinstance(f, dict) for f in founders):
+            return jsonify({"status": "error", "message": "founders must be a non-empty list of objects"}), 400
+        if len(founders) > MAX_ALLOCATION_FOUNDERS:
+            return jsonify({"status": "error", "message": f"At most {MAX_ALLOCATION_FOUNDERS} founders per run"}), 400
+        # Pairs are stored and looked up by founder id, so each founder needs its own
+        ids = [founder.get('id') for founder in founders]
+        if any(isinstance(i, bool) or not isinstance(i, (int, str)) for i in ids) or len({str(i) for i in ids}) < len(ids):
+            return jsonify({"status": "error", "message": "every founder needs a unique integer or string id"}), 400
+        try:
+            params = {
+                "quota": max(1, int(data.get('intros_per_founder', ALLOCATION_INTROS_PER_FOUNDER))),
+                "capacity": max(0, int(data.get('weekly_cap', ALLOCATION_WEEKLY_CAP))),
+                "capacities": {str(int(vc_id)): max(0, int(cap))
+                               for vc_id, cap in (data.get('capacities') or {}).items()},
+                "candidates": max(1, min(int(data.get('candidates', ALLOCATION_CANDIDATES)), 200)),
+            }
+        except (AttributeError, TypeError, ValueError) as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+        
+        run_id, started = allocations.submit(get_batch_scorer(), founders, params, source=source)
+        return jsonify({
+            "status": "success",
+            "run_id": run_id,
+            "started": started,
+            "message": "Allocation started" if started else "An allocation is already running",
+            "status_url": f"/api/allocations/{run_id}",
+            "timestamp": datetime.now().isoformat()
+        }), 202
+        
+    except Exception as e:
+        logger.error(f"Allocation error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/api/allocations/<run_id>', methods=['GET'])
+def allocation_result(run_id):
+    """A run's status and summary with one VC's intake (?vc_id=), one founder's VCs (?founder_id=) or a page of pairs"""
+    try:
+        run = allocations.store.get(None if run_id == 'latest' else run_id)
+        if run is None:
+            return jsonify({"status": "error", "message": "Unknown allocation"}), 404
+        
+        response = {"status": "success", "allocation": run}
+        if run['status'] == 'complete':
+            store, run_id = allocations.store, run['run_id']
+            try:
+                if request.args.get('vc_id'):
+                    vc_id = int(request.args['vc_id'])
+                    response['vc_id'] = vc_id
+                    response['founders'] = store.for_vc(run_id, vc_id)
+                elif request.args.get('founder_id'):
+                    founder_id = request.args['founder_id']
+                    founder_id = int(founder_id) if founder_id.isdigit() else founder_id
+                    vcs = store.for_founder(run_id, founder_id)
+                    names = investor_store.get_many(vc['vc_id'] for vc in vcs)
+                    for vc in vcs:
+                        vc['vc_name'] = (names.get(vc['vc_id']) or {}).get('name')
+                    response['founder_id'] = founder_id
+                    response['vcs'] = vcs
+                else:
+                    limit = max(1, min(int(request.args.get('limit', 100)), 1000))
+                    cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+                    response['pairs'], response['next_cursor'] = store.page(run_id, limit, cursor)
+            except ValueError as e:
+                return jsonify({"status": "error", "message": str(e)}), 400
+        response['timestamp'] = datetime.now().isoformat()
+        return jsonify(response)
+        
+    except Exception as e:
+        logger.error(f"Allocation lookup error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @app.route('/api/intro-request', methods=['POST'])
 def intro_request():
     """Handle introduction requests with AI-generated email"""
@@ -577,15 +1320,21 @@ def intro_request():
         # Log the introduction request
         logger.info(f"Introduction request: {data.get('founder_email')} -> {data.get('vc_name')}")
         
-        # In production, this would:
-        # 1. Send the AI-generated email
-        # 2. Store the request in database
-        # 3. Set up follow-up tracking
+        payload = {
+            "founder_email": data.get('founder_email'),
+            "vc_name": data.get('vc_name'),
+            "vc_id": data.get('vc_id')
+        }
+        request_id = record_event('intro_request', payload, prefix='intro', wait=True, secret_id=True)
+        deliver_intro(request_id, {**payload, "subject": data.get('subject'), "body": data.get('email_body')})
         
         return jsonify({
             "status": "success",
             "message": "Introduction request submitted successfully",
-            "request_id": f"intro_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            "request_id": request_id,
+            # Lets this founder follow the request's status on their founder:<email> room
+            "subscribe_token": room_grants.issue([f"founder:{payload['founder_email']}"])
+            if payload['founder_email'] else None,
             "expected_response_time": "48-72 hours",
             "timestamp": datetime.now().isoformat()
         })
@@ -594,36 +1343,169 @@ def intro_request():
         logger.error(f"Intro request error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/api/intro-request/<request_id>', methods=['GET'])
+def intro_request_status(request_id):
+    """Look up a previously submitted introduction request"""
+    intro = intro_store.get(request_id)
+    if intro is None:
+        return jsonify({"status": "error", "message": "Unknown request id"}), 404
+    return jsonify({"status": "success", "intro": intro})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         "status": "healthy",
         "version": "2.0.0",
-        "uptime": "99.9%",
+        "uptime_seconds": uptime_seconds(),
         "timestamp": datetime.now().isoformat()
     })
 
 @app.route('/api/status', methods=['GET'])
+@response_cache.cached('status', ttl=5)
 def system_status():
-    """System status with real-time metrics"""
+    """System status with this worker's counters since it started"""
+    requests_served = REQUEST_LATENCY.count()
+    server_errors = REQUEST_LATENCY.count(lambda labels: labels['status'].startswith('5'))
     return jsonify({
         "status": "operational",
         "services": {
             "api": "healthy",
             "database": "healthy", 
             "ai_analysis": "healthy",
-            "market_feeds": "healthy"
+            "market_feeds": "degraded" if "open" in news_aggregator.source_status().values() else "healthy"
         },
         "metrics": {
-            "active_users": 1247,
-            "analyses_today": 89,
-            "intros_sent": 156,
-            "success_rate": "89%"
+            "uptime_seconds": uptime_seconds(),
+            "warmup_seconds": round(sum(warmup_seconds.values()), 3),
+            "requests_served": requests_served,
+            "analyses_completed": DECK_ANALYSES.value(outcome='complete') + DECK_ANALYSES.value(outcome='cache_hit'),
+            "analyses_failed": DECK_ANALYSES.value(outcome='failed'),
+            "intros_sent": INTRO_REQUESTS.value(),
+            "decisions_recorded": VC_DECISIONS.value(),
+            "success_rate": f"{round(100 * (1 - server_errors / requests_served), 1)}%" if requests_served else None
         },
         "timestamp": datetime.now().isoformat()
     })
 
+def conversion(numerator, denominator):
+    return {"from": denominator, "to": numerator,
+            "conversion_rate": f"{round(100 * numerator / denominator)}%" if denominator else None}
+
+FUNNEL_METRICS = ('analyses', 'matches', 'intros', 'decisions')
+
+def analytics_summary(totals=None):
+    """Funnel totals and conversion rates, as served by /api/analytics-dashboard and pushed to the analytics room"""
+    totals = analytics.totals() if totals is None else totals
+    counts = {metric: sum(row['count'] for row in labels.values()) for metric, labels in totals.items()}
+    analyses = totals.get('analyses', {})
+    decisions = totals.get('decisions', {})
+    intros = totals.get('intros', {})
+    analyses_done = sum(analyses.get(label, {}).get('count', 0) for label in ('complete', 'cache_hit'))
+    intros_requested = intros.get('requested', {}).get('count', 0)
+    interested = sum(decisions.get(label, {}).get('count', 0) for label in ('interested', 'schedule_meeting'))
+    return {
+        "totals": {
+            metric: {"count": counts.get(metric, 0),
+                     "by_label": {label: row['count'] for label, row in totals.get(metric, {}).items()}}
+            for metric in FUNNEL_METRICS
+        },
+        "conversion_metrics": {
+            "analysis_to_match": conversion(counts.get('matches', 0), analyses_done),
+            "match_to_intro": conversion(intros_requested, counts.get('matches', 0)),
+            "intro_to_interest": conversion(interested, intros_requested)
+        },
+        # Revenue and market sizing aren't tracked by the platform; the dashboard keeps its static copy
+        "ltv_by_persona": {},
+        "market_intelligence": {"tracked_investors": len(match_index), "active_deals": len(get_live_funding_news())}
+    }
+
+def publish_analytics(metrics):
+    """Push a fresh summary once funnel counts change; response timings alone don't move it"""
+    if not metrics.isdisjoint(FUNNEL_METRICS):
+        broadcaster.publish('analytics', 'summary', analytics_summary())
+
+analytics.on_flush = publish_analytics
+
+@app.route('/api/analytics-dashboard', methods=['GET'])
+@response_cache.cached('analytics-dashboard', ttl=10)
+def analytics_dashboard():
+    """Platform activity from the incremental rollups: totals, funnel and per-minute/hour/day series"""
+    resolution = request.args.get('resolution')
+    if resolution and resolution not in RESOLUTIONS:
+        return jsonify({"status": "error", "message": f"resolution must be one of {', '.join(RESOLUTIONS)}"}), 400
+    resolutions = [resolution] if resolution else list(RESOLUTIONS)
+    
+    totals = analytics.totals()
+    summary = analytics_summary(totals)
+    response_ms = totals.get('response_ms', {})
+    response_count = sum(row['count'] for row in response_ms.values())
+    last_hour = analytics.series('minute', 'response_ms')
+    last_hour_count = sum(bucket['count'] for bucket in last_hour)
+    
+    return jsonify({
+        "status": "success",
+        "totals": summary["totals"],
+        "conversion_metrics": summary["conversion_metrics"],
+        "response_time": {
+            "avg_ms": round(sum(row['total'] for row in response_ms.values()) / response_count, 2) if response_count else None,
+            "last_hour_avg_ms": round(sum(bucket['total'] for bucket in last_hour) / last_hour_count, 2) if last_hour_count else None,
+            "requests": response_count
+        },
+        "series": {
+            resolution: {metric: analytics.series(resolution, metric)
+                         for metric in ('analyses', 'matches', 'intros', 'decisions', 'response_ms')}
+            for resolution in resolutions
+        },
+        "ltv_by_persona": summary["ltv_by_persona"],
+        "market_intelligence": summary["market_intelligence"],
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/updates', methods=['GET'])
+def poll_updates():
+    """Polling fallback for the push channel: deltas since a sequence number
+
+    vc:<id> and founder:<email> rooms need the subscribe_token their owner was issued (?token=).
+    """
+    try:
+        rooms = room_grants.authorize(rooms_for({
+            "market": request.args.get('market'),
+            "analytics": request.args.get('analytics'),
+            "vc_id": request.args.get('vc_id'),
+            "founder_id": request.args.get('founder_id'),
+            "rooms": [room for room in request.args.get('rooms', '').split(',') if room]
+        }), request.args.get('token'))
+    except RoomDenied as e:
+        return jsonify({"status": "error", "message": str(e)}), 403
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"status": "error", "message": "since must be an integer"}), 400
+    
+    deltas, resync, seq = broadcaster.since(since, rooms)
+    response = {"status": "success", "seq": seq, "rooms": rooms, "deltas": deltas}
+    if since == 0 or resync:
+        response["states"], _ = broadcaster.snapshot(rooms)
+        response["deltas"] = []
+    return jsonify(response)
+
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Response and shared cache hit/miss counters for this worker"""
+    return jsonify({
+        "status": "success",
+        "response_cache": response_cache.stats(),
+        "shared_cache": shared_cache.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Latency histograms and counters for this worker in Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    socketio.run(app, host='0.0.0.0', port=port, debug=False, allow_unsafe_werkzeug=True)
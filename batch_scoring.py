@@ -0,0 +1,130 @@
+import numpy as np
+
+from matching import (INDUSTRIES, REGIONS, STAGES, Investor, explanation, parse_money, rationale, region_mask,
+                      sector_mask, stage_mask)
+
+BASE_SCORE = 85
+SECTOR_BONUS = 8
+STAGE_BONUS = 5
+MAX_SCORE = 98
+JITTER = 3
+# Cells (companies x funds) scored per numpy pass, bounding memory at any batch size
+CHUNK_CELLS = 1 << 21
+
+
+def _bits(mask, width):
+    """Unpack an int bitmask into a 0/1 row of the given width"""
+    row = np.zeros(width, dtype=np.float32)
+    code = 0
+    while mask and code < width:
+        if mask & 1:
+            row[code] = 1
+        mask >>= 1
+        code += 1
+    return row
+
+
+class BatchScorer:
+    """Vectorized company x VC compatibility scoring over one-hot feature matrices"""
+
+    def __init__(self, funds):
+        investors = [Investor.from_record(fund) for fund in funds]
+        self.fund_ids = np.array([investor.id for investor in investors], dtype=np.int64)
+        self.fund_names = [investor.name for investor in investors]
+
+        # Columns are the interned vocabulary codes, so the parsed bitmasks map straight onto them
+        self.n_industries, self.n_stages, self.n_regions = len(INDUSTRIES), len(STAGES), len(REGIONS)
+        n = len(investors)
+        self.vc_industry = np.zeros((n, self.n_industries), dtype=np.float32)
+        self.vc_stage = np.zeros((n, self.n_stages), dtype=np.float32)
+        self.vc_region = np.zeros((n, self.n_regions), dtype=np.float32)
+        self.vc_check_min = np.zeros(n, dtype=np.float64)
+        self.vc_check_max = np.full(n, np.inf, dtype=np.float64)
+        self.vc_open_rate = np.full(n, np.nan, dtype=np.float64)
+        for row, investor in enumerate(investors):
+            self.vc_industry[row] = _bits(investor.industry_mask, self.n_industries)
+            self.vc_stage[row] = _bits(investor.stage_mask, self.n_stages)
+            self.vc_region[row] = _bits(investor.region_mask, self.n_regions)
+            if investor.check_min is not None:
+                self.vc_check_min[row], self.vc_check_max[row] = investor.check_min, investor.check_max
+            if investor.open_rate is not None:
+                self.vc_open_rate[row] = investor.open_rate
+
+    def encode_companies(self, companies):
+        """Encode company analyses as (sector, stage, region, check size) matrices"""
+        m = len(companies)
+        sector = np.zeros((m, self.n_industries), dtype=np.float32)
+        stage = np.zeros((m, self.n_stages), dtype=np.float32)
+        region = np.zeros((m, self.n_regions), dtype=np.float32)
+        check_size = np.full(m, np.nan, dtype=np.float64)
+        for row, company in enumerate(companies):
+            sector[row] = _bits(sector_mask(company.get("sector", "AI/ML")), self.n_industries)
+            stage[row] = _bits(stage_mask(company.get("funding_stage", "Series A")), self.n_stages)
+            region[row] = _bits(region_mask(company.get("geography")), self.n_regions)
+            amount = parse_money(company.get("funding_amount"))
+            if amount is not None:
+                check_size[row] = amount
+        return sector, stage, region, check_size
+
+    def signals(self, sector, stage, region, check_size):
+        """(sector, stage, region, check size) boolean matrices of encoded companies x funds"""
+        amounts = check_size[:, None]
+        return ((sector @ self.vc_industry.T) > 0, (stage @ self.vc_stage.T) > 0,
+                (region @ self.vc_region.T) > 0, (amounts >= self.vc_check_min) & (amounts <= self.vc_check_max))
+
+    def score(self, companies, seed=None, rng=None):
+        """Return (compatibility, rank) matrices of shape (len(companies), len(funds))"""
+        return self._score(self.signals(*self.encode_companies(companies)), seed, rng)
+
+    def _score(self, signals, seed=None, rng=None):
+        sector_match, stage_match, region_match, check_match = signals
+        rng = rng if rng is not None else np.random.default_rng(seed)
+        jitter = rng.integers(-JITTER, JITTER + 1, size=sector_match.shape)
+        compatibility = np.minimum(
+            BASE_SCORE + SECTOR_BONUS * sector_match + STAGE_BONUS * stage_match + jitter, MAX_SCORE
+        ).astype(np.int16)
+        # Geography and check size only break ties between equal compatibility scores
+        rank = compatibility + 0.1 * region_match + 0.1 * check_match
+        return compatibility, rank
+
+    def top_k(self, rank, k=3):
+        """Column indexes of the k best funds per row, best first"""
+        k = min(k, rank.shape[1])
+        if k <= 0:
+            return np.empty((rank.shape[0], 0), dtype=np.int64)
+        part = np.argpartition(-rank, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(rank, part, axis=1), axis=1, kind="stable")
+        return np.take_along_axis(part, order, axis=1)
+
+    def match(self, companies, k=3, seed=None):
+        """Score companies against every fund and return top-k matches per company
+
+        Companies are scored a chunk of rows at a time, so memory stays at CHUNK_CELLS cells
+        however many companies are passed. Each match carries the same rationale and explanation
+        as /api/find-matches; thesis similarity is not computed here, so it is not among the reasons.
+        """
+        rng = np.random.default_rng(seed)
+        rows_per_pass = max(1, CHUNK_CELLS // max(len(self.fund_ids), 1))
+        results = []
+        for start in range(0, len(companies), rows_per_pass):
+            chunk = companies[start:start + rows_per_pass]
+            signals = self.signals(*self.encode_companies(chunk))
+            compatibility, rank = self._score(signals, rng=rng)
+            sector_match, stage_match, region_match, check_match = signals
+            for row, cols in enumerate(self.top_k(rank, k)):
+                sector, stage = chunk[row].get("sector", "AI/ML"), chunk[row].get("funding_stage", "Series A")
+                matches = []
+                for col in cols:
+                    name = self.fund_names[col]
+                    fund_signals = {"sector": bool(sector_match[row, col]), "stage": bool(stage_match[row, col]),
+                                    "geography": bool(region_match[row, col]),
+                                    "check_size": bool(check_match[row, col])}
+                    matches.append({
+                        "vc_id": int(self.fund_ids[col]),
+                        "vc_name": name,
+                        "compatibility": int(compatibility[row, col]),
+                        "rationale": rationale(name, fund_signals, sector, stage),
+                        "explanation": explanation(name),
+                    })
+                results.append(matches)
+        return results
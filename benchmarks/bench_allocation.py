@@ -0,0 +1,85 @@
+"""Global founder<->VC allocation at up to 10^5 founders x 10^4 funds.
+
+    python -m benchmarks.bench_allocation --founders 100000 --funds 10000
+    python -m benchmarks.bench_allocation --founders 2000 --funds 300 --verify
+
+Reports the run time and load spread against the uncapacitated greedy baseline; --verify
+scores every founder/fund pair densely and counts blocking pairs (0 means stable), so keep
+it to small populations.
+"""
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+
+from allocation import _Fits, allocate, founder_profile, founder_quality
+from batch_scoring import BatchScorer
+from benchmarks import corpus
+from benchmarks.report import (compare, load_baseline, peak_rss_mb, print_comparison, print_results,
+                               save_baseline, summarize)
+
+SUITE = "allocation"
+
+
+def founders(n, seed):
+    rng = random.Random(seed + 3)
+    return [dict(company, id=i, confidence_score=round(rng.uniform(0.5, 0.99), 2))
+            for i, company in enumerate(corpus.companies(n, seed), 1)]
+
+
+def blocking_pairs(scorer, population, pairs, quota, capacity):
+    """Founder/fund pairs that would both rather be matched to each other than keep their allocation"""
+    fits = _Fits(scorer, [founder_profile(f) for f in population])
+    fit, acceptable, preference = fits.rows(range(len(population)))
+    quality = np.array([founder_quality(f) - i * 1e-9 for i, f in enumerate(population)])
+    fund_score = fit + quality[:, None]
+    matched = np.zeros_like(acceptable)
+    for i, col, _, _ in pairs:
+        matched[i, col] = True
+    # A founder's worst held preference (-inf with a free slot); a fund's worst held score likewise
+    held_pref = np.where(matched, preference, np.inf)
+    founder_bar = np.where(matched.sum(axis=1) < quota, -np.inf, held_pref.min(axis=1))
+    held_score = np.where(matched, fund_score, np.inf)
+    fund_bar = np.where(matched.sum(axis=0) < capacity, -np.inf, held_score.min(axis=0))
+    blocking = (acceptable & ~matched & (preference > founder_bar[:, None]) & (fund_score > fund_bar[None, :]))
+    return int(blocking.sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--founders", type=int, default=10 ** 5)
+    parser.add_argument("--funds", type=int, default=10 ** 4)
+    parser.add_argument("--quota", type=int, default=3)
+    parser.add_argument("--capacity", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verify", action="store_true", help="count blocking pairs with a dense check")
+    parser.add_argument("--save", metavar="NAME", help="store results as benchmarks/baselines/allocation-NAME.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline name or path to compare against")
+    args = parser.parse_args()
+
+    scorer = BatchScorer(corpus.investors(args.funds, args.seed))
+    population = founders(args.founders, args.seed)
+    started = time.perf_counter()
+    pairs, stats = allocate(scorer, population, quota=args.quota, capacity=args.capacity,
+                            candidates=args.candidates)
+    elapsed = time.perf_counter() - started
+    for key, value in stats.items():
+        print(f"{key:28} {value}", file=sys.stderr)
+    if args.verify:
+        print(f"{'blocking_pairs':28} {blocking_pairs(scorer, population, pairs, args.quota, args.capacity)}",
+              file=sys.stderr)
+
+    name = f"allocate@{args.founders}x{args.funds}"
+    results = {name: dict(summarize([elapsed], elapsed), peak_rss_mb=peak_rss_mb())}
+    print_results(results)
+    if args.save:
+        print(f"saved {save_baseline(SUITE, args.save, results)}")
+    if args.compare and print_comparison(compare(load_baseline(args.compare, SUITE), results)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
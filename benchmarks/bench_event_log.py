@@ -0,0 +1,66 @@
+"""Sustained append throughput for the decision/intro event log.
+
+    python -m benchmarks.bench_event_log --threads 8 --events 20000
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from event_log import EventLog, replay
+
+
+def run(threads, events, flush_interval, flush_bytes, wait):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "events.log")
+        log = EventLog(path, flush_bytes=flush_bytes, flush_interval=flush_interval)
+        per_thread = events // threads
+        ids = [None] * threads
+
+        def worker(n):
+            seen = []
+            for i in range(per_thread):
+                record = log.append("vc_decision", {"vc_id": n, "startup_id": i, "decision": "pass"},
+                                    prefix="decision", wait=wait)
+                seen.append(record["id"])
+            ids[n] = seen
+
+        started = time.perf_counter()
+        pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        log.flush()
+        elapsed = time.perf_counter() - started
+
+        total = per_thread * threads
+        all_ids = [event_id for seen in ids for event_id in seen]
+        replayed = sum(1 for _ in replay(path))
+        return {
+            "events": total,
+            "seconds": round(elapsed, 3),
+            "events_per_second": round(total / elapsed),
+            "fsyncs": log.flushes,
+            "events_per_fsync": round(total / max(log.flushes, 1), 1),
+            "unique_ids": len(set(all_ids)) == total,
+            "replayed": replayed,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    parser.add_argument("--flush-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--wait", action="store_true", help="block each append until its group commit lands")
+    args = parser.parse_args()
+    result = run(args.threads, args.events, args.flush_interval, args.flush_bytes, args.wait)
+    for key, value in result.items():
+        print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
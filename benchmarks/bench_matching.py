@@ -0,0 +1,141 @@
+"""Microbenchmarks for matching, batch scoring and VC queue maintenance at 10^2..10^6 investors.
+
+    python -m benchmarks.bench_matching --scales 100,10000,1000000 --save local
+    python -m benchmarks.bench_matching --compare local
+
+Each scale runs in its own interpreter so peak RSS is attributable to that scale.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import corpus
+from benchmarks.report import (compare, load_baseline, peak_rss_mb, print_comparison, print_results,
+                               save_baseline, summarize, timed)
+
+SUITE = "matching"
+
+
+def run_scale(scale, startups, iterations, batch, seed):
+    """Benchmark one corpus size in this process"""
+    from batch_scoring import BatchScorer
+    from investor_store import InvestorStore
+    from matching import MatchIndex
+    from vc_queues import QueueMaterializer
+
+    results = {}
+    rng = random.Random(seed)
+    queries = corpus.companies(iterations, seed)
+
+    def record(name, latencies, elapsed):
+        results[f"{name}@{scale}"] = summarize(latencies, elapsed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vcs_path, _ = corpus.write_corpus(tmp, scale, 0, seed)
+
+        store = InvestorStore(os.path.join(tmp, "investors.db"), seed_path=vcs_path)
+        started = time.perf_counter()
+        store.count()
+        record("store_seed", [time.perf_counter() - started], time.perf_counter() - started)
+
+        started = time.perf_counter()
+        index = MatchIndex(store.iter_all())
+        record("index_build", [time.perf_counter() - started], time.perf_counter() - started)
+
+        it = iter(queries)
+
+        def top_k():
+            q = next(it)
+            index.top_k(q["sector"], q["funding_stage"], geography=q["geography"],
+                        check_size=q["funding_amount"], k=3)
+        record("index_top_k", *timed(top_k, iterations))
+
+        ids = [rng.randint(1, scale) for _ in range(iterations * 3)]
+        pos = iter(range(0, len(ids), 3))
+
+        def get_many():
+            i = next(pos)
+            store.get_many(ids[i:i + 3])
+        record("store_get_many", *timed(get_many, iterations))
+
+        record("store_page", *timed(lambda: store.page(limit=50, cursor=rng.randint(0, scale),
+                                                       industry=rng.choice(corpus.INDUSTRIES)), iterations))
+
+        started = time.perf_counter()
+        scorer = BatchScorer(store.iter_all())
+        record("batch_build", [time.perf_counter() - started], time.perf_counter() - started)
+        companies = queries[:batch]
+        record(f"batch_match_{batch}", *timed(lambda: scorer.match(companies, k=3, seed=seed),
+                                               max(iterations // 100, 3)))
+        del scorer
+
+        queues = QueueMaterializer(index)
+        pool = list(corpus.startups(startups, seed))
+        adds = iter(pool)
+
+        def add_startup():
+            startup = next(adds)
+            queues.add_startup(startup, startup.pop("target_industries"))
+        record("queue_add_startup", *timed(add_startup, len(pool)))
+
+        record("queue_rescore", *timed(
+            lambda: queues.rescore_startup(rng.randint(1, startups), rng.randint(50, 99)), iterations))
+        record("queue_read", *timed(lambda: queues.queue(rng.randint(1, scale)), iterations))
+        record("queue_pass", *timed(
+            lambda: queues.remove_from_queue(rng.randint(1, scale), rng.randint(1, startups)), iterations))
+
+    rss = peak_rss_mb()
+    for row in results.values():
+        row["peak_rss_mb"] = rss
+    return results
+
+
+def run(scales, startups, iterations, batch, seed):
+    """Run every scale in a fresh interpreter and merge the results"""
+    results = {}
+    for scale in scales:
+        command = [sys.executable, "-m", "benchmarks.bench_matching", "--scale-worker", str(scale),
+                   "--startups", str(startups), "--iterations", str(iterations),
+                   "--batch", str(batch), "--seed", str(seed)]
+        worker = subprocess.run(command, capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        if worker.returncode:
+            sys.stderr.write(worker.stderr)
+            raise SystemExit(f"scale {scale} failed with exit status {worker.returncode}")
+        results.update(json.loads(worker.stdout.splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default=",".join(str(s) for s in corpus.SCALES))
+    parser.add_argument("--startups", type=int, default=200, help="startups pushed through the queue materializer")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=32, help="companies per batch scoring call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME", help="store results as benchmarks/baselines/matching-NAME.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline name or path to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument("--scale-worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scale_worker:
+        results = run_scale(args.scale_worker, args.startups, args.iterations, args.batch, args.seed)
+        print(json.dumps(results))
+        return
+
+    results = run([int(s) for s in args.scales.split(",")], args.startups, args.iterations, args.batch, args.seed)
+    print_results(results)
+    if args.save:
+        print(f"saved {save_baseline(SUITE, args.save, results)}")
+    if args.compare and print_comparison(compare(load_baseline(args.compare, SUITE), results, args.threshold)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Outbound client against local stand-in servers: pooling, retries and hedging.
+
+    python -m benchmarks.bench_outbound --requests 500 --threads 8
+
+Three stand-ins run on loopback: a fast endpoint, one with a slow tail (a fraction of
+requests stall), and a flaky one that answers 503 with Retry-After: 0 to every third
+request. Each scenario is run with the shared pooled client and with its feature off.
+"""
+import argparse
+import itertools
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+import outbound
+from benchmarks import report
+
+
+class StandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+    disable_nagle_algorithm = True
+    tail_fraction = 0.05
+    tail_seconds = 0.2
+    counter = itertools.count()
+
+    def _reply(self, status, body=b'{"ok":true}', headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.handle_path()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.handle_path()
+
+    def handle_path(self):
+        if self.path.startswith("/tail") and random.random() < self.tail_fraction:
+            time.sleep(self.tail_seconds)
+        if self.path.startswith("/flaky") and next(self.counter) % 3 == 0:
+            return self._reply(503, b'{"error":"busy"}', [("Retry-After", "0")])
+        self._reply(200)
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # clients dropping pooled connections at exit are expected
+
+
+def serve():
+    server = StandInServer(("127.0.0.1", 0), StandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def drive(send, url, requests, threads):
+    """Issue requests concurrently; returns a report.summarize() row"""
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal errors
+        t0 = time.perf_counter()
+        try:
+            ok = send(url).status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(requests)))
+    return report.summarize(latencies, time.perf_counter() - started, errors)
+
+
+def fresh_connection(url):
+    with httpx.Client(timeout=10) as client:
+        return client.get(url)
+
+
+def run(requests, threads, hedge_ms):
+    server, base = serve()
+    no_retry = outbound.RetryPolicy(attempts=1)
+    pooled = outbound.build_client(retry=no_retry)
+    retrying = outbound.build_client(retry=outbound.RetryPolicy(attempts=3, backoff=0.01))
+    hedged = outbound.build_client(retry=no_retry, hedge_after=hedge_ms / 1000)
+    try:
+        return {
+            "fast/fresh-connection": drive(fresh_connection, f"{base}/fast", requests, threads),
+            "fast/pooled": drive(pooled.get, f"{base}/fast", requests, threads),
+            "tail/pooled": drive(pooled.get, f"{base}/tail", requests, threads),
+            "tail/hedged": drive(hedged.get, f"{base}/tail", requests, threads),
+            "flaky/no-retry": drive(pooled.get, f"{base}/flaky", requests, threads),
+            "flaky/retry": drive(retrying.get, f"{base}/flaky", requests, threads),
+        }
+    finally:
+        for client in (pooled, retrying, hedged):
+            client.close()
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--hedge-ms", type=float, default=20.0)
+    parser.add_argument("--save", metavar="NAME", help="write results as baseline NAME")
+    parser.add_argument("--compare", metavar="NAME", help="compare against baseline NAME (or a path)")
+    args = parser.parse_args()
+    results = run(args.requests, args.threads, args.hedge_ms)
+    report.print_results(results)
+    if args.save:
+        print(f"saved {report.save_baseline('outbound', args.save, results)}")
+    if args.compare:
+        if report.print_comparison(report.compare(report.load_baseline(args.compare, "outbound"), results)):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Concurrent load test of every API route against a synthetic investor corpus.
+
+    python -m benchmarks.bench_routes --scale 10000 --concurrency 8 --requests 400 --save local
+    python -m benchmarks.bench_routes --url http://127.0.0.1:8000 --server-pid 1234 --compare local
+
+By default the app is imported in-process on top of a temporary data directory and
+driven through Flask's test client, one client per thread. With --url the same request
+mix is sent over HTTP to a running server (e.g. gunicorn started with INVESTOR_SEED_PATH
+and STARTUP_SEED_PATH pointing at `python -m benchmarks.corpus` output); pass
+--server-pid to read that server's peak RSS. In-process, peak RSS is the process
+high-water mark after each route, so routes are run from cheapest to heaviest.
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import corpus
+from benchmarks.report import (compare, load_baseline, peak_rss_mb, print_comparison, print_results,
+                               save_baseline, summarize)
+
+SUITE = "routes"
+
+
+class TestClientTransport:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, data=None, headers=None):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.app.test_client()
+        response = self._local.client.open(path, method=method, json=json, data=data, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        import requests
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, data=None, headers=None):
+        if not hasattr(self._local, "session"):
+            self._local.session = self._requests.Session()
+        response = self._local.session.request(method, self.base_url + path, json=json, data=data,
+                                               headers=headers, timeout=60)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, None
+
+
+def pdf_bytes(tag, pages=3):
+    """A small valid PDF; the tag goes into the metadata so each upload hashes differently"""
+    from PyPDF2 import PdfWriter
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=612, height=792)
+    writer.add_metadata({"/Title": f"Benchmark deck {tag}"})
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def route_plan(scale, startups, seed, job_ids):
+    """(name, request builder, response hook) for every route, cheapest first"""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+    analyses = corpus.companies(256, seed)
+    intro_ids = []
+    counter = iter(range(10 ** 9))
+
+    def pick(values):
+        with lock:
+            return rng.choice(values)
+
+    def remember(target, key):
+        def hook(status, body):
+            if body and body.get(key):
+                with lock:
+                    target.append(body[key])
+        return hook
+
+    def vc_id():
+        with lock:
+            return rng.randint(1, scale)
+
+    return [
+        ("GET /", lambda: ("GET", "/", {}), None),
+        ("GET /api/health", lambda: ("GET", "/api/health", {}), None),
+        ("GET /api/status", lambda: ("GET", "/api/status", {}), None),
+        ("GET /api/cache/stats", lambda: ("GET", "/api/cache/stats", {}), None),
+        ("GET /api/market-intelligence", lambda: ("GET", "/api/market-intelligence", {}), None),
+        ("GET /api/updates", lambda: ("GET", "/api/updates?since=0&market=1", {}), None),
+        ("GET /api/vcs", lambda: ("GET", "/api/vcs", {}), None),
+        ("GET /api/vcs?filtered", lambda: (
+            "GET", f"/api/vcs?industry={pick(corpus.INDUSTRIES)}&stage={pick(corpus.STAGES)[3:]}"
+                   f"&cursor={vc_id()}", {}), None),
+        ("GET /api/vcs/<id>/queue", lambda: ("GET", f"/api/vcs/{vc_id()}/queue", {}), None),
+        ("POST /api/demo-vc-scenario", lambda: ("POST", "/api/demo-vc-scenario", {"json": {}}), None),
+        ("POST /api/demo-scenario", lambda: ("POST", "/api/demo-scenario", {"json": {}}), None),
+        ("POST /api/find-matches", lambda: (
+            "POST", "/api/find-matches", {"json": {"analysis": pick(analyses)}}), None),
+        ("POST /api/find-matches/batch", lambda: (
+            "POST", "/api/find-matches/batch", {"json": {"companies": analyses[:16], "seed": seed}}), None),
+        ("POST /api/vc-decision", lambda: ("POST", "/api/vc-decision", {"json": {
+            "vc_id": vc_id(), "startup_id": pick(range(1, startups + 1)),
+            "decision": pick(["interested", "interested", "schedule_meeting", "pass"])}}), None),
+        ("POST /api/intro-request", lambda: ("POST", "/api/intro-request", {"json": {
+            "founder_email": f"founder{next(counter)}@example.com", "vc_name": "Benchmark Fund",
+            "vc_id": vc_id()}}), remember(intro_ids, "request_id")),
+        ("GET /api/intro-request/<id>", lambda: (
+            "GET", f"/api/intro-request/{pick(intro_ids)}", {}), None),
+        ("POST /api/analyze-deck", lambda: ("POST", "/api/analyze-deck?filename=deck.pdf", {
+            "data": pdf_bytes(next(counter)), "headers": {"Content-Type": "application/pdf"}}),
+         remember(job_ids, "job_id")),
+        ("GET /api/analyze-deck/<job_id>", lambda: (
+            "GET", f"/api/analyze-deck/{pick(job_ids)}", {}), None),
+    ]
+
+
+def drive(transport, plan, requests_per_route, concurrency, server_pid=None, only=None):
+    results = {}
+    for name, build, hook in plan:
+        if only and name not in only:
+            continue
+        statuses = Counter()
+        latencies = []
+        lock = threading.Lock()
+
+        def one(_):
+            method, path, kwargs = build()
+            t0 = time.perf_counter()
+            status, body = transport.request(method, path, **kwargs)
+            elapsed = time.perf_counter() - t0
+            if hook:
+                hook(status, body)
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(requests_per_route)))
+        wall = time.perf_counter() - started
+
+        row = summarize(latencies, wall, errors=sum(n for code, n in statuses.items() if code >= 400))
+        row["statuses"] = {str(code): n for code, n in sorted(statuses.items())}
+        row["peak_rss_mb"] = peak_rss_mb(server_pid)
+        results[name] = row
+        print(f"{name:<36} p50 {row['p50_ms']:>9} ms  p99 {row['p99_ms']:>9} ms  "
+              f"{row['ops_per_second']:>9} req/s  {row['statuses']}", file=sys.stderr)
+    return results
+
+
+def drain_jobs(transport, job_ids, timeout):
+    """Wait for queued deck analyses to finish; returns seconds waited and final job states"""
+    started = time.perf_counter()
+    pending = set(job_ids)
+    states = Counter()
+    while pending and time.perf_counter() - started < timeout:
+        for job_id in list(pending):
+            _, body = transport.request("GET", f"/api/analyze-deck/{job_id}")
+            status = ((body or {}).get("job") or {}).get("status", "missing")
+            if status not in ("queued", "running"):
+                pending.discard(job_id)
+                states[status] += 1
+        if pending:
+            time.sleep(0.2)
+    states["unfinished"] = len(pending)
+    return round(time.perf_counter() - started, 2), dict(states)
+
+
+def in_process_app(directory, scale, startups, seed):
+    """Import app.py against a fresh data directory seeded with a synthetic corpus"""
+    vcs_path, startups_path = corpus.write_corpus(os.path.join(directory, "seed"), scale, startups, seed)
+    os.environ.update({
+        "VENTURESYNC_DATA_DIR": os.path.join(directory, "var"),
+        "INVESTOR_SEED_PATH": vcs_path,
+        "STARTUP_SEED_PATH": startups_path,
+        "NEWS_SOURCES": "[]",
+    })
+    os.environ.setdefault("DECK_ANALYSIS_MAX_PENDING", "100000")
+    # One synthetic client hammers every route; measure the handlers, not the limiter
+    os.environ.setdefault("RATE_LIMITS_ENABLED", "0")
+    started = time.perf_counter()
+    import app as app_module
+    logging.getLogger().setLevel(logging.WARNING)
+    # The demo scenario catalog is built ahead of serving (warm-up or `python -m scenarios`)
+    app_module.ensure_scenarios()
+    print(f"app loaded with {scale} investors / {startups} startups in "
+          f"{time.perf_counter() - started:.2f}s", file=sys.stderr)
+    return app_module.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=10 ** 4, help="synthetic investors; with --url, the size of the server's corpus")
+    parser.add_argument("--startups", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--route", action="append", help="only run this route (repeatable), e.g. 'GET /api/vcs'")
+    parser.add_argument("--drain-timeout", type=float, default=300, help="seconds to wait for deck jobs")
+    parser.add_argument("--url", help="drive a running server instead of the in-process test client")
+    parser.add_argument("--server-pid", type=int, help="pid of the server under --url, for peak RSS")
+    parser.add_argument("--save", metavar="NAME", help="store results as benchmarks/baselines/routes-NAME.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline name or path to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            transport = HttpTransport(args.url)
+        else:
+            transport = TestClientTransport(in_process_app(tmp, args.scale, args.startups, args.seed))
+        job_ids = []
+        plan = route_plan(args.scale, args.startups, args.seed, job_ids)
+        results = drive(transport, plan, args.requests, args.concurrency, args.server_pid, args.route)
+        if job_ids:
+            # Jobs must finish before the temporary data directory goes away
+            waited, states = drain_jobs(transport, job_ids, args.drain_timeout)
+            print(f"deck jobs drained in {waited}s: {states}", file=sys.stderr)
+
+    suffix = "" if args.url else f"@{args.scale}"
+    results = {f"{name}{suffix}": row for name, row in results.items()}
+    print_results(results)
+    if args.save:
+        print(f"saved {save_baseline(SUITE, args.save, results)}")
+    if args.compare and print_comparison(compare(load_baseline(args.compare, SUITE), results, args.threshold)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
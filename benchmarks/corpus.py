@@ -0,0 +1,127 @@
+"""Seeded synthetic investor and startup corpora shaped like data/vcs.json and data/startups.json.
+
+    python -m benchmarks.corpus --investors 10000 --startups 1000 --out /tmp/corpus
+"""
+import argparse
+import json
+import os
+import random
+
+INDUSTRIES = ["AI/ML", "Crypto", "B2B SaaS", "Fintech", "Enterprise", "Developer Tools",
+              "Healthcare", "Climate", "Consumer", "SaaS", "Marketplace", "Gaming"]
+STAGES = ["1. Pre-seed", "2. Seed", "3. Series A", "4. Series B"]
+GEOGRAPHIES = ["🇺🇸 USA", "🇪🇺 Europe", "🇨🇦 Canada", "🇮🇳 India", "🌍 Global"]
+FUND_TYPES = ["Corporate VC", "Traditional VC", "Micro VC", "Angel Network"]
+CHECK_STEPS = [1, 3, 5, 10, 25, 30, 40, 50, 100]
+COMPANY_STAGES = ["Pre-seed", "Seed", "Series A", "Series B"]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Boston, MA", "Austin, TX", "London",
+             "Berlin", "Toronto", "Bangalore"]
+WORDS = ["Neural", "Flow", "Quantum", "Ledger", "Green", "Grid", "Health", "Stack", "Data",
+         "Forge", "Pulse", "Orbit", "Signal", "Vault", "Bright", "Path"]
+
+# Scales the benchmark suites run at by default
+SCALES = (10 ** 2, 10 ** 4, 10 ** 6)
+
+
+def investor(rng, fund_id):
+    low = rng.choice(CHECK_STEPS[:-1])
+    high = rng.choice([step for step in CHECK_STEPS if step > low])
+    name = f"{rng.choice(WORDS)}{rng.choice(WORDS)} Ventures {fund_id}"
+    return {
+        "id": fund_id,
+        "name": name,
+        "type": rng.choice(FUND_TYPES),
+        "geography": rng.sample(GEOGRAPHIES, rng.randint(1, 2)),
+        "checks": f"${low}M to ${high}M",
+        "stages": sorted(rng.sample(STAGES, rng.randint(1, 3))),
+        "industries": rng.sample(INDUSTRIES, rng.randint(1, 3)),
+        "openRate": f"{rng.randint(40, 99)}%",
+        "logo": name[:4].lower(),
+        "founded": rng.randint(1970, 2022),
+        "description": f"We back {rng.choice(COMPANY_STAGES).lower()} founders in {rng.choice(INDUSTRIES)}",
+        "recentDeals": [f"{rng.choice(WORDS)}{rng.choice(WORDS)} ${rng.randint(2, 150)}M" for _ in range(3)],
+        "portfolio": [f"{rng.choice(WORDS)}{rng.choice(WORDS)}" for _ in range(5)],
+        "website": f"fund{fund_id}.example.com",
+        "email": f"partner@fund{fund_id}.example.com",
+        "partner": f"Partner {fund_id}",
+    }
+
+
+def startup(rng, startup_id):
+    sector = rng.choice(INDUSTRIES)
+    return {
+        "id": startup_id,
+        "company_name": f"{rng.choice(WORDS)}{rng.choice(WORDS)} {startup_id}",
+        "sector": sector,
+        "stage": rng.choice(COMPANY_STAGES),
+        "metrics": f"${rng.randint(1, 90) / 10}M ARR, {rng.randint(5, 40)}% MoM growth",
+        "team": "Repeat founders",
+        "thesis_score": rng.randint(50, 99),
+        "market_timing": rng.choice(["Hot", "Warm", "Emerging"]),
+        "rationale": [f"{sector} thesis match", "Stage alignment"],
+        "portfolio_synergy": [],
+        "risk_factors": ["Competitive market"],
+        "target_industries": [sector] + rng.sample(INDUSTRIES, rng.randint(0, 2)),
+    }
+
+
+def company_analysis(rng):
+    """A find_vc_matches input, like the output of deck analysis"""
+    return {
+        "company_name": f"{rng.choice(WORDS)}{rng.choice(WORDS)}",
+        "sector": rng.choice(INDUSTRIES),
+        "funding_stage": rng.choice(COMPANY_STAGES),
+        "geography": rng.choice(LOCATIONS),
+        "funding_amount": f"${rng.randint(1, 60)}M",
+    }
+
+
+def investors(n, seed=0):
+    rng = random.Random(seed)
+    return (investor(rng, fund_id) for fund_id in range(1, n + 1))
+
+
+def startups(n, seed=0):
+    rng = random.Random(seed + 1)
+    return (startup(rng, startup_id) for startup_id in range(1, n + 1))
+
+
+def companies(n, seed=0):
+    rng = random.Random(seed + 2)
+    return [company_analysis(rng) for _ in range(n)]
+
+
+def _write_array(path, records):
+    # Streamed so a 10^6 corpus never sits in memory as one list
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for i, record in enumerate(records):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n]\n")
+
+
+def write_corpus(directory, n_investors, n_startups, seed=0):
+    """Write vcs.json and startups.json under directory and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    vcs_path = os.path.join(directory, "vcs.json")
+    startups_path = os.path.join(directory, "startups.json")
+    _write_array(vcs_path, investors(n_investors, seed))
+    _write_array(startups_path, startups(n_startups, seed))
+    return vcs_path, startups_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--investors", type=int, default=10 ** 4)
+    parser.add_argument("--startups", type=int, default=10 ** 3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+    for path in write_corpus(args.out, args.investors, args.startups, args.seed):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Latency summaries, peak RSS, and baseline save/compare shared by the benchmark suites."""
+import json
+import os
+import platform
+import resource
+import sys
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Metrics where a larger number is a regression; throughput is the other way round
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+HIGHER_IS_BETTER = ("ops_per_second",)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """p50/p95/p99 in milliseconds plus throughput for one benchmark"""
+    ordered = sorted(latencies)
+    return {
+        "ops": len(ordered),
+        "errors": errors,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "ops_per_second": round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def timed(fn, iterations):
+    """Call fn() iterations times; return (latencies, elapsed)"""
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return latencies, time.perf_counter() - started
+
+
+def peak_rss_mb(pid=None):
+    """High-water resident set size of this process, or of pid via /proc (Linux)"""
+    if pid is not None:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        return round(int(line.split()[1]) / 1024, 1)
+        except OSError:
+            return None
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def environment():
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "cpus": os.cpu_count(), "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+
+def save_baseline(suite, name, results):
+    """Write results to benchmarks/baselines/<suite>-<name>.json and return the path"""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{suite}-{name}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"suite": suite, "environment": environment(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def load_baseline(path_or_name, suite):
+    path = path_or_name
+    if not os.path.exists(path):
+        path = os.path.join(BASELINE_DIR, f"{suite}-{path_or_name}.json")
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(baseline, results, threshold=0.10):
+    """Per-metric relative changes; a change worse than threshold is flagged as a regression"""
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > threshold if metric in LOWER_IS_BETTER else change < -threshold
+            rows.append({"benchmark": key, "metric": metric, "baseline": before,
+                         "current": after, "change": round(change * 100, 1), "regression": worse})
+    return rows
+
+
+def print_results(results):
+    columns = ("ops", "errors", "p50_ms", "p95_ms", "p99_ms", "ops_per_second", "peak_rss_mb")
+    width = max((len(key) for key in results), default=10)
+    print(f"{'benchmark':<{width}}  " + "  ".join(f"{c:>14}" for c in columns))
+    for key, row in results.items():
+        cells = []
+        for column in columns:
+            value = row.get(column)
+            cells.append(f"{'-' if value is None else value:>14}")
+        print(f"{key:<{width}}  " + "  ".join(cells))
+
+
+def print_comparison(rows):
+    regressions = [row for row in rows if row["regression"]]
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['benchmark']:<48} {row['metric']:>14} {row['baseline']:>12} -> "
+              f"{row['current']:<12} {row['change']:>+7.1f}%  {flag}")
+    print(f"{len(regressions)} regression(s) in {len(rows)} comparisons")
+    return regressions
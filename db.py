@@ -0,0 +1,38 @@
+import os
+import sqlite3
+import threading
+
+
+class LocalConnection:
+    """Per-thread, per-process SQLite connection so forked workers never share one"""
+
+    def __init__(self, path, pragmas=("journal_mode=WAL",), timeout=30):
+        self.path = path
+        self.pragmas = pragmas
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout)
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+
+def pid_alive(pid):
+    """True if a process with this pid exists (e.g. the worker that owns a job, run or lease)"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,164 @@
+import copy
+import logging
+import os
+import random
+import time
+
+from deck_ingest import extract_deck
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever extraction or analysis output changes so cached results are not reused
+ANALYZER_VERSION = "2024.2"
+
+# Optional LLM deck summary; without ANTHROPIC_API_KEY (or CLAUDE_API_KEY) the demo analysis is used as-is
+ANALYSIS_MODEL = os.environ.get("ANALYSIS_MODEL", "claude-2.1")
+ANALYSIS_MAX_TOKENS = int(os.environ.get("ANALYSIS_MAX_TOKENS", 400))
+_llm = None
+
+
+# Hand-written demo companies; scenarios.py builds its seeded corpus around them
+DEMO_COMPANIES = [
+    {
+        "company_name": "NeuralFlow",
+        "business_model": "AI-powered data pipeline automation for enterprise",
+        "sector": "AI/ML",
+        "funding_stage": "Series A",
+        "funding_amount": "$18M",
+        "geography": "San Francisco, CA",
+        "key_metrics": {
+            "revenue": "$2.1M ARR",
+            "growth_rate": "25% MoM",
+            "customers": "45 enterprise clients"
+        },
+        "team_background": "Ex-Google/Meta engineers with 10+ years ML experience",
+        "traction": "2x revenue growth, 45 enterprise customers, 98% retention",
+        "competitive_advantages": ["Proprietary ML algorithms", "Real-time processing", "Enterprise security"],
+        "investment_highlights": ["Strong product-market fit", "Experienced team", "Large TAM"],
+        "deck_summary": "NeuralFlow has built an AI-powered data pipeline automation platform that reduces enterprise data processing time by 80%. With $2.1M ARR growing at 25% MoM, we serve 45 enterprise clients including Fortune 500 companies. Our proprietary ML algorithms and real-time processing capabilities provide significant competitive advantages in the $50B+ data infrastructure market.",
+        "confidence_score": 0.92
+    },
+    {
+        "company_name": "FinanceFlow",
+        "business_model": "Blockchain-based cross-border payments for SMBs",
+        "sector": "Fintech",
+        "funding_stage": "Series A",
+        "funding_amount": "$15M",
+        "geography": "New York, NY",
+        "key_metrics": {
+            "revenue": "$1.8M ARR",
+            "growth_rate": "30% MoM",
+            "customers": "1,200 SMB clients"
+        },
+        "team_background": "Former Goldman Sachs and Stripe executives",
+        "traction": "1,200 SMB customers, $50M+ processed monthly",
+        "competitive_advantages": ["Lower fees than traditional banks", "Instant settlement", "Regulatory compliance"],
+        "investment_highlights": ["Large addressable market", "Strong unit economics", "Proven team"],
+        "deck_summary": "FinanceFlow revolutionizes cross-border payments for SMBs using blockchain technology, reducing costs by 60% and settlement time to under 2 minutes. With $1.8M ARR growing 30% MoM and 1,200 customers processing $50M+ monthly, we're capturing significant market share in the $150B+ cross-border payments market.",
+        "confidence_score": 0.89
+    },
+    {
+        "company_name": "HealthAI",
+        "business_model": "AI diagnostic platform for radiology imaging",
+        "sector": "Healthcare",
+        "funding_stage": "Series A",
+        "funding_amount": "$22M",
+        "geography": "Boston, MA",
+        "key_metrics": {
+            "revenue": "$3.2M ARR",
+            "growth_rate": "20% MoM",
+            "customers": "15 hospital systems"
+        },
+        "team_background": "Former Johns Hopkins researchers and Google Health alumni",
+        "traction": "15 hospital partnerships, 95% diagnostic accuracy",
+        "competitive_advantages": ["FDA-cleared algorithms", "Integration with major EMRs", "Clinical validation"],
+        "investment_highlights": ["Regulatory moats", "Proven clinical outcomes", "Strong IP portfolio"],
+        "deck_summary": "HealthAI has developed FDA-cleared AI diagnostic algorithms that improve radiology accuracy by 23% and reduce diagnosis time by 45%. With partnerships across 15 major hospital systems and $3.2M ARR growing 20% MoM, we're transforming diagnostic imaging in the $25B+ medical imaging market.",
+        "confidence_score": 0.94
+    },
+    {
+        "company_name": "CarbonCapture",
+        "business_model": "Direct air capture technology for carbon removal",
+        "sector": "Climate",
+        "funding_stage": "Series A",
+        "funding_amount": "$25M",
+        "geography": "Austin, TX",
+        "key_metrics": {
+            "revenue": "$4.5M ARR",
+            "growth_rate": "35% MoM",
+            "customers": "8 enterprise contracts"
+        },
+        "team_background": "MIT PhDs and former Tesla energy team",
+        "traction": "8 enterprise contracts, 1,000 tons CO2 captured",
+        "competitive_advantages": ["Patent-pending capture technology", "30% lower costs", "Scalable modular design"],
+        "investment_highlights": ["Massive market opportunity", "Strong IP moats", "Proven technology"],
+        "deck_summary": "CarbonCapture has developed breakthrough direct air capture technology that removes CO2 at 30% lower cost than competitors. With 8 enterprise contracts and $4.5M ARR growing 35% MoM, we're positioned to lead the $100B+ carbon removal market driven by net-zero commitments.",
+        "confidence_score": 0.91
+    }
+]
+
+
+def generate_demo_company(rng=None):
+    """Generate a realistic demo company with detailed analysis"""
+    return copy.deepcopy((rng or random).choice(DEMO_COMPANIES))
+
+
+def llm_client():
+    """Anthropic client over the shared outbound pool, one per process; None when not configured"""
+    global _llm
+    api_key = os.environ.get("ANTHROPIC_API_KEY") or os.environ.get("CLAUDE_API_KEY")
+    if not api_key:
+        return None
+    if _llm is None:
+        import anthropic
+        import outbound
+        # Retries and hedging live in the outbound transport, so the SDK's own are off
+        _llm = anthropic.Anthropic(api_key=api_key, http_client=outbound.shared.get(), max_retries=0)
+    return _llm
+
+
+def summarize_deck(text):
+    """LLM summary of the extracted deck text, or None when unavailable"""
+    client = llm_client()
+    if client is None or not text:
+        return None
+    import anthropic
+    try:
+        completion = client.completions.create(
+            model=ANALYSIS_MODEL,
+            max_tokens_to_sample=ANALYSIS_MAX_TOKENS,
+            prompt=f"{anthropic.HUMAN_PROMPT} Summarize this startup pitch deck for a venture investor in "
+                   f"one paragraph.\n\n<deck>\n{text}\n</deck>{anthropic.AI_PROMPT}",
+        )
+    except anthropic.APIError as e:
+        logger.warning(f"Deck summary failed: {e}")
+        return None
+    return completion.completion.strip() or None
+
+
+def analyze_deck_file(path, filename, file_sha256, file_size, progress=None):
+    """Extract a spooled deck and build its analysis; progress(stage, fraction) is optional"""
+    started = time.perf_counter()
+    report = progress or (lambda stage, fraction: None)
+
+    report("extracting", 0.05)
+    deck = extract_deck(path, on_page=lambda number, total: report("extracting", 0.05 + 0.8 * number / total))
+
+    report("analyzing", 0.9)
+    # Mock analysis result based on demo company
+    analysis = generate_demo_company()
+    analysis["uploaded_filename"] = filename
+    analysis["file_sha256"] = file_sha256
+    analysis["file_size"] = file_size
+    analysis["pages"] = deck["pages"]
+    analysis["word_count"] = deck["word_count"]
+    analysis["text_extracted"] = deck["text_extracted"]
+    analysis["analyzer_version"] = ANALYZER_VERSION
+    summary = summarize_deck(deck["text_excerpt"])
+    if summary:
+        analysis["deck_summary"] = summary
+        analysis["summary_source"] = "llm"
+
+    processing_time = round(time.perf_counter() - started, 3)
+    analysis["processing_time"] = f"{processing_time:.2f} seconds"
+    return analysis, processing_time
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+from flask import Request
+from PyPDF2 import PdfReader
+from PyPDF2.errors import PdfReadError
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+EXCERPT_CHARS = 4000
+PDF_MAGIC = b"%PDF-"
+
+
+class HashingSpoolFile:
+    """Disk-backed file that hashes bytes as they are written to it"""
+
+    def __init__(self, spool_dir):
+        os.makedirs(spool_dir, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=spool_dir, prefix="deck-", suffix=".upload", delete=False)
+        self.path = self._file.name
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.retained = False
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self.sha256.hexdigest()
+
+    def retain(self):
+        """Keep the file on disk after the request ends; the caller now owns it"""
+        self.retained = True
+        self._file.flush()
+        return self.path
+
+    def discard(self):
+        """Close and delete the spooled file"""
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class SpoolingRequest(Request):
+    """Request that spools multipart file parts straight to disk instead of memory"""
+
+    spool_dir = tempfile.gettempdir()
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return HashingSpoolFile(self.spool_dir)
+
+    def close(self):
+        # Delete spooled uploads unless a handler retained them
+        spools = []
+        if "files" in self.__dict__:
+            spools = [f.stream for f in self.files.values() if isinstance(f.stream, HashingSpoolFile)]
+        super().close()
+        for spool in spools:
+            if not spool.retained:
+                spool.discard()
+
+
+def spool_stream(stream, spool_dir, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """Copy a raw request body to disk chunk by chunk, hashing as it arrives"""
+    spool = HashingSpoolFile(spool_dir)
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            if max_bytes is not None and spool.size + len(chunk) > max_bytes:
+                raise ValueError(f"Upload exceeds {max_bytes} bytes")
+            spool.write(chunk)
+        spool.flush()
+        spool.seek(0)
+    except Exception:
+        spool.discard()
+        raise
+    return spool
+
+
+def is_pdf(path):
+    with open(path, "rb") as f:
+        return f.read(len(PDF_MAGIC)) == PDF_MAGIC
+
+
+def iter_pdf_pages(path):
+    """Yield (page_number, page_count, text) one page at a time"""
+    with open(path, "rb") as f:
+        reader = PdfReader(f)
+        total = len(reader.pages)
+        for number, page in enumerate(reader.pages, start=1):
+            try:
+                text = page.extract_text() or ""
+            except Exception as e:
+                logger.warning(f"Failed to extract page {number} of {path}: {e}")
+                text = ""
+            yield number, total, text
+
+
+def extract_deck(path, on_page=None):
+    """Summarize a deck page by page, keeping only counters and a bounded excerpt"""
+    result = {"pages": 0, "word_count": 0, "text_excerpt": "", "text_extracted": False}
+    if not is_pdf(path):
+        return result
+    excerpt = []
+    excerpt_len = 0
+    try:
+        for number, total, text in iter_pdf_pages(path):
+            result["pages"] = number
+            if on_page is not None:
+                on_page(number, total)
+            result["word_count"] += len(text.split())
+            if excerpt_len < EXCERPT_CHARS and text:
+                piece = text[:EXCERPT_CHARS - excerpt_len]
+                excerpt.append(piece)
+                excerpt_len += len(piece)
+    except PdfReadError as e:
+        logger.warning(f"Unreadable PDF {path}: {e}")
+        return result
+    result["text_excerpt"] = "\n".join(excerpt)
+    result["text_extracted"] = result["word_count"] > 0
+    return result
@@ -0,0 +1,292 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class IdGenerator:
+    """Monotonic ids unique across processes on one host: <prefix>_<ms>_<pid>_<seq>"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._seq = 0
+
+    def next(self, prefix):
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._seq = 0
+            else:
+                # Same millisecond (or the clock stepped back): keep counting from the last id
+                self._seq += 1
+            return f"{prefix}_{self._last_ms}_{os.getpid()}_{self._seq}"
+
+    @staticmethod
+    def token(prefix):
+        """Random id for records whose id is handed to clients and must not be guessable"""
+        return f"{prefix}_{secrets.token_urlsafe(16)}"
+
+
+def _open_locked(path):
+    """Append fd on the current log file, exclusively locked
+
+    compact() swaps a new file in under the lock, so a writer that was waiting on the
+    old file reopens the path instead of appending to the replaced one.
+    """
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_ino == os.stat(path).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        except BaseException:
+            os.close(fd)
+            raise
+        os.close(fd)
+
+
+class EventLog:
+    """Append-only JSON-lines log with buffered writes and group-committed fsyncs
+
+    With compact_key set, the log is compacted once it grows past compact_bytes: it is
+    rewritten as a snapshot holding only the latest record per compact_key(record), and
+    records whose key is None are dropped.
+    """
+
+    def __init__(self, path, flush_bytes=64 * 1024, flush_interval=0.05, fsync=True, compact_key=None,
+                 compact_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.compact_key = compact_key
+        self.compact_bytes = compact_bytes
+        # Raised after a compaction that could not shrink the log below compact_bytes
+        self._compact_at = compact_bytes
+        self.compactions = 0
+        self.ids = IdGenerator()
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._appended = 0
+        self._flushed = 0
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pid = None
+        self._thread = None
+        self._wake = threading.Event()
+        self.flushes = 0
+        atexit.register(self.flush)
+
+    def append(self, event_type, payload, prefix="evt", wait=False, event_id=None):
+        """Buffer an event and return the full record; wait=True blocks until it is on disk
+
+        event_id lets a caller take an id from self.ids before the record can reach the file.
+        """
+        self._ensure_flusher()
+        event_id = event_id or self.ids.next(prefix)
+        record = {"id": event_id, "type": event_type, "ts": time.time(), **payload}
+        line = (json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+        with self._cond:
+            self._buffer.append(line)
+            self._buffered_bytes += len(line)
+            self._appended += 1
+            target = self._appended
+            full = self._buffered_bytes >= self.flush_bytes
+        if full:
+            self.flush()
+        elif wait:
+            # The flusher thread commits now; appends that arrive while it is writing
+            # ride along in its next batch, so concurrent waiters share one fsync
+            self._wake.set()
+        if wait:
+            with self._cond:
+                while self._flushed < target:
+                    self._cond.wait()
+        return record
+
+    def flush(self):
+        """Write everything buffered so far with a single write and fsync"""
+        with self._io_lock:
+            with self._cond:
+                if not self._buffer or self._pid != os.getpid():
+                    return 0
+                lines, self._buffer, self._buffered_bytes = self._buffer, [], 0
+                target = self._appended
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # flock keeps batches from different workers from interleaving
+            fd = _open_locked(self.path)
+            try:
+                os.write(fd, b"".join(lines))
+                if self.fsync:
+                    os.fsync(fd)
+                if self.compact_key is not None and os.fstat(fd).st_size >= self._compact_at:
+                    self._compact_locked()
+            finally:
+                os.close(fd)
+            with self._cond:
+                self._flushed = target
+                self.flushes += 1
+                self._cond.notify_all()
+            return len(lines)
+
+    def compact(self):
+        """Rewrite the log as a snapshot of the latest record per compact_key; returns its size in bytes"""
+        with self._io_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd = _open_locked(self.path)
+            try:
+                return self._compact_locked()
+            finally:
+                os.close(fd)
+
+    def _compact_locked(self):
+        # Caller holds the log's flock, so no batch lands between the read and the swap
+        started = time.perf_counter()
+        latest = {}
+        for record in replay(self.path):
+            key = self.compact_key(record)
+            if key is not None:
+                latest.pop(key, None)  # re-inserted, so the snapshot keeps log order
+                latest[key] = record
+        tmp_path = f"{self.path}.compact-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            for record in latest.values():
+                f.write((json.dumps(record, separators=(",", ":"), default=str) + "\n").encode("utf-8"))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            size = f.tell()
+        os.replace(tmp_path, self.path)
+        self._compact_at = max(self.compact_bytes, 2 * size)
+        self.compactions += 1
+        logger.info(f"Compacted event log {self.path} to {len(latest)} records ({size} bytes) "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return size
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # Anything buffered before a fork belongs to the parent
+            self._buffer, self._buffered_bytes = [], 0
+            self._appended = self._flushed = 0
+            self._wake = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="event-log-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Event log flush failed: {e}")
+
+    def stats(self):
+        with self._cond:
+            return {"appended": self._appended, "flushed": self._flushed,
+                    "buffered": len(self._buffer), "flushes": self.flushes, "compactions": self.compactions}
+
+
+class LogFollower:
+    """Tails a log that several workers append to, applying each complete record once per process
+
+    Records this process applied as it appended them are marked with skip() and not applied again.
+    When the log is compacted (a new file appears at the path) the follower re-reads the snapshot
+    from the start, so apply must be idempotent for the records compaction keeps.
+    """
+
+    def __init__(self, path, apply, chunk_bytes=1024 * 1024):
+        self.path = path
+        self.apply = apply
+        self.chunk_bytes = chunk_bytes
+        self.offset = 0
+        self.inode = None
+        self._skip = set()
+        self._lock = threading.Lock()
+
+    def skip(self, event_id):
+        with self._lock:
+            self._skip.add(event_id)
+
+    def catch_up(self):
+        """Apply records appended since the last call; returns how many were applied"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        if st.st_ino == self.inode and st.st_size == self.offset:
+            return 0
+        applied = 0
+        with self._lock:
+            try:
+                f = open(self.path, "rb")
+            except FileNotFoundError:
+                return 0
+            with f:
+                st = os.fstat(f.fileno())
+                if st.st_ino != self.inode:
+                    if self.inode is not None:
+                        logger.info(f"Event log {self.path} was compacted; following the snapshot from the start")
+                        self._skip.clear()
+                    self.inode, self.offset = st.st_ino, 0
+                elif st.st_size < self.offset:
+                    logger.warning(f"Event log {self.path} shrank; following it from the start")
+                    self.offset = 0
+                f.seek(self.offset)
+                # Read a chunk at a time so a long backlog never sits in memory whole
+                pending = b""
+                while True:
+                    chunk = f.read(self.chunk_bytes)
+                    if not chunk:
+                        break
+                    data = pending + chunk
+                    # Only whole lines; a batch still being written is picked up next time
+                    end = data.rfind(b"\n") + 1
+                    pending = data[end:]
+                    for line in data[:end].splitlines():
+                        applied += self._apply_line(line)
+                    self.offset += end
+        return applied
+
+    def _apply_line(self, line):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            logger.warning(f"Skipping corrupt event log line in {self.path}")
+            return 0
+        if record.get("id") in self._skip:
+            self._skip.discard(record["id"])
+            return 0
+        self.apply(record)
+        return 1
+
+
+def replay(path):
+    """Yield every complete record in the log, oldest first"""
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break  # torn final write from a crash
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping corrupt event log line in {path}")
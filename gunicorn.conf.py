@@ -0,0 +1,52 @@
+"""Gunicorn settings: preload the app once in the master, warm it up, then fork workers.
+
+Indexes built before fork are shared copy-on-write; gc.freeze() moves them out of the
+collector's view so the children's garbage collections don't write to (and copy) them.
+"""
+import gc
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("VENTURESYNC_PRELOAD", "1")
+
+# The config is read before preload imports the app; nothing allocated until fork needs collecting
+CONFIG_LOADED = time.perf_counter()
+gc.disable()
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+preload_app = True
+
+# Matching, batch scoring, allocation and thesis search are CPU-bound and hold the GIL, so
+# parallelism comes from processes (one per core); news, SQLite, event-log and Socket.IO are
+# I/O-bound and overlap on threads inside each worker. Deck parsing has its own pool.
+# Socket.IO stays correct across workers without a message queue: every worker relays the
+# shared delta history to its own clients, and clients connect over websockets only, so no
+# session has to stick to one worker (SOCKETIO_TRANSPORTS re-enables polling behind a sticky LB).
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+keepalive = 5
+# Recycle workers slowly so per-worker caches stay warm but leaks stay bounded
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.warm_up()
+    gc.freeze()
+    # The master keeps running (and allocating) after fork; only the startup burst skipped collection
+    gc.enable()
+    server.log.info(f"Preloaded and warmed up in {time.perf_counter() - CONFIG_LOADED:.2f}s; "
+                    f"{gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server, worker):
+    gc.enable()
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.on_worker_start()
@@ -0,0 +1,93 @@
+import time
+
+from db import LocalConnection
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS intros (
+    request_id TEXT PRIMARY KEY,
+    founder_email TEXT,
+    vc_name TEXT,
+    vc_id INTEGER,
+    status TEXT NOT NULL,
+    requested_at REAL NOT NULL,
+    delivered_at REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+DELIVERY_STATUSES = {True: "sent", False: "delivery_failed"}
+
+
+class IntroStore:
+    """Introduction requests and their delivery status, looked up by id from SQLite
+
+    Every worker reads the same rows, so a lookup never depends on this process having
+    replayed the event log, and nothing about intros is held in worker memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = LocalConnection(path)
+        self._ready = False
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def apply(self, event, conn=None):
+        """Fold one intro_request / intro_delivery event into the table; other events are ignored"""
+        conn = conn or self.connection()
+        if event["type"] == "intro_request":
+            conn.execute(
+                "INSERT OR IGNORE INTO intros (request_id, founder_email, vc_name, vc_id, status, requested_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?)",
+                (event["id"], event.get("founder_email"), event.get("vc_name"), _int_or_none(event.get("vc_id")),
+                 event["ts"]))
+        elif event["type"] == "intro_delivery":
+            conn.execute("UPDATE intros SET status = ?, delivered_at = ? WHERE request_id = ?",
+                         (DELIVERY_STATUSES[bool(event.get("delivered"))], event["ts"], event.get("request_id")))
+
+    def record(self, event):
+        conn = self.connection()
+        with conn:
+            self.apply(event, conn)
+
+    def get(self, request_id):
+        row = self.connection().execute(
+            "SELECT request_id, founder_email, vc_name, status, requested_at, delivered_at FROM intros "
+            "WHERE request_id = ?", (request_id,)).fetchone()
+        if row is None:
+            return None
+        intro = {"request_id": row[0], "founder_email": row[1], "vc_name": row[2], "status": row[3],
+                 "requested_at": row[4]}
+        if row[5] is not None:
+            intro["delivered_at"] = row[5]
+        return intro
+
+    def backfill(self, events):
+        """Load intros from the event log exactly once per database (the log predates this table)"""
+        conn = self.connection()
+        with conn:
+            claimed = conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('backfilled', ?)",
+                                   (str(time.time()),)).rowcount
+            if not claimed:
+                return 0
+            loaded = 0
+            for event in events:
+                if event.get("type") in ("intro_request", "intro_delivery"):
+                    self.apply(event, conn)
+                    loaded += 1
+        return loaded
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,229 @@
+import json
+import sqlite3
+import threading
+
+import serialization
+from db import LocalConnection
+from matching import normalize_industry, normalize_stage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS investors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS investor_industries (
+    investor_id INTEGER NOT NULL REFERENCES investors(id) ON DELETE CASCADE,
+    industry TEXT NOT NULL,
+    PRIMARY KEY (industry, investor_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS investor_stages (
+    investor_id INTEGER NOT NULL REFERENCES investors(id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    PRIMARY KEY (stage, investor_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_investor_industries_id ON investor_industries(investor_id);
+CREATE INDEX IF NOT EXISTS idx_investor_stages_id ON investor_stages(investor_id);
+CREATE TABLE IF NOT EXISTS catalog_changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    investor_id INTEGER NOT NULL,
+    removed INTEGER NOT NULL
+);
+"""
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvestorStore:
+    """SQLite-backed investor catalog shared by every worker through the OS page cache"""
+
+    def __init__(self, path, seed_path=None):
+        self.path = path
+        self.seed_path = seed_path
+        self._conn = LocalConnection(path, pragmas=("journal_mode=WAL", "foreign_keys=ON", "mmap_size=268435456"))
+        self._ready = False
+        self._ready_lock = threading.Lock()
+
+    def connection(self):
+        """Thread-local connection, creating and seeding the database on first use"""
+        if not self._ready:
+            with self._ready_lock:
+                if not self._ready:
+                    self._initialize()
+                    self._ready = True
+        return self._conn.get()
+
+    def _initialize(self):
+        conn = self._conn.get()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        if not self.seed_path:
+            return
+        # BEGIN IMMEDIATE so concurrently booting workers seed exactly once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM investors)").fetchone()[0]
+            if empty:
+                with open(self.seed_path, encoding="utf-8") as f:
+                    for fund in json.load(f):
+                        self._upsert(conn, fund)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate(self, conn):
+        # Databases created before the pre-encoded list view get it backfilled once
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(investors)")}
+        if "summary" not in columns:
+            try:
+                conn.execute("ALTER TABLE investors ADD COLUMN summary TEXT")
+            except sqlite3.OperationalError:
+                pass  # another worker added it first
+        rows = conn.execute("SELECT id, payload FROM investors WHERE summary IS NULL").fetchall()
+        if rows:
+            with conn:
+                conn.executemany(
+                    "UPDATE investors SET summary = ? WHERE id = ?",
+                    [(_encode(serialization.summary(json.loads(payload))), fund_id) for fund_id, payload in rows],
+                )
+
+    def _upsert(self, conn, fund):
+        fund_id = fund["id"]
+        # Both the full record and its list-view projection are encoded once, here
+        conn.execute(
+            "INSERT OR REPLACE INTO investors (id, name, payload, summary) VALUES (?, ?, ?, ?)",
+            (fund_id, fund["name"], _encode(fund), _encode(serialization.summary(fund))),
+        )
+        conn.execute("DELETE FROM investor_industries WHERE investor_id = ?", (fund_id,))
+        conn.execute("DELETE FROM investor_stages WHERE investor_id = ?", (fund_id,))
+        conn.executemany(
+            "INSERT OR IGNORE INTO investor_industries (investor_id, industry) VALUES (?, ?)",
+            [(fund_id, normalize_industry(industry)) for industry in fund.get("industries", [])],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO investor_stages (investor_id, stage) VALUES (?, ?)",
+            [(fund_id, normalize_stage(stage)) for stage in fund.get("stages", [])],
+        )
+
+    def add(self, fund):
+        """Insert or replace an investor record; returns the new catalog version"""
+        conn = self.connection()
+        with conn:
+            self._upsert(conn, fund)
+            cursor = conn.execute("INSERT INTO catalog_changes (investor_id, removed) VALUES (?, 0)", (fund["id"],))
+        return cursor.lastrowid
+
+    def remove(self, fund_id):
+        """Delete an investor; returns False when it did not exist"""
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM investors WHERE id = ?", (fund_id,))
+            removed = cursor.rowcount > 0
+            if removed:
+                conn.execute("INSERT INTO catalog_changes (investor_id, removed) VALUES (?, 1)", (fund_id,))
+        return removed
+
+    def catalog_version(self):
+        """Count of changes made through add/remove by any process; the seed is version 0"""
+        row = self.connection().execute("SELECT COALESCE(MAX(version), 0) FROM catalog_changes").fetchone()
+        return row[0]
+
+    def changes_since(self, version):
+        """(version, investor id, removed) for every add/remove after version, oldest first"""
+        return self.connection().execute(
+            "SELECT version, investor_id, removed FROM catalog_changes WHERE version > ? ORDER BY version", (version,)
+        ).fetchall()
+
+    def get(self, fund_id):
+        row = self.connection().execute(
+            "SELECT payload FROM investors WHERE id = ?", (fund_id,)
+        ).fetchone()
+        return serialization.loads(row[0]) if row else None
+
+    def get_many(self, fund_ids):
+        """Fetch several investors by id, returned as {id: record}"""
+        fund_ids = list(fund_ids)
+        if not fund_ids:
+            return {}
+        placeholders = ",".join("?" * len(fund_ids))
+        rows = self.connection().execute(
+            f"SELECT id, payload FROM investors WHERE id IN ({placeholders})", fund_ids
+        )
+        return {fund_id: serialization.loads(payload) for fund_id, payload in rows}
+
+    def get_many_encoded(self, fund_ids, view="payload"):
+        """Stored JSON text for several investors as {id: text}; view is 'payload' or 'summary'"""
+        if view not in ("payload", "summary"):
+            raise ValueError(f"unknown view {view!r}")
+        fund_ids = list(fund_ids)
+        if not fund_ids:
+            return {}
+        placeholders = ",".join("?" * len(fund_ids))
+        rows = self.connection().execute(
+            f"SELECT id, {view} FROM investors WHERE id IN ({placeholders})", fund_ids
+        )
+        return dict(rows)
+
+    def warm(self):
+        """Read every stored payload once so the database pages sit in the OS page cache; returns bytes read"""
+        row = self.connection().execute(
+            "SELECT COALESCE(SUM(LENGTH(payload) + LENGTH(summary)), 0) FROM investors"
+        ).fetchone()
+        return row[0]
+
+    def first_ids(self, limit):
+        rows = self.connection().execute("SELECT id FROM investors ORDER BY id LIMIT ?", (limit,))
+        return [fund_id for (fund_id,) in rows]
+
+    def iter_all(self, batch_size=1000):
+        """Stream every investor in id order without loading the table at once"""
+        cursor = None
+        while True:
+            funds, cursor = self.page(limit=batch_size, cursor=cursor, max_limit=batch_size)
+            yield from funds
+            if cursor is None:
+                return
+
+    def _filters(self, industry=None, stage=None):
+        clauses, params = [], []
+        if industry:
+            clauses.append("id IN (SELECT investor_id FROM investor_industries WHERE industry = ?)")
+            params.append(normalize_industry(industry))
+        if stage:
+            clauses.append("id IN (SELECT investor_id FROM investor_stages WHERE stage = ?)")
+            params.append(normalize_stage(stage))
+        return clauses, params
+
+    def count(self, industry=None, stage=None):
+        clauses, params = self._filters(industry, stage)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self.connection().execute(f"SELECT COUNT(*) FROM investors {where}", params).fetchone()[0]
+
+    def page_encoded(self, limit=DEFAULT_PAGE_SIZE, cursor=None, industry=None, stage=None,
+                     max_limit=MAX_PAGE_SIZE, view="payload"):
+        """Keyset-paginated listing of stored JSON text; view is 'payload' (full) or 'summary'"""
+        if view not in ("payload", "summary"):
+            raise ValueError(f"unknown view {view!r}")
+        limit = max(1, min(int(limit), max_limit))
+        clauses, params = self._filters(industry, stage)
+        if cursor is not None:
+            clauses.insert(0, "id > ?")
+            params.insert(0, int(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.connection().execute(
+            f"SELECT id, {view} FROM investors {where} ORDER BY id LIMIT ?", params + [limit + 1]
+        ).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return [encoded for _, encoded in rows[:limit]], next_cursor
+
+    def page(self, limit=DEFAULT_PAGE_SIZE, cursor=None, industry=None, stage=None, max_limit=MAX_PAGE_SIZE):
+        """Keyset-paginated listing; returns (records, next_cursor)"""
+        encoded, next_cursor = self.page_encoded(limit, cursor, industry, stage, max_limit)
+        return [serialization.loads(payload) for payload in encoded], next_cursor
+
+
+def _encode(record):
+    return serialization.dumps(record).decode("utf-8")
@@ -0,0 +1,273 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analysis_cache import AnalysisCache
+from db import LocalConnection, pid_alive
+from deck_analysis import analyze_deck_file
+from metrics import DECK_ANALYSES, STAGE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS deck_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    filename TEXT,
+    file_path TEXT,
+    file_sha256 TEXT,
+    file_size INTEGER,
+    owner_pid INTEGER,
+    result TEXT,
+    error TEXT,
+    processing_time REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_deck_jobs_status ON deck_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_deck_jobs_sha256 ON deck_jobs(file_sha256);
+"""
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class QueueFull(Exception):
+    """Raised when too many deck analyses are already queued or running"""
+
+
+class JobStore:
+    """SQLite job table shared by web workers and pool processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = LocalConnection(path)
+        self._ready = False
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def create(self, filename, file_path, file_sha256, file_size):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO deck_jobs (id, status, stage, filename, file_path, file_sha256, file_size,"
+                " owner_pid, created_at, updated_at) VALUES (?, 'queued', 'queued', ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, filename, file_path, file_sha256, file_size, os.getpid(), now, now),
+            )
+        return job_id
+
+    def update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        if "result" in fields and fields["result"] is not None:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self.connection()
+        with conn:
+            conn.execute(f"UPDATE deck_jobs SET {assignments} WHERE id = ?", [*fields.values(), job_id])
+
+    def get(self, job_id):
+        conn = self.connection()
+        row = conn.execute(
+            "SELECT id, status, stage, progress, filename, file_sha256, file_size, result, error,"
+            " processing_time, created_at, updated_at FROM deck_jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("job_id", "status", "stage", "progress", "filename", "file_sha256", "file_size",
+                "result", "error", "processing_time", "created_at", "updated_at")
+        job = dict(zip(keys, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def active_count(self):
+        return self.connection().execute(
+            "SELECT COUNT(*) FROM deck_jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+        ).fetchone()[0]
+
+    def orphaned(self):
+        """Active jobs whose owning worker process no longer exists"""
+        rows = self.connection().execute(
+            "SELECT id, owner_pid, status FROM deck_jobs WHERE status IN (?, ?)", ACTIVE_STATUSES
+        ).fetchall()
+        return [(job_id, pid, status) for job_id, pid, status in rows if not pid_alive(pid)]
+
+    def claim(self, job_id, previous_pid):
+        """Atomically take ownership of an orphaned job; False if another worker got it first"""
+        conn = self.connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE deck_jobs SET owner_pid = ?, status = 'queued', stage = 'queued', progress = 0,"
+                " updated_at = ? WHERE id = ? AND owner_pid IS ?",
+                (os.getpid(), time.time(), job_id, previous_pid),
+            )
+        return cursor.rowcount == 1
+
+    def find_active(self, file_sha256):
+        """Id of a queued or running job for the same upload, if any"""
+        row = self.connection().execute(
+            "SELECT id FROM deck_jobs WHERE file_sha256 = ? AND status IN (?, ?) LIMIT 1",
+            (file_sha256, *ACTIVE_STATUSES),
+        ).fetchone()
+        return row[0] if row else None
+
+    def file_path(self, job_id):
+        row = self.connection().execute("SELECT file_path FROM deck_jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+
+def run_deck_job(db_path, job_id, cache_config=None):
+    """Pool entry point: analyze one spooled deck and record progress and result"""
+    store = JobStore(db_path)
+    job = store.get(job_id)
+    path = store.file_path(job_id)
+    last_reported = [0.0]
+
+    def progress(stage, fraction):
+        # Throttle progress writes to roughly every 5%
+        if fraction - last_reported[0] >= 0.05 or stage != "extracting":
+            last_reported[0] = fraction
+            store.update(job_id, stage=stage, progress=round(fraction, 3))
+
+    store.update(job_id, status="running", stage="starting", progress=0.01)
+    try:
+        analysis, processing_time = analyze_deck_file(
+            path, job["filename"], job["file_sha256"], job["file_size"], progress=progress
+        )
+    except Exception as e:
+        store.update(job_id, status="failed", stage="failed", error=str(e))
+        raise
+    else:
+        store.update(job_id, status="complete", stage="complete", progress=1.0,
+                     result=analysis, processing_time=processing_time)
+        if cache_config is not None:
+            AnalysisCache.from_config(cache_config).put(job["file_sha256"], analysis)
+        return analysis, processing_time
+    finally:
+        try:
+            os.unlink(path)
+        except (FileNotFoundError, TypeError):
+            pass
+
+
+def _warm_worker():
+    """Pool no-op: unpickling it imports this module, and with it the analyzer, in the child"""
+    return os.getpid()
+
+
+class DeckJobQueue:
+    """Runs deck analysis in a process pool with a global cap on outstanding jobs"""
+
+    def __init__(self, store, job_dir, max_workers=2, max_pending=32, result_cache=None, on_done=None):
+        self.store = store
+        # on_done(outcome, processing_time) runs in the web worker as each job settles
+        self.on_done = on_done
+        self.result_cache = result_cache
+        self.job_dir = job_dir
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        # Pools are per process; spawn keeps children free of the web worker's threads
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def is_full(self):
+        """True when no more jobs would be accepted; cheap enough to check before reading an upload"""
+        return self.store.active_count() >= self.max_pending
+
+    def submit(self, spool, filename):
+        """Queue a spooled upload for analysis and return its job id"""
+        # Identical bytes already in flight: share that job instead of analyzing twice
+        existing = self.store.find_active(spool.hexdigest())
+        if existing is not None:
+            return existing
+        if self.is_full():
+            raise QueueFull(f"{self.max_pending} deck analyses already in progress")
+        os.makedirs(self.job_dir, exist_ok=True)
+        path = os.path.join(self.job_dir, f"{uuid.uuid4().hex}.upload")
+        spool.retain()
+        spool.close()
+        os.replace(spool.path, path)
+        job_id = self.store.create(filename, path, spool.hexdigest(), spool.size)
+        self._dispatch(job_id)
+        return job_id
+
+    def _dispatch(self, job_id):
+        cache_config = self.result_cache.config() if self.result_cache is not None else None
+        try:
+            future = self._pool().submit(run_deck_job, self.store.path, job_id, cache_config)
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None
+            future = self._pool().submit(run_deck_job, self.store.path, job_id, cache_config)
+        future.add_done_callback(lambda f: self._on_done(job_id, f))
+
+    def _on_done(self, job_id, future):
+        error = future.exception()
+        processing_time = None
+        if error is None:
+            # Parsing ran in a pool process, so its timing is recorded here in the web worker
+            processing_time = future.result()[1]
+            STAGE_LATENCY.observe(processing_time, stage="deck_parsing")
+            DECK_ANALYSES.inc(outcome="complete")
+        else:
+            DECK_ANALYSES.inc(outcome="failed")
+        if self.on_done is not None:
+            self.on_done("complete" if error is None else "failed", processing_time)
+        if isinstance(error, BrokenProcessPool):
+            # The child died before it could record the failure itself
+            self.store.update(job_id, status="failed", stage="failed", error="analysis worker crashed")
+            path = self.store.file_path(job_id)
+            if path and os.path.exists(path):
+                os.unlink(path)
+            with self._lock:
+                self._executor = None
+        elif error is not None:
+            logger.error(f"Deck job {job_id} failed: {error}")
+
+    def warm(self):
+        """Spawn the pool's processes now so the first upload does not wait for them; returns their count"""
+        pool = self._pool()
+        futures = [pool.submit(_warm_worker) for _ in range(self.max_workers)]
+        return len({future.result() for future in futures})
+
+    def recover(self):
+        """Re-queue jobs left behind by workers that exited; safe to call from every worker"""
+        recovered = 0
+        for job_id, pid, _ in self.store.orphaned():
+            if not self.store.claim(job_id, pid):
+                continue
+            path = self.store.file_path(job_id)
+            if path and os.path.exists(path):
+                self._dispatch(job_id)
+                recovered += 1
+            else:
+                self.store.update(job_id, status="failed", stage="failed", error="upload lost during restart")
+        if recovered:
+            logger.info(f"Recovered {recovered} deck analysis jobs")
+        return recovered
+
+    def get(self, job_id):
+        return self.store.get(job_id)
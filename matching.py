@@ -0,0 +1,409 @@
+import functools
+import heapq
+import re
+import sys
+import threading
+from collections import defaultdict
+
+# Map free-form locations onto the regions used in the VC geography lists
+REGION_ALIASES = {
+    "usa": "usa", "us": "usa", "united states": "usa",
+    "san francisco": "usa", "new york": "usa", "boston": "usa", "austin": "usa",
+    "seattle": "usa", "los angeles": "usa", "ca": "usa", "ny": "usa", "ma": "usa",
+    "tx": "usa", "wa": "usa",
+    "canada": "canada", "toronto": "canada", "vancouver": "canada",
+    "europe": "europe", "uk": "europe", "london": "europe", "berlin": "europe", "paris": "europe",
+    "india": "india", "bangalore": "india", "mumbai": "india",
+    "global": "global",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STAGE_PREFIX_RE = re.compile(r"^\s*\d+\.\s*")
+_MONEY_RE = re.compile(r"\$?\s*([\d.,]+)\s*([kmb]?)", re.IGNORECASE)
+_MONEY_UNITS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+
+# Weights used to rank candidates; sector and stage mirror the compatibility bonuses
+SIGNAL_WEIGHTS = {"sector": 8, "stage": 5, "thesis": 2, "geography": 1, "check_size": 1}
+
+
+def _tokens(value):
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def normalize_industry(value):
+    """Normalize an industry label, e.g. 'AI/ML' -> 'ai ml'"""
+    return " ".join(_tokens(value))
+
+
+def industry_ngrams(value):
+    """All contiguous word runs of an industry label ('B2B SaaS' -> b2b, saas, b2b saas)"""
+    words = _tokens(value)
+    return {" ".join(words[i:j]) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+
+
+def normalize_stage(value):
+    """Normalize a stage label, e.g. '3. Series A' -> 'series a'"""
+    return " ".join(_tokens(_STAGE_PREFIX_RE.sub("", value or "")))
+
+
+def normalize_region(value):
+    """Resolve a geography string ('🇺🇸 USA', 'Boston, MA') to a region key"""
+    text = normalize_industry(value)
+    if text in REGION_ALIASES:
+        return REGION_ALIASES[text]
+    for part in (value or "").split(","):
+        region = REGION_ALIASES.get(normalize_industry(part))
+        if region:
+            return region
+    return text or None
+
+
+def parse_money(value):
+    """Parse '$18M' / '$1.5B' / '500K' into an integer number of dollars"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = _MONEY_RE.search(value or "")
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", "") or 0)
+    return int(number * _MONEY_UNITS[match.group(2).lower()])
+
+
+def parse_check_range(value):
+    """Parse '$5M to $50M' into (min, max) dollars"""
+    amounts = [parse_money(part) for part in re.split(r"\bto\b|-|–", value or "")]
+    amounts = [amount for amount in amounts if amount is not None]
+    if not amounts:
+        return None
+    return min(amounts), max(amounts)
+
+
+class Vocabulary:
+    """Interns normalized labels to small integer codes so a set of labels fits in one int bitmask"""
+
+    def __init__(self, normalize):
+        self.normalize = normalize
+        self.labels = []
+        self._codes = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.labels)
+
+    def code(self, label, add=True):
+        """Code of a raw label, interning it when add is True; None for unknown or empty labels"""
+        key = self.normalize(label)
+        if not key:
+            return None
+        code = self._codes.get(key)
+        if code is None and add:
+            with self._lock:
+                code = self._codes.get(key)
+                if code is None:
+                    code = self._codes[sys.intern(key)] = len(self.labels)
+                    self.labels.append(key)
+        return code
+
+    def mask(self, labels, add=True):
+        mask = 0
+        for label in labels:
+            code = self.code(label, add=add)
+            if code is not None:
+                mask |= 1 << code
+        return mask
+
+    def codes(self, mask):
+        """Codes of the set bits in mask, lowest first"""
+        code = 0
+        while mask:
+            if mask & 1:
+                yield code
+            mask >>= 1
+            code += 1
+
+    def labels_in(self, mask):
+        return [self.labels[code] for code in self.codes(mask)]
+
+
+INDUSTRIES = Vocabulary(normalize_industry)
+STAGES = Vocabulary(normalize_stage)
+REGIONS = Vocabulary(lambda value: normalize_region(value) or "")
+
+# Sectors come straight from request bodies, so the cache is bounded rather than one entry per string seen
+SECTOR_MASK_CACHE_SIZE = 4096
+
+
+def sector_mask(sector):
+    """Industries a company sector matches: word-wise contained in it, or containing it"""
+    label = normalize_industry(sector)
+    if not label:
+        return 0
+    # Keyed on the vocabulary size too, so interning a new industry recomputes the mask
+    return _sector_mask(label, len(INDUSTRIES))
+
+
+@functools.lru_cache(maxsize=SECTOR_MASK_CACHE_SIZE)
+def _sector_mask(label, size):
+    grams = industry_ngrams(label)
+    mask = 0
+    for code, industry in enumerate(INDUSTRIES.labels[:size]):
+        if industry in grams or label in industry_ngrams(industry):
+            mask |= 1 << code
+    return mask
+
+
+def stage_mask(stage):
+    code = STAGES.code(stage, add=False) if stage else None
+    return 0 if code is None else 1 << code
+
+
+def region_mask(geography):
+    """A company location's region bit plus the 'global' bit, which every location matches"""
+    mask = 0
+    for label in (geography, "global"):
+        code = REGIONS.code(label, add=False) if label else None
+        if code is not None:
+            mask |= 1 << code
+    return mask
+
+
+def parse_open_rate(value):
+    """Parse '95%' (or 95, or 0.95) into 0.95"""
+    text = str(value).strip()
+    try:
+        number = float(text.rstrip("%"))
+    except ValueError:
+        return None
+    return number / 100 if text.endswith("%") or number > 1 else number
+
+
+class Investor:
+    """Typed, compact view of an investor record with every matching field parsed once at load"""
+
+    __slots__ = ("id", "name", "check_min", "check_max", "open_rate", "founded",
+                 "industry_mask", "stage_mask", "region_mask")
+
+    def __init__(self, id, name, check_min=None, check_max=None, open_rate=None, founded=None,
+                 industry_mask=0, stage_mask=0, region_mask=0):
+        self.id = id
+        self.name = name
+        self.check_min = check_min
+        self.check_max = check_max
+        self.open_rate = open_rate
+        self.founded = founded
+        self.industry_mask = industry_mask
+        self.stage_mask = stage_mask
+        self.region_mask = region_mask
+
+    @classmethod
+    def from_record(cls, fund):
+        """Build from a raw record like those in data/vcs.json (an Investor is returned as is)"""
+        if isinstance(fund, cls):
+            return fund
+        check_range = parse_check_range(fund.get("checks"))
+        return cls(
+            fund["id"],
+            sys.intern(fund["name"]),
+            *(check_range or (None, None)),
+            open_rate=parse_open_rate(fund.get("openRate")),
+            founded=int(fund["founded"]) if fund.get("founded") else None,
+            industry_mask=INDUSTRIES.mask(fund.get("industries", [])),
+            stage_mask=STAGES.mask(fund.get("stages", [])),
+            region_mask=REGIONS.mask(fund.get("geography", [])),
+        )
+
+    def writes_check(self, amount):
+        """Whether a raise of amount (dollars or '$18M') falls inside this fund's check range"""
+        amount = parse_money(amount)
+        return amount is not None and self.check_min is not None and self.check_min <= amount <= self.check_max
+
+    @property
+    def industries(self):
+        return INDUSTRIES.labels_in(self.industry_mask)
+
+    @property
+    def stages(self):
+        return STAGES.labels_in(self.stage_mask)
+
+    @property
+    def regions(self):
+        return REGIONS.labels_in(self.region_mask)
+
+    def __repr__(self):
+        return f"Investor(id={self.id!r}, name={self.name!r})"
+
+
+class MatchIndex:
+    """Inverted index over fund ids keyed on interned industry and stage codes
+
+    Thread-safe: adds and removes hold the index lock, and so do reads that walk more than
+    one structure, so a query never sees a fund in a posting list but not in the investors.
+    """
+
+    def __init__(self, funds=()):
+        # Compact typed investors only; full records live in the investor store
+        self._investors = {}
+        # Bumped on every add/remove so derived structures know when to rebuild
+        self.version = 0
+        self._postings = {"industry": defaultdict(set), "stage": defaultdict(set)}
+        self._lock = threading.RLock()
+        for fund in funds:
+            self.add_fund(fund)
+
+    def __len__(self):
+        return len(self._investors)
+
+    def __contains__(self, fund_id):
+        return fund_id in self._investors
+
+    def get(self, fund_id):
+        return self._investors.get(fund_id)
+
+    def investors(self):
+        with self._lock:
+            return list(self._investors.values())
+
+    def _posting_keys(self, investor):
+        keys = [("industry", code) for code in INDUSTRIES.codes(investor.industry_mask)]
+        keys.extend(("stage", code) for code in STAGES.codes(investor.stage_mask))
+        return keys
+
+    def add_fund(self, fund):
+        """Index a fund (raw record or Investor), replacing any existing entry with the same id"""
+        investor = Investor.from_record(fund)
+        with self._lock:
+            if investor.id in self._investors:
+                self.remove_fund(investor.id)
+            for field, code in self._posting_keys(investor):
+                self._postings[field][code].add(investor.id)
+            self._investors[investor.id] = investor
+            self.version += 1
+
+    def remove_fund(self, fund_id):
+        """Drop a fund from every posting list it appears in"""
+        with self._lock:
+            investor = self._investors.pop(fund_id, None)
+            if investor is None:
+                return False
+            for field, code in self._posting_keys(investor):
+                postings = self._postings[field]
+                postings[code].discard(fund_id)
+                if not postings[code]:
+                    del postings[code]
+            self.version += 1
+            return True
+
+    def _lookup(self, field, mask):
+        vocabulary = INDUSTRIES if field == "industry" else STAGES
+        result = set()
+        with self._lock:
+            for code in vocabulary.codes(mask):
+                result |= self._postings[field].get(code, set())
+        return result
+
+    def sector_postings(self, sector):
+        """Funds whose industries contain the sector or are contained in it (word-wise)"""
+        return self._lookup("industry", sector_mask(sector)) if sector else set()
+
+    def industry_postings(self, industry):
+        """Funds listing exactly this industry label (after normalization)"""
+        code = INDUSTRIES.code(industry, add=False)
+        if code is None:
+            return set()
+        with self._lock:
+            return set(self._postings["industry"].get(code, ()))
+
+    def stage_postings(self, stage):
+        return self._lookup("stage", stage_mask(stage)) if stage else set()
+
+    def _query(self, sector, stage, geography, check_size):
+        return sector_mask(sector), stage_mask(stage), region_mask(geography), parse_money(check_size)
+
+    @staticmethod
+    def _signals(investor, query, thesis=None):
+        sectors, stages, regions, amount = query
+        return {
+            "sector": bool(investor.industry_mask & sectors),
+            "stage": bool(investor.stage_mask & stages),
+            "thesis": bool(thesis) and investor.id in thesis,
+            "geography": bool(investor.region_mask & regions),
+            "check_size": investor.writes_check(amount),
+        }
+
+    def signals(self, fund_id, sector, stage, geography=None, check_size=None):
+        """Which match dimensions a single fund satisfies"""
+        investor = self.get(fund_id)
+        if investor is None:
+            return dict.fromkeys(SIGNAL_WEIGHTS, False)
+        return self._signals(investor, self._query(sector, stage, geography, check_size))
+
+    def top_k(self, sector, stage, geography=None, check_size=None, k=3, allowed=None, thesis=None):
+        """Return up to k (fund_id, signals) pairs matching sector, stage or thesis, best first
+
+        allowed, when given, is a set of fund ids (e.g. from range filters) candidates must be in.
+        thesis maps semantically retrieved fund ids to their similarity; they join the candidates
+        and rank on the thesis signal, with similarity breaking ties.
+        """
+        query = self._query(sector, stage, geography, check_size)
+        with self._lock:
+            return self._top_k(query, k, allowed, thesis or {})
+
+    def _top_k(self, query, k, allowed, thesis):
+        sector_ids = self._lookup("industry", query[0])
+        stage_ids = self._lookup("stage", query[1])
+        if allowed is not None:
+            sector_ids &= allowed
+            stage_ids &= allowed
+        # Funds matching both sector and stage outrank everything else, so take
+        # them from the intersection first and only widen to the union if needed
+        strong = sector_ids & stage_ids
+        candidates = strong if len(strong) >= k else sector_ids | stage_ids
+        if thesis:
+            extra = {fund_id for fund_id in thesis if fund_id in self._investors}
+            candidates = candidates | (extra if allowed is None else extra & allowed)
+
+        sectors, stages, regions, amount = query
+        investors = self._investors
+
+        def rank(fund_id):
+            investor = investors[fund_id]
+            similarity = thesis.get(fund_id, 0.0)
+            score = ((SIGNAL_WEIGHTS["sector"] if investor.industry_mask & sectors else 0)
+                     + (SIGNAL_WEIGHTS["stage"] if investor.stage_mask & stages else 0)
+                     + (SIGNAL_WEIGHTS["thesis"] if similarity else 0)
+                     + (SIGNAL_WEIGHTS["geography"] if investor.region_mask & regions else 0)
+                     + (SIGNAL_WEIGHTS["check_size"] if investor.writes_check(amount) else 0))
+            return score, similarity, -fund_id
+
+        best = heapq.nlargest(k, candidates, key=rank)
+        return [(fund_id, self._signals(investors[fund_id], query, thesis)) for fund_id in best]
+
+
+# Funds with a hand-written line about their portfolio, listed after the signal reasons
+_FUND_REASONS = {
+    "Andreessen Horowitz": ("Portfolio synergy with GitHub",),
+    "Sequoia Capital": ("Market-leading position", "Proven track record"),
+    "Accel Partners": ("Technical founder support", "SaaS specialization"),
+}
+_DEFAULT_REASONS = ["Geographic alignment", "Check size match", "Investment thesis fit"]
+
+
+def rationale(fund_name, signals, sector, stage, limit=3):
+    """Up to limit human-readable reasons a fund matched, from its signals dict"""
+    reasons = []
+    if signals.get("sector"):
+        reasons.append(f"Strong {sector} thesis alignment")
+    if signals.get("stage"):
+        reasons.append(f"{stage} stage perfect fit")
+    if signals.get("thesis"):
+        reasons.append("Portfolio and thesis close to your deck")
+    reasons.extend(_FUND_REASONS.get(fund_name, ()))
+    if signals.get("geography"):
+        reasons.append("Geographic alignment")
+    if signals.get("check_size"):
+        reasons.append("Check size match")
+    return (reasons or _DEFAULT_REASONS)[:limit]
+
+
+def explanation(fund_name):
+    return f"Excellent alignment with {fund_name}'s investment focus and portfolio companies."
@@ -0,0 +1,334 @@
+import functools
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+
+from flask import g, request
+
+# Latency buckets in seconds, from sub-millisecond cache hits up to slow deck analyses
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PROCESS_STARTED = time.time()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Sum over every series matching the given labels"""
+        with self._lock:
+            items = list(self._values.items())
+        return sum(count for key, count in items
+                   if all(key[self.labelnames.index(name)] == str(v) for name, v in labels.items()))
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, _labels(self.labelnames, key), count) for key, count in items]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, optionally split by labels"""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def count(self, predicate=None):
+        """Observations across series whose labels (as a dict) satisfy predicate"""
+        with self._lock:
+            items = [(key, n) for key, (_, _, n) in self._series.items()]
+        return sum(n for key, n in items if predicate is None or predicate(dict(zip(self.labelnames, key))))
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total, n)) for key, (counts, total, n) in self._series.items())
+        lines = []
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append((f"{self.name}_bucket",
+                              _labels(self.labelnames, key, [("le", _number(bound))]), cumulative))
+            lines.append((f"{self.name}_sum", _labels(self.labelnames, key), round(total, 6)))
+            lines.append((f"{self.name}_count", _labels(self.labelnames, key), n))
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, fn):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+
+    def samples(self):
+        return [(self.name, "", self.fn())]
+
+
+class Registry:
+    """Per-process metric registry rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, fn):
+        return self._register(Gauge(name, documentation, fn))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.histogram(
+    "venturesync_request_duration_seconds", "Request latency by route, method and status",
+    ("route", "method", "status"))
+STAGE_LATENCY = REGISTRY.histogram(
+    "venturesync_stage_duration_seconds", "Latency of hot-path stages (matching, thesis_retrieval, serialization, deck_parsing, news_fetch)",
+    ("stage",))
+DECK_ANALYSES = REGISTRY.counter(
+    "venturesync_deck_analyses_total", "Deck analyses by outcome (cache_hit, queued, complete, failed)", ("outcome",))
+INTRO_REQUESTS = REGISTRY.counter("venturesync_intro_requests_total", "Introduction requests recorded")
+VC_DECISIONS = REGISTRY.counter("venturesync_vc_decisions_total", "VC decisions recorded", ("decision",))
+SLOW_REQUEST_PROFILES = REGISTRY.counter(
+    "venturesync_slow_request_profiles_total", "Slow requests whose sampled stacks were written out")
+REGISTRY.gauge("venturesync_process_start_time_seconds", "Unix time this worker process started",
+               lambda: round(PROCESS_STARTED, 3))
+
+
+def stage(name):
+    """Context manager timing one hot-path stage"""
+    return STAGE_LATENCY.time(stage=name)
+
+
+def timed_stage(name):
+    """Decorator form of stage() for whole functions"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def uptime_seconds():
+    return round(time.time() - PROCESS_STARTED, 1)
+
+
+def timed_json_provider(provider_class):
+    """Subclass a Flask JSON provider so building JSON responses is timed as the serialization stage"""
+
+    class TimedJSONProvider(provider_class):
+        def response(self, *args, **kwargs):
+            with stage("serialization"):
+                return super().response(*args, **kwargs)
+
+    return TimedJSONProvider
+
+
+class SlowRequestProfiler:
+    """Samples the stacks of in-flight request threads; slow requests are written as folded stacks
+
+    Output files hold one `frame;frame;frame count` line per distinct stack, the input
+    format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, directory, threshold=0.5, interval=0.005):
+        self.directory = directory
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @classmethod
+    def from_env(cls, directory):
+        """PROFILE_SLOW_REQUEST_MS enables profiling; unset means no profiler"""
+        threshold_ms = os.environ.get("PROFILE_SLOW_REQUEST_MS")
+        if not threshold_ms:
+            return None
+        return cls(os.environ.get("PROFILE_DIR", directory), threshold=float(threshold_ms) / 1000,
+                   interval=float(os.environ.get("PROFILE_INTERVAL_MS", 5)) / 1000)
+
+    def _ensure_started(self):
+        # Sampler threads do not survive fork, so each worker starts its own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._active = {}
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stacks in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stacks[self._fold(frame)] += 1
+
+    @staticmethod
+    def _fold(frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def begin(self):
+        self._ensure_started()
+        with self._lock:
+            self._active[threading.get_ident()] = StackCounter()
+
+    def end(self, label, duration):
+        """Stop sampling this thread; returns the written path if the request was slow"""
+        with self._lock:
+            stacks = self._active.pop(threading.get_ident(), None)
+        if not stacks or duration < self.threshold:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        safe_label = "".join(c if c.isalnum() else "_" for c in label).strip("_")
+        path = os.path.join(self.directory, f"{int(time.time() * 1000)}-{os.getpid()}-{safe_label}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for folded, count in stacks.most_common():
+                f.write(f"{folded} {count}\n")
+        SLOW_REQUEST_PROFILES.inc()
+        return path
+
+
+def instrument(app, profiler=None, observers=()):
+    """Record per-route latency for every request, and profile slow ones when a profiler is given
+
+    Call after installing the app's JSON provider; its responses are timed as serialization.
+    observers are called with (route, method, status, seconds) after each request.
+    """
+    app.json = timed_json_provider(type(app.json))(app)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+        if profiler is not None:
+            profiler.begin()
+
+    @app.after_request
+    def _remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _observe(error=None):
+        # Teardown also runs for requests that raised, so their latency and profile are kept
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        status = g.pop("metrics_status", 500 if error is not None else 200)
+        route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_LATENCY.observe(duration, route=route, method=request.method, status=status)
+        for observer in observers:
+            observer(route, request.method, status, duration)
+        if profiler is not None:
+            profiler.end(f"{request.method} {route}", duration)
+
+    return app
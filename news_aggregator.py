@@ -0,0 +1,225 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from xml.etree import ElementTree
+
+import httpx
+
+from metrics import stage
+
+logger = logging.getLogger(__name__)
+
+_TITLE_RE = re.compile(r"[a-z0-9]+")
+
+
+class NewsSource:
+    """A funding-news feed; format is 'json' (list of {title,time,source}) or 'rss'"""
+
+    def __init__(self, name, url, format="json", timeout=5.0):
+        self.name = name
+        self.url = url
+        self.format = format
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["name"], config["url"], config.get("format", "json"), float(config.get("timeout", 5.0)))
+
+
+class CircuitBreaker:
+    """Stops calling a source after repeated failures, retrying once after a cool-down"""
+
+    def __init__(self, failure_threshold=3, reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.state == "half-open":
+            self.opened_at = time.monotonic()
+
+
+def headline_key(title):
+    """Dedup key for a headline: lowercase words, punctuation and spacing ignored"""
+    return " ".join(_TITLE_RE.findall((title or "").lower()))
+
+
+def humanize_age(published):
+    seconds = max(0, (datetime.now(timezone.utc) - published).total_seconds())
+    if seconds < 3600:
+        minutes = int(seconds // 60)
+        return f"{minutes} minute{'s' if minutes != 1 else ''} ago"
+    if seconds < 86400:
+        hours = int(seconds // 3600)
+        return f"{hours} hour{'s' if hours != 1 else ''} ago"
+    days = int(seconds // 86400)
+    return f"{days} day{'s' if days != 1 else ''} ago"
+
+
+def parse_json_feed(source, text):
+    data = json.loads(text)
+    if isinstance(data, dict):
+        data = data.get("deals") or data.get("articles") or data.get("items") or []
+    items = []
+    for entry in data:
+        title = entry.get("title")
+        if title:
+            items.append({
+                "title": title,
+                "time": entry.get("time") or entry.get("published_at") or "just now",
+                "source": entry.get("source") or source.name,
+            })
+    return items
+
+
+def parse_rss_feed(source, text):
+    items = []
+    for node in ElementTree.fromstring(text).iter("item"):
+        title = (node.findtext("title") or "").strip()
+        if not title:
+            continue
+        age = "just now"
+        published = node.findtext("pubDate")
+        if published:
+            try:
+                age = humanize_age(parsedate_to_datetime(published))
+            except (TypeError, ValueError):
+                pass
+        items.append({"title": title, "time": age, "source": source.name})
+    return items
+
+
+PARSERS = {"json": parse_json_feed, "rss": parse_rss_feed}
+
+
+class NewsAggregator:
+    """Fetches all sources concurrently in a background loop and publishes an immutable snapshot"""
+
+    def __init__(self, sources, initial=(), interval=300.0, max_items=20, on_update=None):
+        self.sources = list(sources)
+        self.interval = interval
+        self.max_items = max_items
+        self.on_update = on_update
+        self.breakers = {source.name: CircuitBreaker() for source in self.sources}
+        self._snapshot = tuple(initial)
+        self.updated_at = None
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, initial=(), **kwargs):
+        """Build from NEWS_SOURCES, a JSON list of {name, url, format, timeout}"""
+        config = json.loads(os.environ.get("NEWS_SOURCES", "[]"))
+        interval = float(os.environ.get("NEWS_REFRESH_SECONDS", 300))
+        return cls([NewsSource.from_config(c) for c in config], initial=initial, interval=interval, **kwargs)
+
+    def snapshot(self):
+        """Latest published headlines; a plain attribute read, never touches the network"""
+        return self._snapshot
+
+    def source_status(self):
+        return {name: breaker.state for name, breaker in self.breakers.items()}
+
+    async def _fetch(self, client, source):
+        breaker = self.breakers[source.name]
+        if not breaker.allow():
+            return []
+        try:
+            with stage("news_fetch"):
+                response = await client.get(source.url, timeout=source.timeout)
+                response.raise_for_status()
+                items = PARSERS[source.format](source, response.text)
+        except Exception as e:
+            breaker.record_failure()
+            logger.warning(f"News source {source.name} failed ({breaker.state}): {e}")
+            return []
+        breaker.record_success()
+        return items
+
+    async def refresh(self, client=None):
+        """Fetch every source concurrently and publish a deduplicated snapshot"""
+        if not self.sources:
+            return self._snapshot
+        if client is None:
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                return await self.refresh(client)
+        results = await asyncio.gather(*(self._fetch(client, source) for source in self.sources))
+        seen = set()
+        merged = []
+        for items in results:
+            for item in items:
+                key = headline_key(item["title"])
+                if key and key not in seen:
+                    seen.add(key)
+                    merged.append(item)
+        if merged:
+            # Keep serving the previous snapshot if every source came back empty
+            self._publish(tuple(merged[:self.max_items]))
+        return self._snapshot
+
+    def refresh_now(self):
+        """Synchronous single refresh, for scripts and tests against stub servers"""
+        return asyncio.run(self.refresh())
+
+    def _publish(self, snapshot):
+        changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+        self.updated_at = datetime.now().isoformat()
+        if changed and self.on_update is not None:
+            try:
+                self.on_update(snapshot)
+            except Exception as e:
+                logger.error(f"News update hook failed: {e}")
+
+    async def _run(self):
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            while not self._stop.is_set():
+                try:
+                    await self.refresh(client)
+                except Exception as e:
+                    logger.error(f"News refresh failed: {e}")
+                await asyncio.get_running_loop().run_in_executor(None, self._stop.wait, self.interval)
+
+    def ensure_started(self):
+        """Start the background loop once per process (threads do not survive fork)"""
+        if not self.sources or (self._thread is not None and self._pid == os.getpid()):
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._run()),
+                                            name="news-aggregator", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None and self._pid == os.getpid():
+            self._thread.join(timeout=5)
+        self._thread = None
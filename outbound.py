@@ -0,0 +1,257 @@
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from metrics import REGISTRY
+
+try:
+    import h2  # noqa: F401  (httpx negotiates HTTP/2 over ALPN only when h2 is installed)
+    HTTP2 = True
+except ImportError:
+    HTTP2 = False
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+# The server refused these before doing any work, so even a POST can be resent
+REJECTED_STATUSES = frozenset((429, 503))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504, 529))
+# Failures where the request never reached the server
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+OUTBOUND_REQUESTS = REGISTRY.counter(
+    "venturesync_outbound_requests_total", "Outbound HTTP attempts by host and outcome", ("host", "outcome"))
+OUTBOUND_LATENCY = REGISTRY.histogram(
+    "venturesync_outbound_request_seconds", "Outbound HTTP request time to response headers, retries included",
+    ("host",))
+
+
+def replayable(request):
+    """Requests that are safe to send more than once: idempotent methods or an Idempotency-Key"""
+    return request.method in IDEMPOTENT_METHODS or "idempotency-key" in request.headers
+
+
+def retry_after_seconds(response):
+    """Retry-After as seconds (delta or HTTP date), or None"""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter"""
+
+    def __init__(self, attempts=3, backoff=0.2, max_backoff=5.0, max_retry_after=30.0):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to sleep before attempt number attempt + 1 (attempts count from 1)"""
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+    def should_retry_status(self, request, status):
+        if status in REJECTED_STATUSES:
+            return True
+        return status in RETRY_STATUSES and replayable(request)
+
+    def should_retry_error(self, request, error):
+        if isinstance(error, NOT_SENT_ERRORS):
+            return True
+        return isinstance(error, httpx.TransportError) and replayable(request)
+
+
+class _ReleasingStream(httpx.SyncByteStream):
+    """Response body that frees its per-host slot when closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    """Wraps a pooled transport with per-host concurrency caps, jittered retries and request hedging
+
+    Hedging sends a second copy of a replayable request when the first hasn't answered
+    within hedge_after seconds and keeps whichever responds first, trimming tail latency
+    at the cost of a little extra load on slow hosts.
+    """
+
+    def __init__(self, inner, retry=None, max_per_host=16, acquire_timeout=10.0, hedge_after=None,
+                 max_hedges=32):
+        self.inner = inner
+        self.retry = retry or RetryPolicy()
+        self.max_per_host = max_per_host
+        self.acquire_timeout = acquire_timeout
+        self.hedge_after = hedge_after
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_hedges, thread_name_prefix="outbound-hedge") \
+            if hedge_after else None
+
+    def _slots(self, host):
+        with self._hosts_lock:
+            slots = self._hosts.get(host)
+            if slots is None:
+                slots = self._hosts[host] = threading.BoundedSemaphore(self.max_per_host)
+            return slots
+
+    def _send(self, request, blocking=True):
+        """One attempt holding a per-host slot until the body is closed; None if no slot (non-blocking)"""
+        slots = self._slots(request.url.host)
+        if not slots.acquire(blocking, self.acquire_timeout if blocking else None):
+            if not blocking:
+                return None
+            raise httpx.PoolTimeout(f"no free connection slot for {request.url.host}", request=request)
+        try:
+            response = self.inner.handle_request(request)
+        except BaseException:
+            slots.release()
+            raise
+        response.stream = _ReleasingStream(response.stream, slots.release)
+        return response
+
+    def _hedged(self, request):
+        """Send request, racing a second copy after hedge_after seconds; first response wins"""
+        primary = self._hedge_pool.submit(self._send, request)
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        hedge = self._hedge_pool.submit(self._send, request, False)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if response is None:  # host saturated; no hedge was sent
+                    continue
+                OUTBOUND_REQUESTS.inc(host=request.url.host,
+                                      outcome="hedge_won" if future is hedge else "hedge_lost")
+                for loser in pending:
+                    loser.add_done_callback(_close_response)
+                return response
+        raise error
+
+    def handle_request(self, request):
+        host = request.url.host
+        request.read()  # buffer the body so it can be resent
+        hedge = self._hedge_pool is not None and replayable(request)
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self._hedged(request) if hedge else self._send(request)
+            except httpx.TransportError as e:
+                if attempt >= self.retry.attempts or not self.retry.should_retry_error(request, e):
+                    OUTBOUND_REQUESTS.inc(host=host, outcome="error")
+                    raise
+                OUTBOUND_REQUESTS.inc(host=host, outcome="retry")
+                time.sleep(self.retry.delay(attempt))
+                continue
+            if attempt < self.retry.attempts and self.retry.should_retry_status(request, response.status_code):
+                delay = self.retry.delay(attempt, retry_after_seconds(response))
+                response.close()
+                OUTBOUND_REQUESTS.inc(host=host, outcome="retry")
+                time.sleep(delay)
+                continue
+            OUTBOUND_LATENCY.observe(time.perf_counter() - started, host=host)
+            OUTBOUND_REQUESTS.inc(host=host, outcome="ok" if response.status_code < 400 else "http_error")
+            return response
+
+    def close(self):
+        if self._hedge_pool is not None:
+            self._hedge_pool.shutdown(wait=False)
+        self.inner.close()
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result().close()
+
+
+def build_client(max_connections=100, max_keepalive=20, keepalive_expiry=30.0, max_per_host=16,
+                 timeout=30.0, retry=None, hedge_after=None, **client_kwargs):
+    """httpx.Client over one keep-alive pool (HTTP/2 when h2 is installed) behind a ResilientTransport"""
+    inner = httpx.HTTPTransport(
+        http2=HTTP2,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive,
+                            keepalive_expiry=keepalive_expiry),
+    )
+    transport = ResilientTransport(inner, retry=retry, max_per_host=max_per_host, hedge_after=hedge_after)
+    return httpx.Client(transport=transport, timeout=timeout, **client_kwargs)
+
+
+class SharedClient:
+    """One pooled outbound client per process, created lazily so forked workers never share sockets"""
+
+    def __init__(self, **options):
+        self.options = options
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **overrides):
+        """Pool and retry settings from OUTBOUND_* environment variables"""
+        hedge_ms = float(os.environ.get("OUTBOUND_HEDGE_AFTER_MS", 0))
+        options = {
+            "max_connections": int(os.environ.get("OUTBOUND_MAX_CONNECTIONS", 100)),
+            "max_keepalive": int(os.environ.get("OUTBOUND_MAX_KEEPALIVE", 20)),
+            "max_per_host": int(os.environ.get("OUTBOUND_MAX_PER_HOST", 16)),
+            "timeout": float(os.environ.get("OUTBOUND_TIMEOUT_SECONDS", 30)),
+            "retry": RetryPolicy(attempts=int(os.environ.get("OUTBOUND_RETRY_ATTEMPTS", 3))),
+            "hedge_after": hedge_ms / 1000 if hedge_ms > 0 else None,
+        }
+        options.update(overrides)
+        return cls(**options)
+
+    def get(self):
+        with self._lock:
+            if self._client is None or self._pid != os.getpid():
+                self._client = build_client(**self.options)
+                self._pid = os.getpid()
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+
+
+# Process-wide client for LLM analysis, intro email delivery and other outbound calls
+shared = SharedClient.from_env()
@@ -0,0 +1,255 @@
+import bisect
+import threading
+
+from matching import parse_money, parse_open_rate
+
+
+class IntervalIndex:
+    """Centered interval tree answering overlap queries in O(log n + matches)
+
+    add/remove patch the node an interval belongs to without rebalancing; the tree is rebuilt
+    balanced whenever a whole catalog is loaded.
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals):
+        """intervals: iterable of (low, high, id) with low <= high"""
+        intervals = list(intervals)
+        self.left = self.right = None
+        if not intervals:
+            self.center = None
+            self.by_start, self.by_end = [], []
+            return
+        endpoints = sorted(value for low, high, _ in intervals for value in (low, high))
+        self.center = endpoints[len(endpoints) // 2]
+        here, left, right = [], [], []
+        for interval in intervals:
+            if interval[1] < self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+        # Intervals spanning the center, sorted by start ascending and by end descending
+        self.by_start = sorted((low, fund_id) for low, _, fund_id in here)
+        self.by_end = sorted(((high, fund_id) for _, high, fund_id in here), reverse=True)
+        if left:
+            self.left = IntervalIndex(left)
+        if right:
+            self.right = IntervalIndex(right)
+
+    def _node_for(self, low, high, create=False):
+        node = self
+        while True:
+            if node.center is None:
+                if not create:
+                    return None
+                node.center = low
+            if high < node.center:
+                branch = "left"
+            elif low > node.center:
+                branch = "right"
+            else:
+                return node
+            child = getattr(node, branch)
+            if child is None:
+                if not create:
+                    return None
+                child = IntervalIndex(())
+                setattr(node, branch, child)
+            node = child
+
+    def add(self, low, high, fund_id):
+        node = self._node_for(low, high, create=True)
+        bisect.insort(node.by_start, (low, fund_id))
+        bisect.insort(node.by_end, (high, fund_id), key=lambda entry: (-entry[0], -entry[1]))
+
+    def remove(self, low, high, fund_id):
+        node = self._node_for(low, high)
+        if node is not None:
+            node.by_start.remove((low, fund_id))
+            node.by_end.remove((high, fund_id))
+
+    def overlapping(self, low, high):
+        """Ids whose interval shares at least one point with [low, high]"""
+        result = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is None or node.center is None:
+                continue
+            if high < node.center:
+                for start, fund_id in node.by_start:
+                    if start > high:
+                        break
+                    result.append(fund_id)
+                stack.append(node.left)
+            elif low > node.center:
+                for end, fund_id in node.by_end:
+                    if end < low:
+                        break
+                    result.append(fund_id)
+                stack.append(node.right)
+            else:
+                result.extend(fund_id for _, fund_id in node.by_start)
+                stack.extend((node.left, node.right))
+        return result
+
+
+class SortedIndex:
+    """Parallel sorted arrays of (value, id) for threshold and between queries via bisect"""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.values = [value for value, _ in pairs]
+        self.ids = [fund_id for _, fund_id in pairs]
+
+    def add(self, value, fund_id):
+        start = bisect.bisect_left(self.values, value)
+        stop = bisect.bisect_right(self.values, value)
+        index = bisect.bisect_left(self.ids, fund_id, start, stop)
+        self.values.insert(index, value)
+        self.ids.insert(index, fund_id)
+
+    def remove(self, value, fund_id):
+        start = bisect.bisect_left(self.values, value)
+        stop = bisect.bisect_right(self.values, value)
+        index = bisect.bisect_left(self.ids, fund_id, start, stop)
+        if index < stop and self.ids[index] == fund_id:
+            del self.values[index]
+            del self.ids[index]
+
+    def between(self, low=None, high=None):
+        """Ids with low <= value <= high; either bound may be None"""
+        start = 0 if low is None else bisect.bisect_left(self.values, low)
+        stop = len(self.values) if high is None else bisect.bisect_right(self.values, high)
+        return self.ids[start:stop]
+
+
+class RangeFilters:
+    """Check-size, open-rate and founding-year constraints parsed from query args or JSON"""
+
+    FIELDS = ("check_min", "check_max", "min_open_rate", "max_open_rate", "founded_after", "founded_before")
+
+    def __init__(self, check_min=None, check_max=None, min_open_rate=None, max_open_rate=None,
+                 founded_after=None, founded_before=None):
+        self.check_min = check_min
+        self.check_max = check_max
+        self.min_open_rate = min_open_rate
+        self.max_open_rate = max_open_rate
+        self.founded_after = founded_after
+        self.founded_before = founded_before
+
+    @classmethod
+    def parse(cls, source, strict=False):
+        """Build from a mapping such as request.args or a JSON object; raises ValueError on bad input
+
+        check_min/check_max take '$2M' or dollars, open rates take '85%', 85 or 0.85,
+        founded_after/founded_before are inclusive years. strict rejects unknown names, for
+        sources (JSON filter objects) where every key is meant as a filter.
+        """
+        if not hasattr(source, "get"):
+            raise ValueError("filters must be an object")
+        if strict:
+            unknown = sorted(str(name) for name in source if name not in cls.FIELDS)
+            if unknown:
+                raise ValueError(f"unknown filters: {', '.join(unknown)}; expected {', '.join(cls.FIELDS)}")
+        values = {}
+        for name, parse in (("check_min", parse_money), ("check_max", parse_money),
+                            ("min_open_rate", parse_open_rate), ("max_open_rate", parse_open_rate),
+                            ("founded_after", int), ("founded_before", int)):
+            raw = source.get(name)
+            if raw is None or raw == "":
+                continue
+            value = None
+            if isinstance(raw, (str, int, float)) and not isinstance(raw, bool):
+                try:
+                    value = parse(raw)
+                except ValueError:
+                    pass
+            if value is None:
+                raise ValueError(f"invalid {name}: {raw!r}")
+            values[name] = value
+        for low, high in (("check_min", "check_max"), ("min_open_rate", "max_open_rate"),
+                          ("founded_after", "founded_before")):
+            if low in values and high in values and values[low] > values[high]:
+                raise ValueError(f"{low} must not exceed {high}")
+        return cls(**values)
+
+    def __bool__(self):
+        return any(getattr(self, name) is not None for name in self.FIELDS)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+
+
+class CatalogRanges:
+    """Range indexes over a set of investors, queried by RangeFilters; add/remove keep them current"""
+
+    def __init__(self, investors):
+        investors = list(investors)
+        self._investors = {investor.id: investor for investor in investors}
+        self._lock = threading.Lock()
+        self.checks = IntervalIndex(
+            (investor.check_min, investor.check_max, investor.id)
+            for investor in investors if investor.check_min is not None
+        )
+        self.open_rate = SortedIndex(
+            (investor.open_rate, investor.id) for investor in investors if investor.open_rate is not None
+        )
+        self.founded = SortedIndex(
+            (investor.founded, investor.id) for investor in investors if investor.founded is not None
+        )
+
+    def add(self, investor):
+        """Index an investor, replacing any existing entry with the same id"""
+        with self._lock:
+            self._remove(investor.id)
+            self._investors[investor.id] = investor
+            if investor.check_min is not None:
+                self.checks.add(investor.check_min, investor.check_max, investor.id)
+            if investor.open_rate is not None:
+                self.open_rate.add(investor.open_rate, investor.id)
+            if investor.founded is not None:
+                self.founded.add(investor.founded, investor.id)
+
+    def remove(self, fund_id):
+        with self._lock:
+            self._remove(fund_id)
+
+    def _remove(self, fund_id):
+        investor = self._investors.pop(fund_id, None)
+        if investor is None:
+            return
+        if investor.check_min is not None:
+            self.checks.remove(investor.check_min, investor.check_max, fund_id)
+        if investor.open_rate is not None:
+            self.open_rate.remove(investor.open_rate, fund_id)
+        if investor.founded is not None:
+            self.founded.remove(investor.founded, fund_id)
+
+    def matching(self, filters):
+        """Set of ids satisfying every constraint in filters (None when filters is empty)"""
+        ranges = []
+        with self._lock:
+            if filters.min_open_rate is not None or filters.max_open_rate is not None:
+                ranges.append(self.open_rate.between(filters.min_open_rate, filters.max_open_rate))
+            if filters.founded_after is not None or filters.founded_before is not None:
+                ranges.append(self.founded.between(filters.founded_after, filters.founded_before))
+            if filters.check_min is not None or filters.check_max is not None:
+                low = filters.check_min if filters.check_min is not None else 0
+                high = filters.check_max if filters.check_max is not None else float("inf")
+                ranges.append(self.checks.overlapping(low, high))
+        if not ranges:
+            return None
+        # Intersect smallest first so the working set only shrinks
+        ranges.sort(key=len)
+        result = set(ranges[0])
+        for ids in ranges[1:]:
+            if not result:
+                break
+            result.intersection_update(ids)
+        return result
@@ -0,0 +1,297 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import request
+from flask_socketio import emit, join_room, leave_room
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+from db import LocalConnection
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS realtime_states (
+    room TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (room, topic)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS realtime_deltas (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    room TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    delta TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_realtime_deltas_room ON realtime_deltas(room, seq);
+"""
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def _normalize(state):
+    """The state as it reads back from storage (tuples as lists, datetimes as strings), so diffs compare like with like"""
+    return json.loads(_encode(state))
+
+
+def _marks(values):
+    return ", ".join("?" * len(values))
+
+
+def diff(old, new, path=()):
+    """Structural delta between two JSON-like values: {'set': [[path, value]], 'unset': [path]}"""
+    delta = {"set": [], "unset": []}
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, value in new.items():
+            if key not in old:
+                delta["set"].append([[*path, key], value])
+            elif old[key] != value:
+                child = diff(old[key], value, (*path, key))
+                delta["set"].extend(child["set"])
+                delta["unset"].extend(child["unset"])
+        delta["unset"].extend([*path, key] for key in old if key not in new)
+    elif old != new:
+        delta["set"].append([list(path), new])
+    return delta
+
+
+class DeltaBroadcaster:
+    """Coalesces state changes per (room, topic) and pushes only the diff since the last push
+
+    Published states and the numbered delta history live in SQLite, so every worker diffs
+    against the same baseline and draws from one sequence: a poller may switch workers
+    without resyncing, and a state several workers publish is pushed once. With relay set
+    (no Socket.IO message queue), each worker's loop also emits every delta stored by any
+    worker to its own clients, which is how pushes cross worker boundaries.
+    """
+
+    def __init__(self, socketio, path, interval=0.25, history=1000, initial_state=None, relay=False):
+        self.socketio = socketio
+        self.path = path
+        self.interval = interval
+        self.history = history
+        self.relay = relay
+        # Optional callable(room) -> {topic: state} used to seed rooms nobody has published to yet
+        self.initial_state = initial_state
+        self._conn = LocalConnection(path, pragmas=("journal_mode=WAL", "synchronous=NORMAL"), timeout=5)
+        self._ready = False
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pid = None
+        self._relayed = 0
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def publish(self, room, topic, state):
+        """Record the latest state; clients get one merged delta per flush interval"""
+        self.ensure_started()
+        with self._lock:
+            self._pending[(room, topic)] = _normalize(state)
+
+    def seed(self, room, topic, state):
+        """Set the baseline state subscribers receive, without emitting a delta, unless one is already set"""
+        conn = self.connection()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO realtime_states (room, topic, state) VALUES (?, ?, ?)",
+                         (room, topic, _encode(state)))
+
+    def state(self, room, topic):
+        with self._lock:
+            if (room, topic) in self._pending:
+                return self._pending[(room, topic)]
+        row = self.connection().execute(
+            "SELECT state FROM realtime_states WHERE room = ? AND topic = ?", (room, topic)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        batch = []
+        conn = self.connection()
+        # One writer at a time, so each delta is diffed against the state the previous one left
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for (room, topic), state in pending.items():
+                row = conn.execute("SELECT state FROM realtime_states WHERE room = ? AND topic = ?",
+                                   (room, topic)).fetchone()
+                delta = diff(json.loads(row[0]) if row else {}, state)
+                if not delta["set"] and not delta["unset"]:
+                    continue
+                conn.execute("INSERT OR REPLACE INTO realtime_states (room, topic, state) VALUES (?, ?, ?)",
+                             (room, topic, _encode(state)))
+                seq = conn.execute("INSERT INTO realtime_deltas (room, topic, delta) VALUES (?, ?, ?)",
+                                   (room, topic, _encode(delta))).lastrowid
+                batch.append({"seq": seq, "room": room, "topic": topic, "delta": delta})
+            if batch:
+                conn.execute("DELETE FROM realtime_deltas WHERE seq <= ?", (batch[-1]["seq"] - self.history,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if not self.relay:
+            for message in batch:
+                self.socketio.emit("delta", message, to=message["room"])
+        return len(batch)
+
+    def relay_stored(self):
+        """Emit deltas stored by any worker since the last relay to this process's clients"""
+        rows = self.connection().execute(
+            "SELECT seq, room, topic, delta FROM realtime_deltas WHERE seq > ? ORDER BY seq", (self._relayed,)
+        ).fetchall()
+        for seq, room, topic, delta in rows:
+            self.socketio.emit("delta", {"seq": seq, "room": room, "topic": topic, "delta": json.loads(delta)},
+                               to=room)
+            self._relayed = seq
+        return len(rows)
+
+    def since(self, seq, rooms):
+        """Deltas after seq for the given rooms; resync=True when history no longer reaches back"""
+        conn = self.connection()
+        conn.execute("BEGIN")
+        try:
+            oldest, latest = conn.execute("SELECT MIN(seq), COALESCE(MAX(seq), 0) FROM realtime_deltas").fetchone()
+            rows = conn.execute(
+                f"SELECT seq, room, topic, delta FROM realtime_deltas WHERE seq > ? AND room IN ({_marks(rooms)}) "
+                "ORDER BY seq", (seq, *rooms)).fetchall() if rooms else []
+        finally:
+            conn.execute("COMMIT")
+        messages = [{"seq": s, "room": room, "topic": topic, "delta": json.loads(delta)}
+                    for s, room, topic, delta in rows]
+        oldest = oldest if oldest is not None else latest + 1
+        return messages, seq < oldest - 1, latest
+
+    def snapshot(self, rooms):
+        if not rooms:
+            return [], self.connection().execute("SELECT COALESCE(MAX(seq), 0) FROM realtime_deltas").fetchone()[0]
+        conn = self.connection()
+        if self.initial_state is not None:
+            seeded = {room for (room,) in conn.execute(
+                f"SELECT DISTINCT room FROM realtime_states WHERE room IN ({_marks(rooms)})", rooms)}
+            for room in rooms:
+                if room not in seeded:
+                    for topic, state in self.initial_state(room).items():
+                        self.seed(room, topic, state)
+        conn.execute("BEGIN")
+        try:
+            rows = conn.execute(f"SELECT room, topic, state FROM realtime_states WHERE room IN ({_marks(rooms)})",
+                                rooms).fetchall()
+            seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM realtime_deltas").fetchone()[0]
+        finally:
+            conn.execute("COMMIT")
+        states = {(room, topic): json.loads(state) for room, topic, state in rows}
+        with self._lock:
+            states.update((key, state) for key, state in self._pending.items() if key[0] in rooms)
+        return [
+            {"room": room, "topic": topic, "state": state}
+            for (room, topic), state in states.items()
+        ], seq
+
+    def ensure_started(self):
+        """Start the flush loop once per process"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            # Clients got a snapshot on subscribe; relaying starts from what is stored now
+            self._relayed = self.connection().execute(
+                "SELECT COALESCE(MAX(seq), 0) FROM realtime_deltas").fetchone()[0]
+        self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            try:
+                self.flush()
+                if self.relay:
+                    self.relay_stored()
+            except Exception as e:
+                logger.error(f"Realtime flush failed: {e}")
+
+
+# Anyone may watch these; vc:<id> and founder:<email> rooms need a signed grant
+PUBLIC_ROOMS = frozenset(("market", "analytics"))
+
+
+class RoomDenied(Exception):
+    """A subscription named a private room its token does not grant"""
+
+
+class RoomGrants:
+    """Signed, expiring tokens granting private rooms, issued by the endpoints that establish who a client is"""
+
+    def __init__(self, secret, max_age=7 * 86400):
+        self._serializer = URLSafeTimedSerializer(secret, salt="realtime-rooms")
+        self.max_age = max_age
+
+    def issue(self, rooms):
+        return self._serializer.dumps(sorted(rooms))
+
+    def granted(self, token):
+        if not token or not isinstance(token, str):
+            return set()
+        try:
+            rooms = self._serializer.loads(token, max_age=self.max_age)
+        except BadSignature:
+            return set()
+        return set(rooms) if isinstance(rooms, list) else set()
+
+    def authorize(self, rooms, token):
+        """Return rooms unchanged, or raise RoomDenied naming the private ones the token does not grant"""
+        private = [room for room in rooms if room not in PUBLIC_ROOMS]
+        if private:
+            granted = self.granted(token)
+            denied = [room for room in private if room not in granted]
+            if denied:
+                raise RoomDenied(f"Not authorized for {', '.join(denied)}")
+        return rooms
+
+
+def rooms_for(data):
+    """Translate a subscribe payload ({market, analytics, vc_id, founder_id}) into room names"""
+    rooms = []
+    if data.get("market"):
+        rooms.append("market")
+    if data.get("analytics"):
+        rooms.append("analytics")
+    if data.get("vc_id") is not None:
+        rooms.append(f"vc:{data['vc_id']}")
+    if data.get("founder_id"):
+        rooms.append(f"founder:{data['founder_id']}")
+    rooms.extend(room for room in data.get("rooms") or [] if isinstance(room, str))
+    return rooms
+
+
+def register_handlers(socketio, broadcaster, grants):
+    @socketio.on("subscribe")
+    def subscribe(data):
+        data = data if isinstance(data, dict) else {}
+        try:
+            rooms = grants.authorize(rooms_for(data), data.get("token"))
+        except RoomDenied as e:
+            emit("subscribe_error", {"message": str(e)})
+            logger.info(f"Client {request.sid} denied: {e}")
+            return
+        for room in rooms:
+            join_room(room)
+        broadcaster.ensure_started()
+        states, seq = broadcaster.snapshot(rooms)
+        emit("snapshot", {"seq": seq, "rooms": rooms, "states": states, "at": time.time()})
+        logger.info(f"Client {request.sid} subscribed to {rooms}")
+
+    @socketio.on("unsubscribe")
+    def unsubscribe(data):
+        for room in rooms_for(data if isinstance(data, dict) else {}):
+            leave_room(room)
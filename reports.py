@@ -0,0 +1,300 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import textwrap
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever report content or layout changes so stored artifacts are not reused
+REPORT_VERSION = "1"
+CHUNK_SIZE = 64 * 1024
+
+# PDF page geometry: US Letter, 10pt Helvetica
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN = 54
+FONT_SIZE = 10
+LEADING = 14
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+WRAP_COLUMNS = 95
+
+
+def match_row(match):
+    """Flatten a find_vc_matches() entry into the fields a report shows"""
+    vc = match.get("vc") or {}
+    return {
+        "name": vc.get("name"),
+        "match_score": match.get("compatibility"),
+        "check_size": vc.get("checks"),
+        "stages": vc.get("stages"),
+        "geography": vc.get("geography"),
+        "partner": vc.get("partner"),
+        "open_rate": vc.get("openRate"),
+        "thesis_similarity": match.get("thesis_similarity"),
+        "match_rationale": match.get("rationale"),
+    }
+
+
+def build_report(analysis, matches, market, company_name=None, persona=None):
+    """Plain-data report combining a company analysis, its VC matches and a market snapshot"""
+    return {
+        "company_name": company_name or analysis.get("company_name") or "Your Company",
+        "persona": persona,
+        "analysis": analysis,
+        "matches": [match_row(match) for match in matches],
+        "market": market,
+    }
+
+
+def report_key(inputs, fmt):
+    """Content hash of everything a report is built from plus its format; equal inputs share one artifact"""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{REPORT_VERSION}:{fmt}:{canonical}".encode("utf-8")).hexdigest()
+
+
+def _lines(report):
+    """The report as plain text lines, shared by the markdown and PDF renderers"""
+    analysis = report["analysis"]
+    yield f"# {report['company_name']} - Investor Readiness Report"
+    yield f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}" + (
+        f" for {report['persona']}" if report.get("persona") else "")
+    yield ""
+    yield "## Company"
+    for label, key in (("Sector", "sector"), ("Stage", "funding_stage"), ("Raising", "funding_amount"),
+                       ("Geography", "geography"), ("Business model", "business_model")):
+        if analysis.get(key):
+            yield f"- {label}: {analysis[key]}"
+    if analysis.get("deck_summary"):
+        yield ""
+        yield analysis["deck_summary"]
+    metrics = analysis.get("key_metrics") or {}
+    if metrics:
+        yield ""
+        yield "## Key metrics"
+        for name, value in metrics.items():
+            yield f"- {name.replace('_', ' ').title()}: {value}"
+    yield ""
+    yield f"## Top {len(report['matches'])} investor matches"
+    for rank, match in enumerate(report["matches"], 1):
+        yield ""
+        yield f"{rank}. {match.get('name')} - {match.get('match_score')}% match"
+        for label, key in (("Check size", "check_size"), ("Stages", "stages"), ("Geography", "geography"),
+                           ("Partner", "partner")):
+            value = match.get(key)
+            if value:
+                yield f"   {label}: {', '.join(value) if isinstance(value, list) else value}"
+        if match.get("match_rationale"):
+            yield f"   Why: {'; '.join(match['match_rationale'])}"
+    market = report.get("market") or {}
+    if market:
+        yield ""
+        yield "## Market"
+        for sector in market.get("hot_sectors", []):
+            yield f"- {sector['name']}: ${sector['funding']}B funded, {sector['growth']}% growth"
+        deals = market.get("live_deals") or []
+        if deals:
+            yield ""
+            yield "Recent deals:"
+            for deal in deals[:10]:
+                yield f"- {deal.get('title')} ({deal.get('source')})"
+
+
+def iter_markdown(report):
+    for line in _lines(report):
+        yield (line + "\n").encode("utf-8")
+
+
+CSV_FIELDS = ("rank", "name", "match_score", "check_size", "stages", "geography", "partner", "open_rate",
+              "thesis_similarity", "match_rationale")
+
+
+def iter_csv(report):
+    """One row per match, yielded as they are written"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_FIELDS)
+    for rank, match in enumerate(report["matches"], 1):
+        row = {"rank": rank, **match}
+        writer.writerow(["; ".join(map(str, value)) if isinstance(value, list) else value
+                         for value in (row.get(field) for field in CSV_FIELDS)])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _pdf_text(line):
+    # The standard Helvetica font only covers Latin-1; flag emoji and the like are dropped
+    text = line.encode("latin-1", "ignore").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def iter_pdf(report):
+    """Text-only PDF emitted page by page; offsets are tracked as bytes go out so nothing is buffered
+
+    Object 1 is the catalog, 2 the page tree (written last, once every page is known),
+    3 the font, then a content stream and a page object per page.
+    """
+    offsets = {}
+    position = 0
+
+    def emit(number, body):
+        nonlocal position
+        data = f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n"
+        offsets[number] = position
+        position += len(data)
+        return data
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(header)
+    yield header
+    yield emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+    yield emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    wrapped = (piece for line in _lines(report)
+               for piece in (textwrap.wrap(line, WRAP_COLUMNS, subsequent_indent="   ") or [""]))
+    pages = []
+    page_lines = []
+    number = 4
+    for line in wrapped:
+        page_lines.append(line)
+        if len(page_lines) < LINES_PER_PAGE:
+            continue
+        yield from _pdf_page(emit, number, page_lines)
+        pages.append(number + 1)
+        page_lines, number = [], number + 2
+    if page_lines or not pages:
+        yield from _pdf_page(emit, number, page_lines)
+        pages.append(number + 1)
+        number += 2
+
+    kids = " ".join(f"{page} 0 R" for page in pages)
+    yield emit(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("latin-1"))
+    xref = [f"xref\n0 {number}\n", "0000000000 65535 f \n"]
+    xref.extend(f"{offsets[n]:010d} 00000 n \n" for n in range(1, number))
+    xref.append(f"trailer\n<< /Size {number} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+    yield "".join(xref).encode("latin-1")
+
+
+def _pdf_page(emit, number, lines):
+    ops = [f"BT /F1 {FONT_SIZE} Tf {LEADING} TL {MARGIN} {PAGE_HEIGHT - MARGIN} Td"]
+    ops.extend(f"({_pdf_text(line)}) Tj T*" for line in lines)
+    ops.append("ET")
+    stream = "\n".join(ops).encode("latin-1")
+    yield emit(number, b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+    yield emit(number + 1, (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                            f"/Contents {number} 0 R /Resources << /Font << /F1 3 0 R >> >> >>").encode("latin-1"))
+
+
+# format -> (renderer, mimetype, file extension)
+FORMATS = {
+    "pdf": (iter_pdf, "application/pdf", "pdf"),
+    "csv": (iter_csv, "text/csv", "csv"),
+    "markdown": (iter_markdown, "text/markdown", "md"),
+}
+
+
+def render_to_file(report, fmt, path):
+    """Render a report to path atomically; runs in a pool process for large exports"""
+    renderer = FORMATS[fmt][0]
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            for chunk in renderer(report):
+                f.write(chunk)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+    return path
+
+
+def _iter_file(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class ReportEngine:
+    """Streams reports and keeps each rendered artifact once on disk, keyed by its input hash
+
+    Reports up to inline_limit matches render on the request thread while streaming, so
+    the first bytes go out immediately; bigger exports render in a process pool.
+    """
+
+    def __init__(self, directory, max_workers=2, inline_limit=50):
+        self.directory = directory
+        self.max_workers = max_workers
+        self.inline_limit = inline_limit
+        self._executor = None
+        self._pid = None
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def artifact_path(self, key, fmt):
+        return os.path.join(self.directory, f"{key}.{FORMATS[fmt][2]}")
+
+    def _pool(self):
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            self._pid = os.getpid()
+            self._inflight = {}
+        return self._executor
+
+    def stream(self, inputs, fmt, build, size):
+        """(key, iterator over the rendered bytes, whether a stored artifact was reused)
+
+        build() makes the report from inputs and only runs when no artifact exists yet; size
+        (the number of matches requested) decides between inline and pooled rendering.
+        """
+        key = report_key(inputs, fmt)
+        path = self.artifact_path(key, fmt)
+        if os.path.exists(path):
+            return key, _iter_file(path), True
+        os.makedirs(self.directory, exist_ok=True)
+        if size <= self.inline_limit:
+            return key, self._tee(build, fmt, path), False
+        self.render_in_pool(build(), fmt, key).result()
+        return key, _iter_file(path), False
+
+    def render_in_pool(self, report, fmt, key):
+        """Future for the artifact path; concurrent requests for one key share the render"""
+        with self._lock:
+            pool = self._pool()
+            future = self._inflight.get(key)
+            if future is None:
+                future = pool.submit(render_to_file, report, fmt, self.artifact_path(key, fmt))
+                self._inflight[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+            return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def _tee(self, build, fmt, path):
+        """Yield rendered chunks while also writing them to the artifact, published only if complete"""
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                for chunk in FORMATS[fmt][0](build()):
+                    f.write(chunk)
+                    yield chunk
+            os.replace(tmp, path)
+        finally:
+            # Client went away mid-stream (GeneratorExit) or rendering failed: drop the partial file
+            if os.path.exists(tmp):
+                os.unlink(tmp)
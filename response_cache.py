@@ -0,0 +1,170 @@
+import functools
+import gzip
+import hashlib
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import make_response, request
+
+import serialization
+from werkzeug.http import http_date, parse_date
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Envelope fields stamped with the wall clock at render time; left out of the ETag so every
+# worker (and every re-render of unchanged data) produces the same validator
+VOLATILE_FIELDS = frozenset({"timestamp", "last_updated"})
+
+
+def fingerprint(body, mimetype, volatile=VOLATILE_FIELDS):
+    """Hash of a response body, ignoring volatile fields when the body is JSON"""
+    if volatile and mimetype == "application/json":
+        try:
+            body = serialization.dumps(_without(serialization.loads(body), volatile))
+        except ValueError:
+            pass
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def _without(value, volatile):
+    if isinstance(value, dict):
+        return {k: _without(v, volatile) for k, v in value.items() if k not in volatile}
+    if isinstance(value, list):
+        return [_without(v, volatile) for v in value]
+    return value
+
+
+class CachedResponse:
+    """Encoded response body plus its validators and compressed variants"""
+
+    __slots__ = ("body", "encoded", "mimetype", "etag", "last_modified", "expires_at")
+
+    def __init__(self, body, mimetype, ttl, compress_min_size, volatile=VOLATILE_FIELDS):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = fingerprint(body, mimetype, volatile)
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.expires_at = time.monotonic() + ttl
+        self.encoded = {}
+        if len(body) >= compress_min_size:
+            self.encoded["gzip"] = gzip.compress(body, compresslevel=6)
+            if brotli is not None:
+                self.encoded["br"] = brotli.compress(body)
+
+    def fresh(self):
+        return time.monotonic() < self.expires_at
+
+    def etag_for(self, encoding):
+        """Strong ETag of one representation: each content-coding gets its own tag"""
+        return f"{self.etag}-{encoding}" if encoding else self.etag
+
+    def etags(self):
+        return [self.etag_for(None)] + [self.etag_for(encoding) for encoding in self.encoded]
+
+
+class ResponseCache:
+    """Per-process cache of serialized GET responses with ETag/Last-Modified support"""
+
+    def __init__(self, default_ttl=30, compress_min_size=1024, max_entries=1024):
+        self.default_ttl = default_ttl
+        self.compress_min_size = compress_min_size
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def cached(self, tag, ttl=None):
+        """Decorator caching a view's 200 responses under a tag, keyed by query string"""
+        ttl = self.default_ttl if ttl is None else ttl
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = (tag, request.path, tuple(sorted(request.args.items(multi=True))))
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is not None and entry.fresh():
+                        self.hits += 1
+                    else:
+                        entry = None
+                        self.misses += 1
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.direct_passthrough:
+                        return response
+                    entry = CachedResponse(response.get_data(), response.mimetype, ttl,
+                                           self.compress_min_size)
+                    with self._lock:
+                        self._store(key, entry)
+                return self._serve(entry)
+            return wrapper
+        return decorator
+
+    def _store(self, key, entry):
+        self._entries.pop(key, None)
+        self._entries[key] = entry
+        if len(self._entries) > self.max_entries:
+            for stale in [k for k, e in self._entries.items() if not e.fresh()]:
+                del self._entries[stale]
+        while len(self._entries) > self.max_entries:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del self._entries[next(iter(self._entries))]
+
+    def _serve(self, entry):
+        remaining = max(0, int(entry.expires_at - time.monotonic()))
+        encoding = self._pick_encoding(entry)
+        if self._not_modified(entry):
+            with self._lock:
+                self.not_modified += 1
+            response = make_response("", 304)
+        else:
+            response = make_response(entry.encoded[encoding] if encoding else entry.body)
+            response.mimetype = entry.mimetype
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+        response.set_etag(entry.etag_for(encoding))
+        response.headers["Last-Modified"] = http_date(entry.last_modified)
+        response.headers["Cache-Control"] = f"public, max-age={remaining}"
+        response.vary.add("Accept-Encoding")
+        return response
+
+    def _not_modified(self, entry):
+        if request.if_none_match:
+            # Any coding of the same payload validates: the client holds the decoded body either way
+            return request.if_none_match.star_tag or any(
+                request.if_none_match.contains(etag) for etag in entry.etags())
+        since = parse_date(request.headers.get("If-Modified-Since"))
+        return since is not None and since >= entry.last_modified
+
+    def _pick_encoding(self, entry):
+        accepted = request.accept_encodings
+        for encoding in ("br", "gzip"):
+            if encoding in entry.encoded and accepted[encoding]:
+                return encoding
+        return None
+
+    def invalidate(self, tag=None):
+        """Drop cached responses for a tag (or everything when tag is None)"""
+        with self._lock:
+            if tag is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == tag]:
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_modified": self.not_modified,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
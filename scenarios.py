@@ -0,0 +1,274 @@
+"""Seeded demo scenario corpus: synthetic companies with precomputed analysis + match bundles.
+
+    python -m scenarios --count 5000 --seed 42
+
+precomputes the catalog into DEMO_SCENARIO_DB_PATH so the web workers start with it.
+"""
+import argparse
+import copy
+import os
+import random
+import threading
+import time
+import zlib
+
+import serialization
+from db import LocalConnection, pid_alive
+from deck_analysis import DEMO_COMPANIES
+
+# Bump whenever generated content changes so stored catalogs are rebuilt
+SCENARIO_VERSION = "2"
+
+SECTORS = {
+    "AI/ML": ("AI copilots for {buyer}", ["Proprietary models", "Usage data flywheel", "Enterprise security"]),
+    "Fintech": ("Embedded payments for {buyer}", ["Lower fees", "Instant settlement", "Regulatory licenses"]),
+    "Healthcare": ("Clinical workflow automation for {buyer}", ["EMR integrations", "Clinical validation",
+                                                                "HIPAA compliance"]),
+    "Climate": ("Carbon accounting for {buyer}", ["Verified measurement", "Scalable modular design",
+                                                  "Policy tailwinds"]),
+    "B2B SaaS": ("Revenue operations platform for {buyer}", ["Fast onboarding", "Net revenue retention",
+                                                             "Integrations marketplace"]),
+    "Developer Tools": ("Observability for {buyer}", ["Open-source community", "Bottom-up adoption",
+                                                      "Low-latency pipeline"]),
+    "Enterprise": ("Procurement automation for {buyer}", ["ERP integrations", "Audit trails", "Fast ROI"]),
+    "Consumer": ("Subscription marketplace for {buyer}", ["Viral referral loop", "High retention",
+                                                          "Brand partnerships"]),
+}
+BUYERS = ["mid-market finance teams", "hospital systems", "SMB retailers", "logistics operators",
+          "enterprise engineering orgs", "insurance carriers", "municipal utilities", "creator businesses"]
+STAGES = [("Pre-seed", 1, 3), ("Seed", 2, 6), ("Series A", 8, 25), ("Series B", 20, 60)]
+LOCATIONS = ["San Francisco, CA", "New York, NY", "Boston, MA", "Austin, TX", "Seattle, WA",
+             "London", "Berlin", "Toronto", "Bangalore"]
+SYLLABLES = ["Neur", "Flow", "Quant", "Ledg", "Verd", "Grid", "Pulse", "Stack", "Forge", "Orb",
+             "Sign", "Vault", "Bright", "Path", "Nova", "Core", "Lum", "Kin"]
+TEAMS = ["Ex-Google and Stripe engineers", "Repeat founders with a prior exit", "Stanford PhDs in the field",
+         "Former operators from the target industry", "Ex-McKinsey and Amazon product leaders"]
+
+
+def scenario_rng(seed, scenario_id):
+    """Independent generator per scenario, so any one can be regenerated on its own"""
+    return random.Random(f"{seed}:{scenario_id}")
+
+
+def generate_company(seed, scenario_id):
+    """Deterministic synthetic company analysis; the first ids are the hand-written demo companies"""
+    if scenario_id <= len(DEMO_COMPANIES):
+        return copy.deepcopy(DEMO_COMPANIES[scenario_id - 1])
+    rng = scenario_rng(seed, scenario_id)
+    sector = rng.choice(list(SECTORS))
+    template, advantages = SECTORS[sector]
+    stage, low, high = rng.choice(STAGES)
+    name = rng.choice(SYLLABLES) + rng.choice(SYLLABLES).lower()
+    buyer = rng.choice(BUYERS)
+    arr = round(rng.uniform(0.2, 1.0) * high / 5, 1)
+    growth = rng.randint(8, 40)
+    customers = rng.randint(5, 400)
+    raising = rng.randint(low, high)
+    business_model = template.format(buyer=buyer)
+    return {
+        "company_name": name,
+        "business_model": business_model,
+        "sector": sector,
+        "funding_stage": stage,
+        "funding_amount": f"${raising}M",
+        "geography": rng.choice(LOCATIONS),
+        "key_metrics": {
+            "revenue": f"${arr}M ARR",
+            "growth_rate": f"{growth}% MoM",
+            "customers": f"{customers} customers",
+        },
+        "team_background": rng.choice(TEAMS),
+        "traction": f"{customers} customers, {growth}% monthly growth",
+        "competitive_advantages": rng.sample(advantages, 2),
+        "investment_highlights": rng.sample(["Large TAM", "Strong unit economics", "Experienced team",
+                                             "Clear product-market fit", "Capital efficient growth"], 3),
+        "deck_summary": f"{name} builds {business_model[0].lower()}{business_model[1:]}. With ${arr}M ARR "
+                        f"growing {growth}% MoM across {customers} customers, the company is raising "
+                        f"${raising}M at {stage}.",
+        "confidence_score": round(rng.uniform(0.75, 0.97), 2),
+    }
+
+
+def summary(scenario_id, analysis, matches):
+    """The catalog list view of one bundle"""
+    top = matches[0] if matches else None
+    return {
+        "id": scenario_id,
+        "company_name": analysis["company_name"],
+        "business_model": analysis["business_model"],
+        "sector": analysis["sector"],
+        "funding_stage": analysis["funding_stage"],
+        "funding_amount": analysis["funding_amount"],
+        "geography": analysis["geography"],
+        "match_count": len(matches),
+        "top_match": {"name": top["vc"]["name"], "compatibility": top["compatibility"]} if top else None,
+    }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenarios (
+    id INTEGER PRIMARY KEY,
+    sector TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    summary BLOB NOT NULL,
+    bundle BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scenarios_sector ON scenarios(sector, id);
+CREATE INDEX IF NOT EXISTS idx_scenarios_stage ON scenarios(stage, id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class ScenarioCatalog:
+    """Precomputed scenario bundles in SQLite: zlib-compressed JSON bundles next to encoded summaries
+
+    The stored build key names the investor catalog version the matches came from, so every
+    process can tell from the database alone whether the catalog is behind.
+    """
+
+    def __init__(self, path, count=1000, seed=42, matches=3, lease_seconds=600):
+        self.path = path
+        self.count = count
+        self.seed = seed
+        self.matches = matches
+        self.lease_seconds = lease_seconds
+        self._conn = LocalConnection(path)
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def build_key(self, catalog_version):
+        return f"{SCENARIO_VERSION}:{self.seed}:{self.count}:{self.matches}:{catalog_version}"
+
+    def stored_key(self):
+        """Build key of the catalog currently served, or None before the first build"""
+        row = self.connection().execute("SELECT value FROM meta WHERE key = 'build_key'").fetchone()
+        return row[0] if row else None
+
+    def is_current(self, catalog_version):
+        return self.stored_key() == self.build_key(catalog_version)
+
+    def ensure_built(self, match, catalog_version):
+        """Build the catalog for an investor catalog version unless the stored one already matches
+
+        match(analysis, k, rng) returns find_vc_matches()-style results. Rows are computed outside
+        any transaction and swapped in with one short write, so readers keep the previous complete
+        catalog meanwhile. Returns seconds spent building (0 when the stored catalog was current or
+        another process holds the build lease).
+        """
+        key = self.build_key(catalog_version)
+        if self.stored_key() == key:
+            return 0.0
+        with self._lock:
+            if self.stored_key() == key or not self._acquire_lease():
+                return 0.0
+            try:
+                started = time.perf_counter()
+                rows = [self._row(scenario_id, match) for scenario_id in range(1, self.count + 1)]
+                conn = self.connection()
+                with conn:
+                    conn.execute("DELETE FROM scenarios")
+                    conn.executemany("INSERT INTO scenarios (id, sector, stage, summary, bundle) VALUES (?, ?, ?, ?, ?)",
+                                     rows)
+                    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('build_key', ?)", (key,))
+                return time.perf_counter() - started
+            finally:
+                self._release_lease()
+
+    def _acquire_lease(self):
+        # One builder across processes; a dead or expired holder's lease is taken over
+        now = time.time()
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'build_lease'").fetchone()
+            if row is not None:
+                owner, expires_at = row[0].split(":")
+            free = row is None or float(expires_at) <= now or not pid_alive(int(owner))
+            if free:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('build_lease', ?)",
+                             (f"{os.getpid()}:{now + self.lease_seconds}",))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return free
+
+    def _release_lease(self):
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM meta WHERE key = 'build_lease' AND value LIKE ?", (f"{os.getpid()}:%",))
+
+    def _row(self, scenario_id, match):
+        analysis = generate_company(self.seed, scenario_id)
+        # Match scores carry a little jitter; seeding it per scenario keeps bundles reproducible
+        matches = match(analysis, self.matches, scenario_rng(self.seed, f"matches:{scenario_id}"))
+        bundle = {"id": scenario_id, "seed": self.seed, "analysis": analysis, "matches": matches}
+        return (scenario_id, analysis["sector"], analysis["funding_stage"],
+                serialization.dumps(summary(scenario_id, analysis, matches)),
+                zlib.compress(serialization.dumps(bundle), 6))
+
+    def page(self, limit=20, cursor=None, sector=None, stage=None, view="summary"):
+        """(encoded items, next cursor) in id order; view='full' returns whole bundles"""
+        column = "summary" if view == "summary" else "bundle"
+        where, params = _filters(sector, stage)
+        if cursor is not None:
+            where.append("id > ?")
+            params.append(cursor)
+        rows = self.connection().execute(
+            f"SELECT id, {column} FROM scenarios {_where(where)} ORDER BY id LIMIT ?", (*params, limit + 1)).fetchall()
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        items = [value if view == "summary" else zlib.decompress(value) for _, value in rows[:limit]]
+        return items, next_cursor
+
+    def get_encoded(self, scenario_id):
+        """One bundle as JSON bytes, or None"""
+        row = self.connection().execute("SELECT bundle FROM scenarios WHERE id = ?", (scenario_id,)).fetchone()
+        return zlib.decompress(row[0]) if row else None
+
+    def total(self, sector=None, stage=None):
+        where, params = _filters(sector, stage)
+        return self.connection().execute(f"SELECT COUNT(*) FROM scenarios {_where(where)}", params).fetchone()[0]
+
+
+def _filters(sector, stage):
+    where, params = [], []
+    if sector:
+        where.append("sector = ?")
+        params.append(sector)
+    if stage:
+        where.append("stage = ?")
+        params.append(stage)
+    return where, params
+
+
+def _where(clauses):
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, help="scenarios to generate (default DEMO_SCENARIO_COUNT)")
+    parser.add_argument("--seed", type=int, help="corpus seed (default DEMO_SCENARIO_SEED)")
+    args = parser.parse_args()
+    import app
+    if args.count is not None:
+        app.scenario_catalog.count = args.count
+    if args.seed is not None:
+        app.scenario_catalog.seed = args.seed
+    seconds = app.ensure_scenarios()
+    print(f"{app.scenario_catalog.total()} scenarios in {app.scenario_catalog.path} "
+          f"(built in {seconds:.2f}s)" if seconds else "catalog already current")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import json
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is always available
+    orjson = None
+
+# Fields the investor list view needs; stored pre-encoded next to each full record
+SUMMARY_FIELDS = ("id", "name", "type", "geography", "checks", "stages", "industries", "openRate", "logo")
+
+
+def dumps(obj):
+    """Encode to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _default(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    # Decimal, UUID, dataclasses: same handling as Flask's default provider
+    return DefaultJSONProvider.default(obj)
+
+
+def splice(envelope, key, fragments):
+    """Encode envelope with envelope[key] set to a list of already-encoded JSON fragments
+
+    The fragments (bytes or str) are copied into the output as-is, so records that were
+    encoded once when they were stored are never decoded and re-encoded per request.
+    """
+    fragments = [f.encode("utf-8") if isinstance(f, str) else f for f in fragments]
+    array = b"[" + b",".join(fragments) + b"]"
+    rest = dumps({k: v for k, v in envelope.items() if k != key})
+    prefix = b'{' + dumps(key) + b":" + array
+    return prefix + b"}" if rest == b"{}" else prefix + b"," + rest[1:]
+
+
+def parse_fields(value):
+    """Split a `fields=` parameter into a tuple of field names (None when absent)"""
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(field.strip() for field in value.split(",") if field.strip()))
+    return fields or None
+
+
+def project(record, fields):
+    return {field: record[field] for field in fields if field in record}
+
+
+def summary(record):
+    """The list-view projection of an investor record"""
+    return project(record, SUMMARY_FIELDS)
+
+
+def compact(records, fields):
+    """Column-oriented list shape: field names once, then one row of values per record"""
+    return {"fields": list(fields), "rows": [[record.get(field) for field in fields] for record in records]}
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson when installed, emitting compact bytes"""
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
@@ -0,0 +1,372 @@
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from db import LocalConnection, pid_alive
+import serialization
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_namespace ON cache_entries(namespace, generation);
+CREATE INDEX IF NOT EXISTS idx_cache_entries_accessed ON cache_entries(accessed_at);
+CREATE TABLE IF NOT EXISTS cache_generations (
+    namespace TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cache_leases (
+    key TEXT PRIMARY KEY,
+    owner_pid INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+MISSING = object()
+
+# Shared-tier values are JSON (never pickle: anyone able to write cache.db must not get code
+# execution in the workers); already-encoded response bodies are stored as raw bytes
+_JSON, _BYTES = b"j", b"b"
+
+
+def encode(value):
+    if isinstance(value, bytes):
+        return _BYTES + value
+    return _JSON + serialization.dumps(value)
+
+
+def decode(blob):
+    blob = bytes(blob)
+    if blob[:1] == _BYTES:
+        return blob[1:]
+    if blob[:1] == _JSON:
+        return serialization.loads(blob[1:])
+    raise ValueError("not a JSON or bytes cache entry")
+
+
+def cache_key(*parts):
+    """Stable key for JSON-encodable parts; long keys are hashed"""
+    encoded = serialization.dumps(parts)
+    if len(encoded) <= 128:
+        return encoded.decode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class _Flight:
+    """One in-process computation that concurrent callers for the same key wait on"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    """Two-tier memoization cache: an in-process LRU over a SQLite file shared by every worker
+
+    Entries live under a namespace; invalidate(namespace) bumps the namespace's generation, which
+    every worker notices within version_check_interval seconds. Callers may also pass a version
+    (e.g. the investor catalog version) that becomes part of the key. Values must be JSON-shaped
+    (or bytes) and come back as they read after a JSON round trip from either tier; the front tier
+    hands out shared objects, so callers must treat them as read-only. Access times feeding the
+    shared tier's LRU are batched, at most every touch_interval seconds or touch_batch hits.
+    """
+
+    def __init__(self, path, memory_entries=1024, max_bytes=256 * 1024 * 1024, version_check_interval=1.0,
+                 lease_seconds=30, evict_every=256, touch_interval=5.0, touch_batch=256):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.version_check_interval = version_check_interval
+        self.lease_seconds = lease_seconds
+        self.evict_every = evict_every
+        self.touch_interval = touch_interval
+        self.touch_batch = touch_batch
+        self._conn = LocalConnection(path, pragmas=("journal_mode=WAL", "synchronous=NORMAL"), timeout=5)
+        self._ready = False
+        self._memory = OrderedDict()  # full key -> (value, expires_at)
+        self._generations = {}  # namespace -> (generation, checked_at)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._stats = {}
+        self._touched = {}  # full key -> last access time not yet written to the shared tier
+        self._touch_flushed = time.monotonic()
+
+    def connection(self):
+        conn = self._conn.get()
+        if not self._ready:
+            conn.executescript(SCHEMA)
+            self._ready = True
+        return conn
+
+    def _count(self, namespace, event):
+        counters = self._stats.setdefault(namespace, {})
+        counters[event] = counters.get(event, 0) + 1
+
+    def generation(self, namespace):
+        """The namespace's current generation, re-read from SQLite at most every version_check_interval"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._generations.get(namespace)
+            if cached is not None and now - cached[1] < self.version_check_interval:
+                return cached[0]
+        row = self.connection().execute(
+            "SELECT generation FROM cache_generations WHERE namespace = ?", (namespace,)).fetchone()
+        generation = row[0] if row else 0
+        with self._lock:
+            self._generations[namespace] = (generation, now)
+        return generation
+
+    def _full_key(self, namespace, key, version):
+        if not isinstance(key, str):
+            key = cache_key(key)
+        generation = self.generation(namespace)
+        return f"{namespace}:{generation}:{'' if version is None else version}:{key}", generation
+
+    def get(self, namespace, key, version=None, default=None):
+        """Cached value for key, checking the front tier then the shared tier"""
+        full_key, _ = self._full_key(namespace, key, version)
+        value = self._lookup(namespace, full_key)
+        return default if value is MISSING else value
+
+    def _lookup(self, namespace, full_key, count=True):
+        """Value from either tier or MISSING; count=False for re-checks that aren't a new lookup"""
+        now = time.time()
+        value = MISSING
+        with self._lock:
+            entry = self._memory.get(full_key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._memory.move_to_end(full_key)
+                    if count:
+                        self._count(namespace, "memory_hits")
+                    value, due = entry[0], self._touch(full_key, now)
+                else:
+                    del self._memory[full_key]
+        if value is not MISSING:
+            if due:
+                self.flush_touches()
+            return value
+        conn = self.connection()
+        row = conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (full_key,)).fetchone()
+        if row is not None and (row[1] is None or row[1] > now):
+            try:
+                value = decode(row[0])
+            except Exception as e:
+                # Written by an older build (e.g. pickled); treat as a miss
+                logger.warning(f"Dropping unreadable cache entry {full_key}: {e}")
+                with conn:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (full_key,))
+        with self._lock:
+            if value is MISSING:
+                if count:
+                    self._count(namespace, "misses")
+                return MISSING
+            if count:
+                self._count(namespace, "shared_hits")
+            self._remember(full_key, value, row[1])
+            due = self._touch(full_key, now)
+        if due:
+            self.flush_touches()
+        return value
+
+    def _touch(self, full_key, now):
+        """Record an access (lock held); True when the batch is due to be written"""
+        self._touched[full_key] = now
+        return len(self._touched) >= self.touch_batch or time.monotonic() - self._touch_flushed >= self.touch_interval
+
+    def flush_touches(self):
+        """Write batched access times to the shared tier in one transaction"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._touch_flushed = time.monotonic()
+        if touched:
+            conn = self.connection()
+            with conn:
+                conn.executemany("UPDATE cache_entries SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                                 [(at, key, at) for key, at in touched.items()])
+        return len(touched)
+
+    def set(self, namespace, key, value, ttl=None, version=None):
+        """Store a value in both tiers; ttl None keeps it until evicted or invalidated"""
+        full_key, generation = self._full_key(namespace, key, version)
+        return self._store(namespace, full_key, generation, value, ttl)
+
+    def _store(self, namespace, full_key, generation, value, ttl):
+        """Store and return the value as it reads back, so hits and misses hand out the same shape"""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        blob = encode(value)
+        value = decode(blob)
+        with self._lock:
+            self._remember(full_key, value, expires_at)
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, namespace, generation, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)", (full_key, namespace, generation, blob, len(blob), expires_at, now))
+        if evict:
+            self.evict()
+        return value
+
+    def _remember(self, full_key, value, expires_at):
+        self._memory[full_key] = (value, expires_at)
+        self._memory.move_to_end(full_key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get_or_compute(self, namespace, key, compute, ttl=None, version=None):
+        """Cached value for key, or compute() stored in both tiers
+
+        Concurrent misses for one key run compute() once: threads in this worker wait on the
+        first caller, and other workers wait on its SQLite lease until the value lands.
+        """
+        full_key, generation = self._full_key(namespace, key, version)
+        value = self._lookup(namespace, full_key)
+        if value is not MISSING:
+            return value
+        with self._lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = _Flight()
+            else:
+                self._count(namespace, "collapsed")
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = self._compute_shared(namespace, full_key, generation, compute, ttl)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(full_key, None)
+            flight.done.set()
+
+    def _compute_shared(self, namespace, full_key, generation, compute, ttl):
+        delay = 0.005
+        deadline = time.monotonic() + self.lease_seconds
+        while not self._acquire_lease(full_key):
+            # Another worker is computing this key; pick up its result once stored
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            value = self._lookup(namespace, full_key, count=False)
+            if value is not MISSING:
+                with self._lock:
+                    self._count(namespace, "collapsed")
+                return value
+            if time.monotonic() >= deadline:
+                break
+        try:
+            # It may have landed between our miss and taking the lease
+            value = self._lookup(namespace, full_key, count=False)
+            if value is not MISSING:
+                with self._lock:
+                    self._count(namespace, "collapsed")
+                return value
+            with self._lock:
+                self._count(namespace, "computed")
+            return self._store(namespace, full_key, generation, compute(), ttl)
+        finally:
+            self._release_lease(full_key)
+
+    def _acquire_lease(self, full_key):
+        now = time.time()
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner_pid, expires_at FROM cache_leases WHERE key = ?", (full_key,)).fetchone()
+            # Leases expire, and a dead owner's lease is taken over, so a killed worker can't wedge a key
+            free = row is None or row[1] <= now or (row[0] != os.getpid() and not pid_alive(row[0]))
+            if free:
+                conn.execute("INSERT OR REPLACE INTO cache_leases (key, owner_pid, expires_at) VALUES (?, ?, ?)",
+                             (full_key, os.getpid(), now + self.lease_seconds))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return free
+
+    def _release_lease(self, full_key):
+        conn = self.connection()
+        with conn:
+            conn.execute("DELETE FROM cache_leases WHERE key = ? AND owner_pid = ?", (full_key, os.getpid()))
+
+    def memoize(self, namespace, ttl=None, key=None, version=None):
+        """Decorator caching a function's results; key(*args, **kwargs) and version() are optional callables"""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                parts = key(*args, **kwargs) if key is not None else (args, sorted(kwargs.items()))
+                return self.get_or_compute(namespace, parts, lambda: fn(*args, **kwargs), ttl=ttl,
+                                           version=version() if version is not None else None)
+            return wrapper
+        return decorator
+
+    def invalidate(self, namespace):
+        """Drop a namespace everywhere by moving it to a new generation"""
+        conn = self.connection()
+        with conn:
+            conn.execute("INSERT INTO cache_generations (namespace, generation) VALUES (?, 1) "
+                         "ON CONFLICT(namespace) DO UPDATE SET generation = generation + 1", (namespace,))
+            generation = conn.execute("SELECT generation FROM cache_generations WHERE namespace = ?",
+                                      (namespace,)).fetchone()[0]
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND generation < ?", (namespace, generation))
+        prefix = f"{namespace}:"
+        with self._lock:
+            self._generations[namespace] = (generation, time.monotonic())
+            for stale in [k for k in self._memory if k.startswith(prefix)]:
+                del self._memory[stale]
+        return generation
+
+    def evict(self):
+        """Delete expired shared entries, then least recently used ones until the tier fits in max_bytes"""
+        self.flush_touches()
+        now = time.time()
+        conn = self.connection()
+        with conn:
+            removed = conn.execute("DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?",
+                                   (now,)).rowcount
+            conn.execute("DELETE FROM cache_leases WHERE expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()[0]
+            if total > self.max_bytes:
+                doomed, excess = [], total - self.max_bytes
+                for key, size in conn.execute("SELECT key, size FROM cache_entries ORDER BY accessed_at"):
+                    if excess <= 0:
+                        break
+                    doomed.append((key,))
+                    excess -= size
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", doomed)
+                removed += len(doomed)
+        return removed
+
+    def stats(self, namespace=None):
+        """Hit/miss/collapse counters for this worker, per namespace or for one"""
+        with self._lock:
+            if namespace is not None:
+                return dict(self._stats.get(namespace, {}))
+            return {"memory_entries": len(self._memory),
+                    "namespaces": {name: dict(counters) for name, counters in self._stats.items()}}
@@ -10,21 +10,26 @@ function initializeAnalytics() {
     setupAnalyticsInteractions();
 }
 
-async function loadAnalyticsData() {
-    try {
-        const response = await fetch('/api/analytics-dashboard');
-        const analytics = await response.json();
-        
-        if (window.location.pathname === '/') {
-            updateLandingPageAnalytics(analytics);
-        } else {
-            updateDashboardAnalytics(analytics);
-        }
-        
-    } catch (error) {
-        console.error('Failed to load analytics:', error);
+// Analytics arrive as a snapshot on subscribe, then as pushed deltas
+function loadAnalyticsData() {
+    if (typeof Realtime === 'undefined') {
         showFallbackAnalytics();
+        return;
     }
+    Realtime.onUpdate((room, topic, analytics) => {
+        if (room !== 'analytics' || topic !== 'summary' || !analytics) return;
+        try {
+            if (window.location.pathname === '/') {
+                updateLandingPageAnalytics(analytics);
+            } else {
+                updateDashboardAnalytics(analytics);
+            }
+        } catch (error) {
+            console.error('Failed to apply analytics:', error);
+            showFallbackAnalytics();
+        }
+    });
+    Realtime.subscribe({ analytics: true });
 }
 
 function updateLandingPageAnalytics(analytics) {
@@ -71,12 +76,12 @@ function updateLTVDisplay(ltvData) {
 
 function updateMarketData(marketData) {
     const tamElement = document.querySelector('.market-value');
-    if (tamElement) {
+    if (tamElement && marketData.tam) {
         tamElement.textContent = marketData.tam;
     }
     
     const growthElement = document.querySelector('.market-growth');
-    if (growthElement) {
+    if (growthElement && marketData.growth_rate) {
         growthElement.textContent = `+${marketData.growth_rate} Growth`;
     }
     
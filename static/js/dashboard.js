@@ -28,18 +28,15 @@ function setupFormHandlers() {
     }
 }
 
-async function loadAnalytics() {
-    try {
-        const response = await fetch('/api/analytics-dashboard');
-        const analytics = await response.json();
-        
-        updateConversionMetrics(analytics.conversion_metrics);
-        updateLTVMetrics(analytics.ltv_by_persona);
-        updateMarketIntelligence(analytics.market_intelligence);
-        
-    } catch (error) {
-        console.error('Failed to load analytics:', error);
-    }
+// Analytics arrive as a snapshot on subscribe, then as pushed deltas
+function loadAnalytics() {
+    Realtime.onUpdate((room, topic, analytics) => {
+        if (room !== 'analytics' || topic !== 'summary' || !analytics) return;
+        updateConversionMetrics(analytics.conversion_metrics || {});
+        updateLTVMetrics(analytics.ltv_by_persona || {});
+        updateMarketIntelligence(analytics.market_intelligence || {});
+    });
+    Realtime.subscribe({ analytics: true });
 }
 
 function updatePersonaMetrics() {
@@ -122,7 +119,7 @@ function updateLTVMetrics(ltvData) {
 function updateMarketIntelligence(marketData) {
     // Update market position metrics if elements exist
     const tamElement = document.querySelector('.market-value');
-    if (tamElement) {
+    if (tamElement && marketData.tam) {
         tamElement.textContent = marketData.tam;
     }
 }
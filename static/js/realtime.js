@@ -0,0 +1,130 @@
+// Realtime updates: Socket.IO push with a polling fallback
+const Realtime = (function() {
+    const POLL_INTERVAL = 5000;
+    const state = {};
+    const listeners = [];
+    let seq = 0;
+    let subscription = null;
+    let socket = null;
+    let pollTimer = null;
+
+    function key(room, topic) {
+        return room + '|' + topic;
+    }
+
+    function notify(room, topic) {
+        listeners.forEach(listener => listener(room, topic, state[key(room, topic)]));
+    }
+
+    function applySnapshot(snapshot) {
+        snapshot.states.forEach(entry => {
+            state[key(entry.room, entry.topic)] = entry.state;
+            notify(entry.room, entry.topic);
+        });
+        seq = Math.max(seq, snapshot.seq);
+    }
+
+    function applyDelta(message) {
+        if (message.seq <= seq) return;
+        const k = key(message.room, message.topic);
+        let target = state[k] || {};
+        message.delta.set.forEach(([path, value]) => {
+            if (path.length === 0) {
+                target = value;
+                return;
+            }
+            let node = target;
+            path.slice(0, -1).forEach(part => {
+                if (typeof node[part] !== 'object' || node[part] === null) node[part] = {};
+                node = node[part];
+            });
+            node[path[path.length - 1]] = value;
+        });
+        message.delta.unset.forEach(path => {
+            let node = target;
+            path.slice(0, -1).forEach(part => { node = node ? node[part] : undefined; });
+            if (node) delete node[path[path.length - 1]];
+        });
+        state[k] = target;
+        seq = message.seq;
+        notify(message.room, message.topic);
+    }
+
+    function queryString(params) {
+        const query = new URLSearchParams({ since: seq });
+        if (params.market) query.set('market', '1');
+        if (params.analytics) query.set('analytics', '1');
+        if (params.vc_id !== undefined) query.set('vc_id', params.vc_id);
+        if (params.founder_id) query.set('founder_id', params.founder_id);
+        // vc and founder rooms need the subscribe_token the API issued to their owner
+        if (params.token) query.set('token', params.token);
+        return query.toString();
+    }
+
+    async function poll() {
+        try {
+            const response = await fetch('/api/updates?' + queryString(subscription));
+            const updates = await response.json();
+            if (!response.ok) throw new Error(updates.message);
+            if (updates.states) {
+                applySnapshot(updates);
+            } else {
+                updates.deltas.forEach(applyDelta);
+            }
+        } catch (error) {
+            console.error('Realtime poll failed:', error);
+        }
+    }
+
+    function startPolling() {
+        if (pollTimer) return;
+        poll();
+        pollTimer = setInterval(poll, POLL_INTERVAL);
+    }
+
+    function stopPolling() {
+        clearInterval(pollTimer);
+        pollTimer = null;
+    }
+
+    // Scripts on one page share a connection; each subscribe() adds its rooms to it
+    function subscribe(params) {
+        const joining = subscription !== null;
+        subscription = Object.assign({}, subscription, params);
+        if (joining) {
+            if (socket && socket.connected) {
+                socket.emit('subscribe', params);
+            } else if (pollTimer) {
+                // Start over from a snapshot so it includes the new rooms
+                seq = 0;
+                poll();
+            }
+            if (socket) return;
+        }
+        if (typeof io === 'undefined') {
+            startPolling();
+            return;
+        }
+        // Websocket only: a polling session would have to stick to one server worker
+        socket = io({ transports: ['websocket'] });
+        socket.on('connect', () => {
+            stopPolling();
+            socket.emit('subscribe', subscription);
+        });
+        socket.on('snapshot', applySnapshot);
+        socket.on('delta', applyDelta);
+        socket.on('subscribe_error', error => console.error('Realtime subscribe refused:', error.message));
+        socket.on('disconnect', startPolling);
+        socket.on('connect_error', startPolling);
+    }
+
+    function onUpdate(listener) {
+        listeners.push(listener);
+    }
+
+    function get(room, topic) {
+        return state[key(room, topic)];
+    }
+
+    return { subscribe, onUpdate, get };
+})();
@@ -3,6 +3,7 @@ let currentScenarioIndex = 0;
 let scenarios = [];
 let currentPersona = 'entrepreneur';
 let scenarioInterval;
+const CAROUSEL_SIZE = 6;
 
 document.addEventListener('DOMContentLoaded', function() {
     if (document.getElementById('scenarioCarousel')) {
@@ -14,11 +15,15 @@ document.addEventListener('DOMContentLoaded', function() {
 
 async function loadDemoScenarios() {
     try {
-        const response = await fetch('/api/demo-scenarios');
+        const response = await fetch(`/api/demo-scenarios?limit=${CAROUSEL_SIZE}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
         const data = await response.json();
         
-        // Store all scenarios by persona
-        window.allScenarios = data;
+        // Every persona browses the same precomputed companies; the highlights differ per persona
+        const catalog = data.scenarios.map(catalogScenario);
+        window.allScenarios = { entrepreneur: catalog, consultant: catalog, seller: catalog };
         
         // Load entrepreneur scenarios by default
         loadPersonaScenarios('entrepreneur');
@@ -29,6 +34,20 @@ async function loadDemoScenarios() {
     }
 }
 
+// A catalog summary from /api/demo-scenarios, with the fields the wizard prefills from
+function catalogScenario(entry) {
+    return {
+        catalog_id: entry.id,
+        name: entry.company_name,
+        type: `${entry.funding_stage} - raising ${entry.funding_amount}`,
+        industry: entry.sector,
+        ai_system: entry.business_model,
+        geography: entry.geography,
+        match_count: entry.match_count,
+        top_match: entry.top_match
+    };
+}
+
 function loadPersonaScenarios(persona) {
     currentPersona = persona;
     scenarios = window.allScenarios[persona] || [];
@@ -137,6 +156,9 @@ function renderScenarios() {
 }
 
 function createScenarioCard(scenario, index) {
+    if (scenario.catalog_id) {
+        return createCatalogCard(scenario, index);
+    }
     const card = document.createElement('div');
     card.className = 'scenario-card';
     
@@ -188,6 +210,60 @@ function createScenarioCard(scenario, index) {
     return card;
 }
 
+function createCatalogCard(scenario, index) {
+    const card = document.createElement('div');
+    card.className = 'scenario-card';
+    
+    const top = scenario.top_match;
+    const compatibility = top ? top.compatibility : 0;
+    const highlights = getPersonaHighlights(scenario, currentPersona);
+    
+    card.innerHTML = `
+        <div class="scenario-header">
+            <h3 class="scenario-title">${scenario.name}</h3>
+            <span class="scenario-status ${top ? 'compliant' : 'partial'}">${top ? '✅ Investors Matched' : '⚠️ No Strong Match'}</span>
+        </div>
+        
+        <div class="scenario-content">
+            <div class="scenario-info">
+                <h4>Company Type</h4>
+                <p>${scenario.type}</p>
+                
+                <h4>Industry</h4>
+                <p>${scenario.industry}</p>
+                
+                <h4>Business Model</h4>
+                <p>${scenario.ai_system}</p>
+                
+                <h4>Top Investor Match</h4>
+                <p>${top ? top.name : 'None above threshold'}</p>
+            </div>
+            
+            <div class="scenario-metrics">
+                <div class="metric">
+                    <div class="metric-value compliance" style="color: ${getScoreColor(compatibility)}">${compatibility}</div>
+                    <div class="metric-label">Compatibility</div>
+                </div>
+                <div class="metric">
+                    <div class="metric-value">${scenario.match_count}</div>
+                    <div class="metric-label">Matches</div>
+                </div>
+            </div>
+        </div>
+        
+        <div class="scenario-footer">
+            <div class="scenario-impact">
+                <strong>Location:</strong> ${scenario.geography}
+            </div>
+            <button class="btn-primary" onclick="analyzeScenario(${index})">
+                <i class="fas fa-search"></i> ${highlights.ctaText}
+            </button>
+        </div>
+    `;
+    
+    return card;
+}
+
 function getPersonaHighlights(scenario, persona) {
     switch(persona) {
         case 'entrepreneur':
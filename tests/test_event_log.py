@@ -0,0 +1,84 @@
+"""EventLog compaction and LogFollower across compactions, with two logs standing in for two workers"""
+import os
+
+from event_log import EventLog, IdGenerator, LogFollower, replay
+
+
+def pass_key(record):
+    return (record["vc"], record["startup"]) if record["type"] == "pass" else None
+
+
+def test_compaction_keeps_the_latest_record_per_key(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = EventLog(path, fsync=False, compact_key=pass_key)
+    for startup in (1, 2, 1):
+        log.append("pass", {"vc": 7, "startup": startup})
+    log.append("view", {"vc": 7})
+    log.flush()
+    log.compact()
+    records = list(replay(path))
+    assert [(r["type"], r["startup"]) for r in records] == [("pass", 2), ("pass", 1)]
+    assert log.stats()["compactions"] == 1
+
+
+def test_log_compacts_itself_past_the_size_threshold(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = EventLog(path, fsync=False, flush_bytes=1, compact_key=pass_key, compact_bytes=2000)
+    for i in range(200):
+        log.append("pass", {"vc": 1, "startup": i % 5})
+    log.flush()
+    assert log.compactions >= 1
+    assert os.path.getsize(path) < 2000
+    assert {r["startup"] for r in replay(path)} == {0, 1, 2, 3, 4}
+
+
+def test_writer_holding_the_old_file_appends_to_the_new_one(tmp_path):
+    path = str(tmp_path / "events.log")
+    worker_a = EventLog(path, fsync=False, compact_key=pass_key)
+    worker_b = EventLog(path, fsync=False, compact_key=pass_key)
+    worker_a.append("pass", {"vc": 1, "startup": 1})
+    worker_a.flush()
+    worker_b.compact()
+    worker_a.append("pass", {"vc": 1, "startup": 2})
+    worker_a.flush()
+    assert [r["startup"] for r in replay(path)] == [1, 2]
+
+
+def test_follower_streams_and_survives_compaction(tmp_path):
+    path = str(tmp_path / "events.log")
+    log = EventLog(path, fsync=False, compact_key=pass_key)
+    seen = []
+    follower = LogFollower(path, lambda record: seen.append(record["startup"]), chunk_bytes=64)
+    for startup in range(20):
+        log.append("pass", {"vc": 1, "startup": startup % 4})
+    log.flush()
+    assert follower.catch_up() == 20
+    assert seen == [startup % 4 for startup in range(20)]
+    assert follower.catch_up() == 0
+
+    log.compact()
+    log.append("pass", {"vc": 1, "startup": 9})
+    log.flush()
+    seen.clear()
+    # A compacted log is a new file: the follower re-reads the snapshot, then the new record
+    assert follower.catch_up() == 5
+    assert seen == [0, 1, 2, 3, 9]
+
+
+def test_follower_waits_for_whole_lines(tmp_path):
+    path = str(tmp_path / "events.log")
+    with open(path, "wb") as f:
+        f.write(b'{"id":"a","type":"pass","vc":1,"startup":1}\n{"id":"b","type":"pa')
+    seen = []
+    follower = LogFollower(path, lambda record: seen.append(record["id"]), chunk_bytes=8)
+    assert follower.catch_up() == 1
+    with open(path, "ab") as f:
+        f.write(b'ss","vc":1,"startup":2}\n')
+    assert follower.catch_up() == 1
+    assert seen == ["a", "b"]
+
+
+def test_token_ids_are_random():
+    ids = {IdGenerator.token("intro") for _ in range(100)}
+    assert len(ids) == 100
+    assert all(event_id.startswith("intro_") and len(event_id) > 20 for event_id in ids)
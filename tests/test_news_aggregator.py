@@ -0,0 +1,185 @@
+"""NewsAggregator against stub feeds served from a threaded http.server on loopback"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import news_aggregator
+from news_aggregator import CircuitBreaker, NewsAggregator, NewsSource, headline_key
+
+RSS = """<?xml version="1.0"?>
+<rss version="2.0"><channel>
+<item><title>ACME raises $10M Series A!</title><pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Beta Labs closes $3M seed</title></item>
+</channel></rss>"""
+
+
+class Feed(BaseHTTPRequestHandler):
+    """Serves server.feeds[path] = (status, delay, content type, body)"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] = server.hits.get(self.path, 0) + 1
+            status, delay, content_type, body = server.feeds[self.path]
+        if delay:
+            server.release.wait(delay)
+        body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FeedServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Feed)
+        self.lock = threading.Lock()
+        self.feeds = {}
+        self.hits = {}
+        self.release = threading.Event()
+
+    def handle_error(self, request, client_address):
+        pass  # timed-out clients hang up before the slow feed answers
+
+    def source(self, name, path, status=200, delay=0, body="[]", format="json", timeout=2.0):
+        content_type = "application/rss+xml" if format == "rss" else "application/json"
+        self.feeds[path] = (status, delay, content_type, body)
+        return NewsSource(name, f"http://127.0.0.1:{self.server_address[1]}{path}", format, timeout)
+
+
+@pytest.fixture
+def server():
+    server = FeedServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def deals(*titles):
+    return json.dumps({"deals": [{"title": title, "time": "1 hour ago"} for title in titles]})
+
+
+def titles(snapshot):
+    return [item["title"] for item in snapshot]
+
+
+def test_merges_sources_and_dedups_headlines(server):
+    aggregator = NewsAggregator([
+        server.source("wire", "/wire", body=deals("Acme raises $10M Series A", "Gamma AI raises $25M")),
+        server.source("blog", "/blog.rss", body=RSS, format="rss"),
+    ])
+    snapshot = aggregator.refresh_now()
+    # The RSS copy of the Acme story differs only in case and punctuation; the first source wins
+    assert titles(snapshot) == ["Acme raises $10M Series A", "Gamma AI raises $25M", "Beta Labs closes $3M seed"]
+    assert snapshot[0]["source"] == "wire"
+    assert snapshot[2]["source"] == "blog"
+    assert headline_key("ACME raises $10M Series A!") == headline_key("Acme raises $10M Series A")
+
+
+def test_snapshot_is_capped_at_max_items(server):
+    aggregator = NewsAggregator([server.source("wire", "/wire", body=deals(*[f"Deal {i}" for i in range(10)]))],
+                                max_items=4)
+    assert titles(aggregator.refresh_now()) == ["Deal 0", "Deal 1", "Deal 2", "Deal 3"]
+
+
+def test_slow_source_times_out_without_holding_up_the_others(server):
+    aggregator = NewsAggregator([
+        server.source("slow", "/slow", delay=5, body=deals("Late story"), timeout=0.2),
+        server.source("fast", "/fast", body=deals("Prompt story")),
+    ])
+    started = time.perf_counter()
+    snapshot = aggregator.refresh_now()
+    assert time.perf_counter() - started < 2
+    assert titles(snapshot) == ["Prompt story"]
+    assert aggregator.breakers["slow"].failures == 1
+    assert aggregator.breakers["fast"].failures == 0
+
+
+def test_failed_refresh_keeps_the_previous_snapshot(server):
+    initial = ({"title": "Curated deal", "time": "today", "source": "curated"},)
+    aggregator = NewsAggregator([server.source("down", "/down", status=500)], initial=initial)
+    assert aggregator.refresh_now() == initial
+    assert aggregator.updated_at is None
+
+
+def test_breaker_opens_then_half_opens(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(news_aggregator.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    now[0] += 30
+    assert breaker.state == "half-open" and breaker.allow()
+    # One failure while half-open reopens it for another full cool-down
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] += 30
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_open_breaker_skips_the_source_until_the_cool_down(server):
+    aggregator = NewsAggregator([server.source("flaky", "/flaky", status=503),
+                                 server.source("wire", "/wire", body=deals("Steady story"))])
+    for _ in range(3):
+        aggregator.refresh_now()
+    assert aggregator.source_status() == {"flaky": "open", "wire": "closed"}
+    aggregator.refresh_now()
+    assert server.hits["/flaky"] == 3
+
+    breaker = aggregator.breakers["flaky"]
+    breaker.opened_at -= breaker.reset_timeout  # the cool-down has passed
+    assert aggregator.source_status()["flaky"] == "half-open"
+    server.feeds["/flaky"] = (200, 0, "application/json", deals("Recovered story"))
+    assert titles(aggregator.refresh_now()) == ["Recovered story", "Steady story"]
+    assert server.hits["/flaky"] == 4
+    assert aggregator.source_status()["flaky"] == "closed"
+
+
+def test_update_hook_fires_only_on_change(server):
+    updates = []
+    aggregator = NewsAggregator([server.source("wire", "/wire", body=deals("Acme raises $10M"))],
+                                on_update=updates.append)
+    aggregator.refresh_now()
+    aggregator.refresh_now()
+    assert len(updates) == 1
+    server.feeds["/wire"] = (200, 0, "application/json", deals("Acme raises $10M", "Beta raises $2M"))
+    aggregator.refresh_now()
+    assert [titles(update) for update in updates] == [["Acme raises $10M"], ["Acme raises $10M", "Beta raises $2M"]]
+
+
+def test_background_loop_refreshes_and_stops(server):
+    aggregator = NewsAggregator([server.source("wire", "/wire", body=deals("Loop story"))], interval=0.05)
+    aggregator.ensure_started()
+    thread = aggregator._thread
+    aggregator.ensure_started()
+    assert aggregator._thread is thread
+    deadline = time.monotonic() + 5
+    while server.hits.get("/wire", 0) < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    aggregator.stop()
+    assert server.hits["/wire"] >= 2
+    assert titles(aggregator.snapshot()) == ["Loop story"]
+    assert not thread.is_alive()
+
+
+def test_no_sources_never_starts_a_thread():
+    aggregator = NewsAggregator([], initial=({"title": "Curated", "time": "today", "source": "curated"},))
+    aggregator.ensure_started()
+    assert aggregator._thread is None
+    assert titles(aggregator.refresh_now()) == ["Curated"]
@@ -0,0 +1,246 @@
+"""ResilientTransport and SharedClient against a threaded stand-in server on loopback"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+import outbound
+from outbound import ResilientTransport, RetryPolicy, SharedClient
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """Replies from a per-server script: path -> list of (status, delay, headers), last entry repeats"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.handle_path()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.handle_path()
+
+    def handle_path(self):
+        server = self.server
+        with server.lock:
+            seen = server.hits.setdefault(self.path, 0)
+            server.hits[self.path] += 1
+            script = server.script.get(self.path, [(200, 0, ())])
+            status, delay, headers = script[min(seen, len(script) - 1)]
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            if delay == "block":
+                server.release.wait(5)
+            elif delay:
+                time.sleep(delay)
+            body = b'{"ok":true}'
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandIn)
+        self.lock = threading.Lock()
+        self.script = {}
+        self.hits = {}
+        self.active = self.peak = 0
+        self.release = threading.Event()
+
+    def handle_error(self, request, client_address):
+        pass  # hedge losers are closed mid-response
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+def client(**options):
+    inner = httpx.HTTPTransport()
+    return httpx.Client(transport=ResilientTransport(inner, **options), timeout=5)
+
+
+def fast_retry(attempts=3):
+    return RetryPolicy(attempts=attempts, backoff=0.01, max_backoff=0.02)
+
+
+def test_retries_server_errors_until_success(server):
+    server.script["/flaky"] = [(503, 0, ()), (502, 0, ()), (200, 0, ())]
+    with client(retry=fast_retry()) as http:
+        response = http.get(server.url + "/flaky")
+    assert response.status_code == 200
+    assert server.hits["/flaky"] == 3
+
+
+def test_gives_up_after_the_last_attempt(server):
+    server.script["/down"] = [(500, 0, ())]
+    with client(retry=fast_retry(attempts=2)) as http:
+        response = http.get(server.url + "/down")
+    assert response.status_code == 500
+    assert server.hits["/down"] == 2
+
+
+def test_post_is_only_resent_when_safe(server):
+    server.script["/submit"] = [(500, 0, ()), (200, 0, ())]
+    with client(retry=fast_retry()) as http:
+        assert http.post(server.url + "/submit", json={}).status_code == 500
+        assert server.hits["/submit"] == 1
+        # An Idempotency-Key makes the POST replayable
+        response = http.post(server.url + "/submit", json={}, headers={"Idempotency-Key": "k1"})
+    assert response.status_code == 200
+    assert server.hits["/submit"] == 2
+
+
+def test_rejected_post_is_resent(server):
+    server.script["/busy"] = [(429, 0, (("Retry-After", "0"),)), (200, 0, ())]
+    with client(retry=fast_retry()) as http:
+        assert http.post(server.url + "/busy", json={}).status_code == 200
+    assert server.hits["/busy"] == 2
+
+
+def test_backoff_is_full_jitter_under_the_cap(monkeypatch):
+    bounds = []
+    monkeypatch.setattr(outbound.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+    policy = RetryPolicy(backoff=0.2, max_backoff=1.0)
+    assert [policy.delay(attempt) for attempt in (1, 2, 3, 4)] == [0.2, 0.4, 0.8, 1.0]
+    assert bounds == [(0, 0.2), (0, 0.4), (0, 0.8), (0, 1.0)]
+
+
+def test_jittered_delays_vary():
+    policy = RetryPolicy(backoff=1.0, max_backoff=1.0)
+    delays = {policy.delay(1) for _ in range(20)}
+    assert len(delays) > 1
+    assert all(0 <= delay <= 1.0 for delay in delays)
+
+
+def test_retry_after_overrides_backoff_and_is_capped():
+    policy = RetryPolicy(max_retry_after=0.5)
+    assert policy.delay(1, retry_after=0.1) == 0.1
+    assert policy.delay(1, retry_after=60) == 0.5
+    response = httpx.Response(503, headers={"Retry-After": "3"})
+    assert outbound.retry_after_seconds(response) == 3.0
+
+
+def test_retries_connection_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200)
+
+    transport = ResilientTransport(httpx.MockTransport(handler), retry=fast_retry())
+    with httpx.Client(transport=transport) as http:
+        assert http.post("http://stub.test/submit", json={}).status_code == 200
+    assert len(calls) == 2
+
+
+def test_hedge_answers_before_a_stalled_primary(server):
+    server.script["/tail"] = [(200, 2.0, ()), (200, 0, ())]
+    with client(hedge_after=0.05, retry=fast_retry(attempts=1)) as http:
+        started = time.perf_counter()
+        response = http.get(server.url + "/tail")
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 200
+    assert elapsed < 1.0
+    assert server.hits["/tail"] == 2
+
+
+def test_fast_primary_sends_no_hedge(server):
+    with client(hedge_after=0.5) as http:
+        assert http.get(server.url + "/fast").status_code == 200
+    assert server.hits["/fast"] == 1
+
+
+def test_post_without_idempotency_key_is_never_hedged(server):
+    server.script["/slow"] = [(200, 0.3, ())]
+    with client(hedge_after=0.05) as http:
+        assert http.post(server.url + "/slow", json={}).status_code == 200
+    assert server.hits["/slow"] == 1
+
+
+def test_per_host_cap_limits_concurrent_requests(server):
+    server.script["/hold"] = [(200, "block", ())]
+    with client(max_per_host=2) as http, ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(http.get, server.url + "/hold") for _ in range(5)]
+        deadline = time.monotonic() + 2
+        while server.active < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)  # give any request that slipped past the cap time to arrive
+        assert server.active == 2
+        server.release.set()
+        assert all(future.result().status_code == 200 for future in futures)
+    assert server.peak == 2
+    assert server.hits["/hold"] == 5
+
+
+def test_open_stream_holds_its_slot_until_closed(server):
+    transport = ResilientTransport(httpx.HTTPTransport(), max_per_host=1, acquire_timeout=0.1,
+                                   retry=fast_retry(attempts=1))
+    with httpx.Client(transport=transport) as http:
+        with http.stream("GET", server.url + "/a"):
+            with pytest.raises(httpx.PoolTimeout):
+                http.get(server.url + "/b")
+        assert http.get(server.url + "/b").status_code == 200
+
+
+def test_shared_client_is_one_per_process(monkeypatch):
+    shared = SharedClient(retry=fast_retry())
+    first = shared.get()
+    assert shared.get() is first
+    assert isinstance(first._transport, ResilientTransport)
+    monkeypatch.setattr(outbound.os, "getpid", lambda: -1)
+    forked = shared.get()
+    assert forked is not first
+    shared.close()
+    first.close()
+    assert shared._client is None
+
+
+def test_shared_client_reads_env(monkeypatch):
+    monkeypatch.setenv("OUTBOUND_MAX_PER_HOST", "4")
+    monkeypatch.setenv("OUTBOUND_RETRY_ATTEMPTS", "5")
+    monkeypatch.setenv("OUTBOUND_HEDGE_AFTER_MS", "250")
+    shared = SharedClient.from_env(timeout=2.0)
+    assert shared.options["max_per_host"] == 4
+    assert shared.options["retry"].attempts == 5
+    assert shared.options["hedge_after"] == 0.25
+    assert shared.options["timeout"] == 2.0
+    transport = shared.get()._transport
+    assert transport.max_per_host == 4 and transport.hedge_after == 0.25
+    shared.close()
+
+
+def test_shared_client_talks_to_server(server):
+    shared = SharedClient(retry=fast_retry(), max_per_host=2)
+    server.script["/flaky"] = [(503, 0, (("Retry-After", "0"),)), (200, 0, ())]
+    try:
+        assert shared.get().get(server.url + "/flaky").json() == {"ok": True}
+    finally:
+        shared.close()
+    assert server.hits["/flaky"] == 2
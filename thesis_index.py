@@ -0,0 +1,129 @@
+import math
+import re
+import zlib
+from collections import Counter
+
+import numpy as np
+
+DEFAULT_DIMENSIONS = 1024
+DEFAULT_CANDIDATES = 50
+MIN_SIMILARITY = 0.05
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or our that the their this "
+    "to we with who will than more most over per".split()
+)
+
+
+def fund_text(fund):
+    """Thesis text for a VC record: description, portfolio companies and industries"""
+    parts = [fund.get("description") or ""]
+    parts.extend(fund.get("portfolio") or [])
+    parts.extend(fund.get("industries") or [])
+    return " ".join(str(part) for part in parts)
+
+
+def company_text(analysis):
+    """Thesis text for a company analysis: deck summary, business model, advantages and sector"""
+    parts = [analysis.get("deck_summary") or "", analysis.get("business_model") or ""]
+    advantages = analysis.get("competitive_advantages") or []
+    parts.extend(advantages if isinstance(advantages, list) else [advantages])
+    parts.append(analysis.get("sector") or "")
+    return " ".join(str(part) for part in parts)
+
+
+def terms(text):
+    """Unigrams and bigrams of the non-stopword tokens"""
+    words = [word for word in _WORD_RE.findall((text or "").lower()) if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingVectorizer:
+    """Signed feature hashing of term frequencies into a fixed number of dimensions; no vocabulary to fit"""
+
+    def __init__(self, dimensions=DEFAULT_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def transform(self, text):
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term, count in Counter(terms(text)).items():
+            # crc32 is stable across processes, unlike hash() under PYTHONHASHSEED
+            h = zlib.crc32(term.encode("utf-8"))
+            sign = 1.0 if (h // self.dimensions) & 1 else -1.0
+            vector[h % self.dimensions] += sign * (1.0 + math.log(count))
+        return vector
+
+
+class ThesisIndex:
+    """TF-IDF weighted hashed vectors of VC theses in one contiguous float32 matrix for cosine search
+
+    An index is never modified after construction; updated() returns a new one, so a caller can
+    swap it in while concurrent searches finish on the old arrays.
+    """
+
+    def __init__(self, funds, dimensions=DEFAULT_DIMENSIONS):
+        self.vectorizer = HashingVectorizer(dimensions)
+        funds = list(funds)
+        tf = np.zeros((len(funds), dimensions), dtype=np.float32)
+        for row, fund in enumerate(funds):
+            tf[row] = self.vectorizer.transform(fund_text(fund))
+        self._fit(np.array([fund["id"] for fund in funds], dtype=np.int64), tf)
+
+    def _fit(self, fund_ids, tf):
+        self.fund_ids = fund_ids
+        # Raw term frequencies are kept so funds can be added or removed without re-reading the catalog
+        self.tf = tf
+        # Smoothed idf over the hashed buckets, fitted on the VC corpus
+        document_frequency = np.count_nonzero(tf, axis=0)
+        self.idf = (np.log((1 + len(fund_ids)) / (1 + document_frequency)) + 1).astype(np.float32)
+        # Buckets no fund uses can't match anything; zeroing them keeps query norms honest
+        self.idf[document_frequency == 0] = 0
+        matrix = tf * self.idf
+        _normalize_rows(matrix)
+        self.matrix = matrix
+
+    def updated(self, added=(), removed=()):
+        """A new index with funds added (replacing any with the same id) and fund ids removed
+
+        Only the added funds are vectorized; the idf and row weights are refitted from the kept
+        term frequencies.
+        """
+        added = list(added)
+        dropped = set(removed) | {fund["id"] for fund in added}
+        keep = ~np.isin(self.fund_ids, np.fromiter(dropped, dtype=np.int64, count=len(dropped)))
+        tf = np.zeros((len(added), self.vectorizer.dimensions), dtype=np.float32)
+        for row, fund in enumerate(added):
+            tf[row] = self.vectorizer.transform(fund_text(fund))
+        index = ThesisIndex.__new__(ThesisIndex)
+        index.vectorizer = self.vectorizer
+        index._fit(np.concatenate([self.fund_ids[keep], np.array([fund["id"] for fund in added], dtype=np.int64)]),
+                   np.concatenate([self.tf[keep], tf]))
+        return index
+
+    def __len__(self):
+        return len(self.fund_ids)
+
+    def embed(self, text):
+        vector = self.vectorizer.transform(text) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def nearest(self, text, k=DEFAULT_CANDIDATES, min_similarity=MIN_SIMILARITY):
+        """Up to k {fund_id: cosine similarity} nearest to text, above min_similarity"""
+        if not len(self) or not text.strip():
+            return {}
+        query = self.embed(text)
+        if not query.any():
+            return {}
+        scores = self.matrix @ query
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        return {int(self.fund_ids[row]): float(scores[row]) for row in best if scores[row] >= min_similarity}
+
+
+def _normalize_rows(matrix):
+    """L2-normalize rows in place"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
@@ -0,0 +1,144 @@
+import heapq
+import threading
+
+from matching import normalize_industry
+
+DEFAULT_QUEUE_SIZE = 3
+
+
+class QueueMaterializer:
+    """Keeps each VC's top-N startup queue materialized and patches it incrementally"""
+
+    def __init__(self, match_index, queue_size=DEFAULT_QUEUE_SIZE):
+        self.match_index = match_index
+        self.queue_size = queue_size
+        self._startups = {}
+        self._targets = {}
+        self._versions = {}
+        self._heaps = {}
+        self._dismissed = {}
+        self._views = {}
+        self._lock = threading.RLock()
+        # Optional callback(vc_id, queue) fired whenever a materialized queue changes
+        self.on_change = None
+
+    def _eligible_vcs(self, target_industries):
+        vc_ids = set()
+        for industry in target_industries:
+            vc_ids |= self.match_index.industry_postings(industry)
+        return vc_ids
+
+    def _push(self, vc_id, startup_id):
+        entry = (-self._startups[startup_id]["thesis_score"], startup_id, self._versions[startup_id])
+        heap = self._heaps.setdefault(vc_id, [])
+        heapq.heappush(heap, entry)
+        # Rescores leave stale entries behind; compact once they dominate the heap
+        if len(heap) > 2 * len(self._startups) + 64:
+            heap[:] = [e for e in heap if self._valid(vc_id, e)]
+            heapq.heapify(heap)
+
+    def _valid(self, vc_id, entry):
+        _, startup_id, version = entry
+        return (self._versions.get(startup_id) == version
+                and startup_id not in self._dismissed.get(vc_id, ()))
+
+    def _rebuild_view(self, vc_id):
+        # Pop the best live entries, dropping stale versions for good, then push back
+        heap = self._heaps.get(vc_id, [])
+        best = []
+        while heap and len(best) < self.queue_size:
+            entry = heapq.heappop(heap)
+            if self._valid(vc_id, entry):
+                best.append(entry)
+        for entry in best:
+            heapq.heappush(heap, entry)
+        view = tuple(self._startups[startup_id] for _, startup_id, _ in best)
+        changed = view != self._views.get(vc_id)
+        self._views[vc_id] = view
+        if changed and self.on_change is not None:
+            self.on_change(vc_id, list(view))
+
+    def _affects_view(self, vc_id, startup_id):
+        view = self._views.get(vc_id, ())
+        if len(view) < self.queue_size or any(s["id"] == startup_id for s in view):
+            return True
+        return self._startups[startup_id]["thesis_score"] >= view[-1]["thesis_score"]
+
+    def add_startup(self, startup, target_industries):
+        """Add or replace a startup and push it into the queues of every VC it targets"""
+        with self._lock:
+            startup_id = startup["id"]
+            if startup_id in self._startups:
+                self.remove_startup(startup_id)
+            self._startups[startup_id] = startup
+            self._targets[startup_id] = tuple(target_industries)
+            self._versions[startup_id] = self._versions.get(startup_id, 0) + 1
+            for vc_id in self._eligible_vcs(target_industries):
+                self._push(vc_id, startup_id)
+                if self._affects_view(vc_id, startup_id):
+                    self._rebuild_view(vc_id)
+
+    def rescore_startup(self, startup_id, thesis_score):
+        """Change a startup's score; only queues that contain or would admit it are rebuilt"""
+        with self._lock:
+            if startup_id not in self._startups:
+                return False
+            self._startups[startup_id] = dict(self._startups[startup_id], thesis_score=thesis_score)
+            self._versions[startup_id] += 1
+            for vc_id in self._eligible_vcs(self._targets[startup_id]):
+                self._push(vc_id, startup_id)
+                if self._affects_view(vc_id, startup_id):
+                    self._rebuild_view(vc_id)
+            return True
+
+    def remove_startup(self, startup_id):
+        """Drop a startup from the pool and from every queue showing it"""
+        with self._lock:
+            if startup_id not in self._startups:
+                return False
+            affected = [vc_id for vc_id, view in self._views.items()
+                        if any(s["id"] == startup_id for s in view)]
+            del self._startups[startup_id]
+            del self._targets[startup_id]
+            self._versions[startup_id] += 1  # invalidates every heap entry for it
+            for vc_id in affected:
+                self._rebuild_view(vc_id)
+            return True
+
+    def remove_from_queue(self, vc_id, startup_id):
+        """Take a startup out of one VC's queue, e.g. after a 'pass' decision"""
+        with self._lock:
+            self._dismissed.setdefault(vc_id, set()).add(startup_id)
+            if any(s["id"] == startup_id for s in self._views.get(vc_id, ())):
+                self._rebuild_view(vc_id)
+
+    def add_vc(self, vc_id, industries):
+        """Materialize a queue for a newly added VC"""
+        with self._lock:
+            wanted = {normalize_industry(industry) for industry in industries}
+            heap = self._heaps[vc_id] = []
+            for startup_id, startup_targets in self._targets.items():
+                if {normalize_industry(t) for t in startup_targets} & wanted:
+                    heap.append((-self._startups[startup_id]["thesis_score"], startup_id,
+                                 self._versions[startup_id]))
+            heapq.heapify(heap)
+            self._rebuild_view(vc_id)
+
+    def remove_vc(self, vc_id):
+        with self._lock:
+            self._heaps.pop(vc_id, None)
+            self._views.pop(vc_id, None)
+            self._dismissed.pop(vc_id, None)
+
+    def has_startup(self, startup_id):
+        with self._lock:
+            return startup_id in self._startups
+
+    def startups(self):
+        """Every startup in the pool, e.g. as the founder side of a global allocation"""
+        with self._lock:
+            return list(self._startups.values())
+
+    def queue(self, vc_id):
+        """The VC's current queue; a dict lookup, nothing is recomputed"""
+        return list(self._views.get(vc_id, ()))